@@ -1,7 +1,6 @@
 import streamlit as st
 from typing import TypedDict, Annotated, Sequence
 import os
-import shutil
 from langchain_core.messages import (
     HumanMessage,
     ToolMessage,
@@ -13,9 +12,9 @@ from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph.message import add_messages
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.document_loaders import JSONLoader
-from langchain_community.vectorstores import Chroma
+from log_index import get_embeddings, open_index
+from log_templates import format_clusters, mine_documents
+from retrieval import HybridRetriever
 
 # Page configuration
 st.set_page_config(
@@ -65,7 +64,7 @@ def initialize_agent():
     load_dotenv()
 
     llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-    embeddings = GoogleGenerativeAIEmbeddings(model="text-embedding-004")
+    embeddings = get_embeddings()
 
     # Define agent state
     class agentState(TypedDict):
@@ -95,17 +94,6 @@ def initialize_agent():
         st.info(f"📂 Parent directory: {os.path.dirname(os.getcwd())}")
         return None
 
-    json_loader = JSONLoader(
-        file_path=logs_path, jq_schema=".", text_content=False, json_lines=True
-    )
-
-    try:
-        docs = json_loader.load()
-        st.sidebar.success(f"✅ Loaded {len(docs)} documents")
-    except Exception as e:
-        st.error(f"Error loading file: {e}")
-        return None
-
     # Set vector db directory - try parent directory first
     parent_dir = os.path.dirname(os.getcwd())
     vector_db_directory = os.path.join(parent_dir, "data", "db")
@@ -116,48 +104,30 @@ def initialize_agent():
 
     collection_name = "logs"
 
-    if os.path.exists(vector_db_directory):
-        shutil.rmtree(vector_db_directory)
-
-    os.makedirs(vector_db_directory, exist_ok=True)
-
     try:
-        vectorstore = Chroma.from_documents(
-            documents=docs,
-            embedding=embeddings,
-            collection_name=collection_name,
+        vectorstore = open_index(
+            logs_path,
+            embeddings,
             persist_directory=vector_db_directory,
+            collection_name=collection_name,
         )
         st.sidebar.success(
-            f"✅ Vectorstore created: {vectorstore._collection.count()} docs"
+            f"✅ Vectorstore ready: {vectorstore._collection.count()} docs"
         )
     except Exception as e:
-        st.error(f"Error creating vectorstore: {e}")
+        st.error(f"Error opening vectorstore: {e}")
         return None
 
-    retriever = vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 10},
-    )
+    # BM25 over the same documents, fused with vector search
+    retriever = HybridRetriever(vectorstore)
+    # Log templates with counts, so the model sees one line per repeated event
+    miner = mine_documents(retriever.keyword_index.docs)
 
     @tool
     def search_critical_errors(query: str) -> str:
         """Search for critical ACE errors and warnings."""
-        results = retriever.invoke(query)
-        critical_logs = []
-        for doc in results:
-            content = doc.page_content
-            if '"severity": "E"' in content or '"severity": "W"' in content:
-                critical_logs.append(doc)
-
-        if not critical_logs:
-            return "No critical errors found in the logs"
-
-        formatted_logs = []
-        for i, doc in enumerate(critical_logs[:5], 1):
-            formatted_logs.append(f"Log {i}:\n{doc.page_content}\n")
-
-        return "\n".join(formatted_logs)
+        critical_logs = retriever.search_critical(query, k=20)
+        return format_clusters(critical_logs, miner, limit=5)
 
     tools = [search_critical_errors]
     model_with_tools = llm.bind_tools(tools)
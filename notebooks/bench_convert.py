@@ -0,0 +1,115 @@
+"""Throughput benchmark for convert.py.
+
+Generates a synthetic ACE syslog file from the sample's message shapes, then
+times the old line-by-line strptime loop against convert() with one and with
+all worker processes.
+
+    python notebooks/bench_convert.py --lines 2000000 --gzip
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from convert import convert
+
+MESSAGES = [
+    "ACE0001I: Integration node 'INODE01' started. Version: 12.0.0.0",
+    "ACE0002I: Integration node 'INODE01' heartbeat check passed.",
+    "ACE0624I: Execution group 'EG1' started for application '{app}' (instance 1)",
+    "ACE0805E: Unexpected exception in message flow '{flow}' node '{node}'. Error: NullPointerException PID={pid}",
+    "ACE0806E: Resource 'CacheStore' unavailable for application '{app}'. Error code=503 PID={pid}",
+    "ACE0901W: Flow '{flow}' node '{node}' in application '{app}' reported a recoverable condition. MsgID={msg} CorrelationID={corr}",
+    "ACE1000A: User 'admin' deployed BAR '{app}.bar' to Integration Node 'INODE01'. Result=SUCCESS",
+    "ACE2001T: TRACE: MessageFlow={flow}, Node={node}, ExecutionGroup=EG1, MsgID={msg}, Size=2048B",
+]
+COMPONENTS = ["IntegrationNode", "ExecutionGroup", "FlowNode", "Audit", "Trace", "ResourceManager"]
+FLOWS = ["OrderFlow", "InvoiceFlow", "PaymentFlow", "ReturnsFlow"]
+NODES = ["DBLookup", "Compute", "MQInput", "Mapping"]
+APPS = ["Orders", "Billing", "Payment", "Shipping"]
+
+
+def generate(path, lines, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2025, 11, 28)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt") as f:
+        for i in range(lines):
+            ts = start + timedelta(seconds=i // 50)
+            pid = rng.randint(12000, 13000)
+            message = rng.choice(MESSAGES).format(
+                app=rng.choice(APPS), flow=rng.choice(FLOWS), node=rng.choice(NODES),
+                pid=pid, msg=rng.randint(1000, 9999), corr=f"{rng.randrange(16**4):04x}",
+            )
+            f.write(f"{ts:%b %d %H:%M:%S} ace-host {rng.choice(COMPONENTS)}[{pid}]: {message}\n")
+
+
+def legacy_convert(input_path, output_path, year=2025):
+    """The original per-line loop, kept for comparison"""
+    log_pattern = re.compile(r"(?P<month>\w{3}) (?P<day>\d{2}) (?P<time>\d{2}:\d{2}:\d{2}) (?P<rest>.*)")
+    opener = gzip.open if input_path.endswith(".gz") else open
+    count = 0
+    with opener(input_path, "rt") as f_in, open(output_path, "w") as f_out:
+        for line in f_in:
+            line = line.strip()
+            m = log_pattern.match(line)
+            if m:
+                month, day, time_, rest = m.groups()
+                ts = datetime.strptime(f"{month} {day} {time_}", "%b %d %H:%M:%S").replace(year=year)
+                code_match = re.search(r"(ACE\d+)([WEI]):", rest)
+                severity = code_match.group(2) if code_match else "U"
+                entry = {"text": line, "timestamp": ts.isoformat(sep=" "), "severity": severity}
+            else:
+                entry = {"text": line, "timestamp": None, "severity": "U"}
+            f_out.write(json.dumps(entry) + "\n")
+            count += 1
+    return count
+
+
+def run(name, func, input_path, size_mb):
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed:8.2f}s {count / elapsed:>12,.0f} lines/sec {size_mb / elapsed:8.1f} MB/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark convert.py throughput")
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--gzip", action="store_true", help="Benchmark gzip input")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--parquet", action="store_true", help="Also time Parquet output (needs pyarrow)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "bench.log" + (".gz" if args.gzip else ""))
+        print(f"Generating {args.lines:,} lines...")
+        generate(input_path, args.lines)
+        size_mb = os.path.getsize(input_path) / (1 << 20)
+        output = os.path.join(tmp, "out.jsonl")
+
+        baseline = run("legacy (strptime per line)", lambda: legacy_convert(input_path, output), input_path, size_mb)
+        single = run("convert, 1 worker", lambda: convert(input_path, output, 2025, workers=1), input_path, size_mb)
+        parallel = run(
+            f"convert, {args.workers} workers",
+            lambda: convert(input_path, output, 2025, workers=args.workers),
+            input_path, size_mb,
+        )
+        if args.parquet:
+            run(
+                f"convert parquet, {args.workers} workers",
+                lambda: convert(input_path, os.path.join(tmp, "out.parquet"), 2025, workers=args.workers),
+                input_path, size_mb,
+            )
+        print(f"Speed-up: {baseline / single:.1f}x single process, {baseline / parallel:.1f}x parallel")
+
+
+if __name__ == "__main__":
+    main()
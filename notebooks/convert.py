@@ -1,52 +1,250 @@
+"""Convert raw ACE syslog into JSON lines (or Parquet) for the notebooks.
+
+Input is read in large chunks of lines and the chunks are parsed in parallel
+worker processes; output keeps the input order. Timestamps are assembled from
+cached month/day prefixes instead of calling strptime on every line. Inputs
+and outputs ending in .gz are (de)compressed transparently.
+
+    python notebooks/convert.py data/ace_syslog_400.log -o data/ace_syslog_400.jsonl
+    python notebooks/convert.py /var/log/ace/syslog.1.gz -o day.parquet --year 2025
+"""
+
+import argparse
+import gzip
+import json
+import os
 import re
+import sys
+import time
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
+from multiprocessing import Pool
 
 log_pattern = re.compile(
-    r"(?P<month>\w{3}) (?P<day>\d{2}) (?P<time>\d{2}:\d{2}:\d{2}) (?P<rest>.*)"
+    r"(?P<month>\w{3}) +(?P<day>\d{1,2}) (?P<time>\d{2}:\d{2}:\d{2}) (?P<rest>.*)"
 )
 
-year = 2025
-
-with (
-    open("data/ace_syslog_400.log", "r") as f_in,
-    open("data/ace_syslog_400.jsonl", "w") as f_out,
-):
-    for line in f_in:
-        line = line.strip()
-        m = log_pattern.match(line)
-
-        if m:
-            month, day, time, rest = m.groups()
-            ts = datetime.strptime(f"{month} {day} {time}", "%b %d %H:%M:%S").replace(
-                year=year
-            )
-            severity = None
-
-            # severity is the last char before ':'
-            code_match = re.search(r"(ACE\d+)([WEI]):", rest)
-            if code_match:
-                msg_code, sev = code_match.groups()
-                severity = sev
-            else:
-                severity = "U"
-
-            # write JSONL
-            entry = {
-                "text": line,
-                "timestamp": ts.isoformat(sep=" "),
-                "severity": severity,
-            }
-            import json
-
-            f_out.write(json.dumps(entry) + "\n")
+# Syslog lines carry no year; assume the current one unless told otherwise
+year = datetime.now().year
+
+# severity is the last char of the ACE code before ':'
+code_pattern = re.compile(r"(ACE\d+)([WEI]):")
+header_pattern = re.compile(r"^\S+ (?P<component>[\w.-]+)\[(?P<pid>\d+)\]: (?P<code>ACE\d+[A-Z])?")
+field_patterns = {
+    "flow": re.compile(r"(?:[Ff]low '([^']+)'|MessageFlow=([^,\s]+))"),
+    "node": re.compile(r"(?:(?<!Integration )node '([^']+)'|Node=([^,\s]+))"),
+    "application": re.compile(r"application '([^']+)'"),
+}
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1
+    )
+}
+
+# Columns written to Parquet, in order
+FIELDS = ["text", "timestamp", "severity", "code", "component", "pid", "flow", "node", "application"]
+
+# Bytes of input handed to a worker at a time
+CHUNK_BYTES = 8 << 20
+
+# Chunks submitted but not yet written, per worker; bounds memory on huge inputs
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+@lru_cache(maxsize=4096)
+def date_prefix(month, day, year):
+    """'Nov', '28', 2025 -> '2025-11-28 ', or None for an impossible date"""
+    try:
+        return datetime(year, MONTHS[month], int(day)).strftime("%Y-%m-%d ")
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_syslog_line(line, year=year):
+    """Convert one raw ACE syslog line into a {text, timestamp, severity} record"""
+    line = line.strip()
+    m = log_pattern.match(line)
+    prefix = date_prefix(m.group("month"), m.group("day"), year) if m else None
+
+    if prefix is None:
+        return {
+            "text": line,
+            "timestamp": None,
+            "severity": "U",
+        }
+
+    code_match = code_pattern.search(m.group("rest"))
+    return {
+        "text": line,
+        "timestamp": prefix + m.group("time"),
+        "severity": code_match.group(2) if code_match else "U",
+    }
+
+
+def extract_fields(text):
+    """Pull the ACE code, component, PID, flow, node and application out of a
+    syslog line. Fields that are not present are left out."""
+    fields = {}
+    m = log_pattern.match(text)
+    header = header_pattern.match(m.group("rest") if m else text)
+    if header:
+        fields["component"] = header.group("component")
+        fields["pid"] = int(header.group("pid"))
+        if header.group("code"):
+            fields["code"] = header.group("code")
+    for name, pattern in field_patterns.items():
+        match = pattern.search(text)
+        if match:
+            fields[name] = next(group for group in match.groups() if group)
+    return fields
+
+
+def convert_chunk(args):
+    """Worker: parse a chunk of raw lines. Returns the JSONL text for the chunk,
+    or a dict of columns when converting to Parquet."""
+    lines, year, with_fields, columnar = args
+    records = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        if not line.strip():
+            continue
+        record = parse_syslog_line(line, year)
+        if with_fields or columnar:
+            record.update(extract_fields(record["text"]))
+        records.append(record)
+    if columnar:
+        return {field: [record.get(field) for record in records] for field in FIELDS}
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def read_chunks(path, chunk_bytes=CHUNK_BYTES):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                return
+            yield lines
+
+
+def bounded_imap(pool, func, tasks, window):
+    """Like pool.imap, in input order, but with at most `window` tasks
+    submitted at a time. imap's feeder thread drains the whole task
+    generator up front, which would read an entire multi-GB file into
+    memory; here the next chunk is only read once the oldest result is out."""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def arrow_table(columns):
+    """Build a pyarrow table with the Parquet schema from convert_chunk's columns"""
+    import pyarrow as pa
+
+    schema = pa.schema(
+        [
+            ("text", pa.string()),
+            ("timestamp", pa.timestamp("s")),
+            ("severity", pa.string()),
+            ("code", pa.string()),
+            ("component", pa.string()),
+            ("pid", pa.int32()),
+            ("flow", pa.string()),
+            ("node", pa.string()),
+            ("application", pa.string()),
+        ]
+    )
+    columns = dict(columns)
+    columns["timestamp"] = [
+        datetime.fromisoformat(ts) if ts else None for ts in columns["timestamp"]
+    ]
+    return pa.table(columns, schema=schema)
+
+
+def parquet_writer(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+
+    writer = None
+
+    def write(columns):
+        nonlocal writer
+        table = arrow_table(columns)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+        writer.write_table(table)
+
+    def close():
+        if writer is not None:
+            writer.close()
+
+    return write, close
+
+
+def convert(input_path, output_path, year=year, output_format=None, workers=None,
+            with_fields=False, chunk_bytes=CHUNK_BYTES):
+    """Convert input_path to output_path. Returns the number of records written"""
+    if output_format is None:
+        output_format = "parquet" if output_path.endswith(".parquet") else "jsonl"
+    columnar = output_format == "parquet"
+    workers = workers or os.cpu_count() or 1
+
+    if columnar:
+        write, close = parquet_writer(output_path)
+    else:
+        out = gzip.open(output_path, "wt") if output_path.endswith(".gz") else open(output_path, "w")
+        write, close = out.write, out.close
+
+    tasks = ((lines, year, with_fields, columnar) for lines in read_chunks(input_path, chunk_bytes))
+    count = 0
+    try:
+        if workers == 1:
+            results = map(convert_chunk, tasks)
+            for result in results:
+                count += len(result["text"]) if columnar else result.count("\n")
+                write(result)
         else:
-            entry = {
-                "text": line,
-                "timestamp": None,
-                "severity": "U",
-            }
-            import json
+            with Pool(workers) as pool:
+                # Keeps chunk order while workers run a bounded distance ahead
+                window = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+                for result in bounded_imap(pool, convert_chunk, tasks, window):
+                    count += len(result["text"]) if columnar else result.count("\n")
+                    write(result)
+    finally:
+        close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ACE syslog to JSON lines or Parquet")
+    parser.add_argument("input", nargs="?", default="data/ace_syslog_400.log", help="Syslog file, optionally .gz")
+    parser.add_argument("-o", "--output", default="data/ace_syslog_400.jsonl", help=".jsonl, .jsonl.gz or .parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="Defaults to the output file extension")
+    parser.add_argument("--year", type=int, default=year, help="Year to assume for syslog timestamps")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--fields", action="store_true",
+                        help="Also write code, component, pid, flow, node and application to JSONL")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = convert(args.input, args.output, args.year, args.format, args.workers, args.fields)
+    elapsed = time.perf_counter() - started
+    size_mb = os.path.getsize(args.input) / (1 << 20)
+    print(
+        f"Converted {count} lines to {args.output} in {elapsed:.1f}s "
+        f"({count / max(elapsed, 1e-9):,.0f} lines/sec, {size_mb / max(elapsed, 1e-9):.1f} MB/sec)"
+    )
 
-            f_out.write(json.dumps(entry) + "\n")
 
-print("File converted to system.jsonl!")
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 from typing import TypedDict, Annotated, Sequence
 import os
-import shutil
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -15,15 +14,15 @@ from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph.message import add_messages
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.document_loaders import JSONLoader
-from langchain_community.vectorstores import Chroma
+from log_index import get_embeddings, open_index
+from log_templates import format_clusters, mine_documents
+from retrieval import HybridRetriever
 
 
 load_dotenv()
 
 llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-embeddings = GoogleGenerativeAIEmbeddings(model="text-embedding-004")
+embeddings = get_embeddings()
 
 
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -42,49 +41,30 @@ logs_path = "data/ace_syslog_400.jsonl"
 if not os.path.exists(logs_path):
     raise ValueError("Logs file does not exist")
 
-json_loader = JSONLoader(
-    file_path=logs_path, jq_schema=".", text_content=False, json_lines=True
-)
-
-try:
-    docs = json_loader.load()
-    print(f"File loaded successfully - {len(docs)} documents found")
-except Exception as e:
-    print(f"Error loading file: {e}")
-    docs = []
-
-
 vector_db_directory = "data/db/"
 collection_name = "logs"
 
 
-if os.path.exists(vector_db_directory):
-    print("Removing existing vectorstore...")
-    shutil.rmtree(vector_db_directory)
-
-
-os.makedirs(vector_db_directory)
-
-#! Loading the data into vector db
+#! Opening the persisted vector db, embedding only new or changed records
+#! (build it ahead of time with: python notebooks/log_index.py)
 try:
-    print("Creating fresh vectorstore...")
-    vectorstore = Chroma.from_documents(
-        documents=docs,
-        embedding=embeddings,
-        collection_name=collection_name,
+    vectorstore = open_index(
+        logs_path,
+        embeddings,
         persist_directory=vector_db_directory,
+        collection_name=collection_name,
     )
-    print(f"Total documents in vectorstore: {vectorstore._collection.count()}")
 
 except Exception as e:
-    print(f"Error creating vectorstore: {e}")
+    print(f"Error opening vectorstore: {e}")
+    raise
 
 
-#! Retriver function to retrive the records from the db
-retriever = vectorstore.as_retriever(
-    search_type="similarity",
-    search_kwargs={"k": 10},
-)
+#! Hybrid retriever: BM25 keyword index fused with vector search
+retriever = HybridRetriever(vectorstore)
+
+#! Log templates with counts, so the model sees one line per repeated event
+miner = mine_documents(retriever.keyword_index.docs)
 
 
 #! Tool to search for error code in db
@@ -101,23 +81,9 @@ def search_critical_errors(query: str) -> str:
         Analysis of critical errors with potential fixes
     """
 
-    results = retriever.invoke(query)
-    critical_logs = []
-    for doc in results:
-        content = doc.page_content
-        metadata = doc.metadata
-
-        if '"severity": "E"' in content or '"severity": "W"' in content:
-            critical_logs.append(doc)
-
-    if not critical_logs:
-        return "No critical errors found in the logs"
-
-    formatted_logs = []
-    for i, doc in enumerate(critical_logs[:5], 1):  # 5 critical issues
-        formatted_logs.append(f"Log {i}:\n{doc.page_content}\n")
-
-    return "\n".join(formatted_logs)
+    # Severity is filtered inside Chroma; 5 critical log templates
+    critical_logs = retriever.search_critical(query, k=20)
+    return format_clusters(critical_logs, miner, limit=5)
 
 
 tools = [search_critical_errors]
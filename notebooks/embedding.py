@@ -0,0 +1,230 @@
+"""Embedding stage for the ACE log index.
+
+BatchEmbedder wraps any LangChain embeddings model. It splits documents into
+fixed-size batches, runs a bounded number of batches concurrently and retries
+rate-limited (429) batches with exponential backoff and jitter. A 429 on one
+batch pauses every worker until the shared cooldown passes, so a burst of
+workers does not keep hammering an exhausted quota.
+
+TemplateCachedEmbeddings sits in front of both. ACE logs repeat the same event
+with only timestamps, PIDs and message ids changed, so documents are embedded
+by their masked template and the vector is stored on disk under it; repeats
+never reach the embedding API.
+
+HashEmbeddings is a local, deterministic stand-in for tests and offline runs:
+select it with EMBEDDING_PROVIDER=hash.
+"""
+
+import hashlib
+import math
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+from log_templates import template_key, template_of
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "100"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))
+EMBED_BACKOFF_BASE = float(os.getenv("EMBED_BACKOFF_BASE", "1.0"))
+EMBED_BACKOFF_MAX = float(os.getenv("EMBED_BACKOFF_MAX", "60.0"))
+EMBED_PROGRESS_INTERVAL = float(os.getenv("EMBED_PROGRESS_INTERVAL", "10.0"))
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/embedding_cache.sqlite3")
+
+
+def is_rate_limited(err: Exception) -> bool:
+    for attr in ("code", "status_code", "status"):
+        value = getattr(err, attr, None)
+        if value == 429 or (callable(value) and value() == 429):
+            return True
+    message = str(err)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "rate limit" in message.lower()
+
+
+class BatchEmbedder(Embeddings):
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_concurrency: int = EMBED_CONCURRENCY,
+        max_retries: int = EMBED_MAX_RETRIES,
+        backoff_base: float = EMBED_BACKOFF_BASE,
+        backoff_max: float = EMBED_BACKOFF_MAX,
+        progress_interval: float = EMBED_PROGRESS_INTERVAL,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.progress_interval = progress_interval
+
+        self._lock = threading.Lock()
+        self._cooldown_until = 0.0
+        self.retries = 0
+        self.embedded = 0
+
+    @property
+    def model(self) -> str:
+        # Keeps log_index's manifest keyed on the wrapped model
+        return getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
+
+    def _wait_for_cooldown(self) -> None:
+        while True:
+            with self._lock:
+                remaining = self._cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _call(self, func, *args):
+        attempt = 0
+        while True:
+            self._wait_for_cooldown()
+            try:
+                return func(*args)
+            except Exception as err:
+                if not is_rate_limited(err) or attempt >= self.max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+                delay *= random.uniform(0.5, 1.5)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                print(f"[EMBED] Rate limited, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        vectors = self._call(self.embeddings.embed_documents, texts)
+        with self._lock:
+            self.embedded += len(texts)
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        started = time.monotonic()
+        last_report = started
+        results = [None] * len(batches)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+            futures = {pool.submit(self._embed_batch, batch): i for i, batch in enumerate(batches)}
+            done = 0
+            for future, i in futures.items():
+                results[i] = future.result()
+                done += len(batches[i])
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval or done == len(texts):
+                    print(
+                        f"[EMBED] {done}/{len(texts)} texts, "
+                        f"{done / max(now - started, 1e-6):.1f} texts/sec, {self.retries} retries"
+                    )
+                    last_report = now
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._call(self.embeddings.embed_query, text)
+
+
+class TemplateCachedEmbeddings(Embeddings):
+    """Embed each distinct log template once and keep the vector in SQLite"""
+
+    def __init__(self, embeddings: Embeddings, path: str = EMBED_CACHE_PATH):
+        self.embeddings = embeddings
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS vectors "
+            "(model TEXT, key TEXT, vector BLOB, PRIMARY KEY (model, key))"
+        )
+        self._db.commit()
+
+    @property
+    def model(self) -> str:
+        # Vectors now represent templates, so indexes built without the cache are rebuilt
+        inner = getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
+        return f"{inner}:template"
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM vectors WHERE model = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [self.model, *chunk],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def _store(self, vectors: dict[str, list[float]]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO vectors (model, key, vector) VALUES (?, ?, ?)",
+                [(self.model, key, array("f", vector).tobytes()) for key, vector in vectors.items()],
+            )
+            self._db.commit()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [template_key(text) for text in texts]
+        vectors = self._lookup(list(set(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = template_of(text)
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing, embedded))
+            self._store(new_vectors)
+            vectors.update(new_vectors)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        print(f"[EMBED] Template cache: {len(texts) - len(missing)}/{len(texts)} reused, {len(missing)} embedded")
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic bag-of-words feature hashing. Texts sharing words get
+    similar vectors, which is enough to exercise retrieval without an API."""
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.model = f"hash-{dimensions}"
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
@@ -0,0 +1,259 @@
+"""Tail a growing ACE log file into the persistent Chroma index.
+
+Lines can be converted .jsonl records or raw syslog lines (parsed with
+convert.parse_syslog_line). New lines are batched, embedded in bulk and
+upserted under their content hash, then the byte offset is checkpointed, so a
+restarted daemon resumes where it stopped instead of re-embedding the file.
+Log rotation (new inode) and truncation (file shorter than the checkpoint)
+restart reading from the beginning of the new file.
+
+    python notebooks/ingest_tail.py /var/log/ace/ace_syslog.log --format syslog
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from convert import parse_syslog_line
+from log_index import get_embeddings, index_identity, open_collection, record_id, record_to_document
+
+
+class Checkpoint:
+    """Byte offset and inode per tailed file, saved as JSON after every batch.
+
+    The checkpoint also records which index it belongs to (schema version,
+    embedding model, collection and rebuild id). If the collection has been
+    rebuilt since, the offsets are discarded so the files are tailed again
+    from the start instead of their earlier lines being lost.
+    """
+
+    def __init__(self, path: str, index: dict = None):
+        self.path = path
+        self.index = index
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                saved = json.load(f)
+            if saved.get("index") == index:
+                self.files = saved.get("files", {})
+            else:
+                print("Index was rebuilt since the last run, discarding tail checkpoint")
+
+    def get(self, source: str) -> dict:
+        return self.files.get(source, {"inode": None, "offset": 0})
+
+    def set(self, source: str, inode: int, offset: int) -> None:
+        self.files[source] = {"inode": inode, "offset": offset}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"index": self.index, "files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class TailIngester:
+    def __init__(
+        self,
+        logs_path: str,
+        vectorstore,
+        checkpoint: Checkpoint,
+        line_format: str = "auto",
+        batch_size: int = 256,
+        flush_interval: float = 2.0,
+    ):
+        self.logs_path = logs_path
+        self.source = os.path.abspath(logs_path)
+        self.vectorstore = vectorstore
+        self.checkpoint = checkpoint
+        self.line_format = line_format
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.batch = []
+        self.batch_started = None
+        self.skipped = 0
+
+        # Throughput and lag since the last report
+        self.lines_since_report = 0
+        self.embedded_since_report = 0
+        self.last_report = time.monotonic()
+        self.last_timestamp = None
+
+    def parse(self, line: str) -> dict:
+        if self.line_format == "jsonl" or (
+            self.line_format == "auto" and line.startswith("{")
+        ):
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+            return record
+        return parse_syslog_line(line)
+
+    def open(self) -> bool:
+        """Open the file, resuming from the checkpoint if it is still the same file"""
+        try:
+            self.file = open(self.logs_path, "rb")
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(self.file.fileno())
+        saved = self.checkpoint.get(self.source)
+        self.inode = stat.st_ino
+        self.offset = saved["offset"] if saved["inode"] == stat.st_ino else 0
+        if self.offset > stat.st_size:
+            print(f"{self.logs_path} was truncated, reading from the start")
+            self.offset = 0
+        self.file.seek(self.offset)
+        print(f"Tailing {self.logs_path} from byte {self.offset}")
+        return True
+
+    def rotated(self) -> bool:
+        try:
+            stat = os.stat(self.logs_path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self.inode or stat.st_size < self.offset
+
+    def read_lines(self) -> int:
+        """Queue every complete line that has been appended. Returns lines read"""
+        count = 0
+        while True:
+            line = self.file.readline()
+            if not line:
+                break
+            if not line.endswith(b"\n"):
+                # Partial line still being written; read it again next time
+                self.file.seek(self.offset)
+                break
+            line_offset = self.offset
+            self.offset += len(line)
+            text = line.decode("utf-8", errors="replace").strip()
+            if text:
+                try:
+                    record = self.parse(text)
+                    doc = record_to_document(record, self.source)
+                except Exception as e:
+                    # Skip it: raising would stop the daemon, and every restart
+                    # would fail on the same line
+                    self.skipped += 1
+                    print(f"Skipping bad line at byte {line_offset} of {self.logs_path}: {e}")
+                else:
+                    if not self.batch:
+                        self.batch_started = time.monotonic()
+                    self.batch.append((record, doc))
+            count += 1
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+        self.lines_since_report += count
+        return count
+
+    def flush(self) -> None:
+        """Embed and upsert the queued records, then checkpoint the offset"""
+        if self.batch:
+            docs = {record_id(doc.page_content): doc for _, doc in self.batch}
+            # Records already embedded before a crash or restart are skipped
+            existing = set(self.vectorstore.get(ids=list(docs), include=[])["ids"])
+            new_ids = [i for i in docs if i not in existing]
+            if new_ids:
+                self.vectorstore.add_documents([docs[i] for i in new_ids], ids=new_ids)
+            self.embedded_since_report += len(new_ids)
+            timestamps = [r.get("timestamp") for r, _ in self.batch if r.get("timestamp")]
+            if timestamps:
+                self.last_timestamp = max(timestamps)
+            self.batch = []
+        self.checkpoint.set(self.source, self.inode, self.offset)
+
+    def lag_seconds(self):
+        if not self.last_timestamp:
+            return None
+        last = datetime.fromisoformat(self.last_timestamp)
+        return max(0.0, (datetime.now() - last).total_seconds())
+
+    def report(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.last_report
+        size = os.path.getsize(self.logs_path) if os.path.exists(self.logs_path) else 0
+        lag = self.lag_seconds()
+        print(
+            f"[TAIL] {self.lines_since_report / elapsed:.1f} lines/sec, "
+            f"{self.embedded_since_report} embedded, "
+            f"{self.skipped} skipped, "
+            f"{max(0, size - self.offset)} bytes behind, "
+            + (f"{lag:.0f}s behind" if lag is not None else "lag unknown")
+        )
+        self.lines_since_report = 0
+        self.embedded_since_report = 0
+        self.skipped = 0
+        self.last_report = now
+
+    def run(self, poll_interval: float = 1.0, report_interval: float = 30.0) -> None:
+        while self.file is None and not self.open():
+            time.sleep(poll_interval)
+        try:
+            while True:
+                read = self.read_lines()
+                if self.batch and time.monotonic() - self.batch_started >= self.flush_interval:
+                    self.flush()
+                if time.monotonic() - self.last_report >= report_interval:
+                    self.report()
+                if read:
+                    continue
+                if self.rotated():
+                    # Drain what was left in the old file before switching
+                    self.read_lines()
+                    self.flush()
+                    print(f"{self.logs_path} was rotated, reopening")
+                    self.file.close()
+                    self.file = None
+                    self.checkpoint.set(self.source, None, 0)
+                    while not self.open():
+                        time.sleep(poll_interval)
+                    continue
+                time.sleep(poll_interval)
+        finally:
+            self.flush()
+            if self.file:
+                self.file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail an ACE log file into the vector store")
+    parser.add_argument("logs_path")
+    parser.add_argument("--db", default="data/db/", help="Chroma persist directory")
+    parser.add_argument("--collection", default="logs")
+    parser.add_argument("--checkpoint", help="Offset checkpoint file (default: <db>/tail_checkpoint.json)")
+    parser.add_argument("--format", choices=["auto", "jsonl", "syslog"], default="auto")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="Max seconds a partial batch waits")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--report-interval", type=float, default=30.0)
+    args = parser.parse_args()
+
+    vectorstore, manifest = open_collection(get_embeddings(), args.db, args.collection)
+    checkpoint = Checkpoint(
+        args.checkpoint or os.path.join(args.db, "tail_checkpoint.json"),
+        index=index_identity(manifest),
+    )
+    if vectorstore._collection.count() == 0 and checkpoint.files:
+        print("Vectorstore is empty, discarding tail checkpoint")
+        checkpoint.files = {}
+
+    ingester = TailIngester(
+        args.logs_path,
+        vectorstore,
+        checkpoint,
+        line_format=args.format,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+    )
+    try:
+        ingester.run(args.poll_interval, args.report_interval)
+    except KeyboardInterrupt:
+        print("Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Persistent Chroma index for the ACE log notebooks.
+
+Every record is stored under the hash of its content, so re-opening the index
+only embeds records that are new or changed and deletes the ones that are no
+longer in the source file. A manifest next to the collection remembers how
+many bytes of each source file were indexed and their hash: if that prefix is
+unchanged only the appended lines are read, otherwise the file is streamed
+through again in batches. The file is never held in memory as a whole.
+
+Build or update the index ahead of time with:
+
+    python notebooks/log_index.py data/ace_syslog_400.jsonl
+    python notebooks/log_index.py data/ace_syslog_400.jsonl --rebuild
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+
+from langchain_core.documents import Document
+from langchain_community.vectorstores import Chroma
+
+from convert import extract_fields
+
+# Bump when the document layout changes, so existing indexes are rebuilt
+SCHEMA_VERSION = 2
+
+MANIFEST_NAME = "index_manifest.json"
+
+# Documents per add_documents call (Chroma rejects very large batches). Each
+# call is split again into concurrent embedding batches by BatchEmbedder
+ADD_BATCH_SIZE = int(os.getenv("INDEX_ADD_BATCH_SIZE", "2000"))
+
+
+def prefix_sha256(path: str, size: int):
+    """Hash the first size bytes of a file in chunks, so multi-GB logs are
+    never held in memory. Returns the hashlib object, to be continued"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while size > 0:
+            chunk = f.read(min(1 << 20, size))
+            if not chunk:
+                break
+            digest.update(chunk)
+            size -= len(chunk)
+    return digest
+
+
+def record_id(page_content: str) -> str:
+    return hashlib.sha256(page_content.encode("utf-8")).hexdigest()
+
+
+def record_metadata(record: dict, source: str) -> dict:
+    """Filterable fields for Chroma: severity, ACE code, component, flow, node,
+    application and the timestamp as both text and epoch seconds"""
+    metadata = {"source": source, "severity": record.get("severity") or "U"}
+    metadata.update(extract_fields(record.get("text", "")))
+    if record.get("timestamp"):
+        metadata["timestamp"] = record["timestamp"]
+        metadata["epoch"] = int(datetime.fromisoformat(record["timestamp"]).timestamp())
+    return metadata
+
+
+def record_to_document(record: dict, source: str) -> Document:
+    # Same page_content as JSONLoader(jq_schema=".", text_content=False)
+    return Document(page_content=json.dumps(record), metadata=record_metadata(record, source))
+
+
+def iter_document_batches(logs_path: str, offset: int = 0, digest=None, batch_size: int = ADD_BATCH_SIZE):
+    """Read a .jsonl log file from a byte offset, yielding (documents keyed by
+    content hash, end offset) per batch of up to batch_size lines.
+
+    The end offset is just past the last newline-terminated line, and digest
+    (if given) is updated with exactly those bytes. A last line without a
+    newline may still be being written: it is indexed if it parses, but left
+    after the end offset so the next sync reads it again. Lines that are not
+    a JSON object are logged and skipped, as ingest_tail does.
+    """
+    source = os.path.abspath(logs_path)
+    docs = {}
+    with open(logs_path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            line_offset = offset
+            complete = raw.endswith(b"\n")
+            if complete:
+                offset += len(raw)
+                if digest is not None:
+                    digest.update(raw)
+            line = raw.decode("utf-8", errors="replace").strip()
+            if line:
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+                    doc = record_to_document(record, source)
+                except Exception as e:
+                    # Skip it: raising would stop every sync (and the agents
+                    # opening the index) on the same line
+                    if complete:
+                        print(f"Skipping bad line at byte {line_offset} of {logs_path}: {e}")
+                    continue
+                docs[record_id(doc.page_content)] = doc
+            if len(docs) >= batch_size:
+                yield docs, offset
+                docs = {}
+    yield docs, offset
+
+
+def embedding_model_name(embeddings) -> str:
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+def read_manifest(persist_directory: str) -> dict:
+    path = os.path.join(persist_directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(persist_directory: str, manifest: dict) -> None:
+    path = os.path.join(persist_directory, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def add_documents(vectorstore: Chroma, docs: dict[str, Document]) -> None:
+    ids = list(docs)
+    for start in range(0, len(ids), ADD_BATCH_SIZE):
+        batch = ids[start : start + ADD_BATCH_SIZE]
+        vectorstore.add_documents([docs[i] for i in batch], ids=batch)
+        print(f"Embedded {min(start + ADD_BATCH_SIZE, len(ids))}/{len(ids)} new documents")
+
+
+def sync_source(vectorstore: Chroma, logs_path: str, offset: int = 0, digest=None) -> tuple[int, int, int]:
+    """Make the collection match one source file, reading it in batches.
+
+    offset: Bytes already indexed (with digest their running hash); only the
+    rest of the file is read and nothing is deleted. With offset 0 the whole
+    file is read and documents no longer in it are deleted.
+
+    Returns (added, deleted, end offset)
+    """
+    source = os.path.abspath(logs_path)
+    seen = set() if offset == 0 else None
+    added = 0
+    for docs, offset in iter_document_batches(logs_path, offset, digest):
+        if not docs:
+            continue
+        existing = set(vectorstore.get(ids=list(docs), where={"source": source}, include=[])["ids"])
+        new_docs = {i: doc for i, doc in docs.items() if i not in existing}
+        if new_docs:
+            add_documents(vectorstore, new_docs)
+            added += len(new_docs)
+        if seen is not None:
+            seen.update(docs)
+
+    stale_ids = []
+    if seen is not None:
+        stale_ids = [
+            i for i in vectorstore.get(where={"source": source}, include=[])["ids"] if i not in seen
+        ]
+        if stale_ids:
+            vectorstore.delete(ids=stale_ids)
+    return added, len(stale_ids), offset
+
+
+def open_collection(
+    embeddings,
+    persist_directory: str = "data/db/",
+    collection_name: str = "logs",
+    rebuild: bool = False,
+) -> tuple[Chroma, dict]:
+    """Open the persisted collection, dropping it first if it was built with a
+    different schema version or embedding model. Returns (vectorstore, manifest)"""
+    os.makedirs(persist_directory, exist_ok=True)
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=persist_directory,
+    )
+
+    manifest = read_manifest(persist_directory)
+    model = embedding_model_name(embeddings)
+    if (
+        rebuild
+        or manifest.get("schema_version") != SCHEMA_VERSION
+        or manifest.get("embedding_model") != model
+        or manifest.get("collection_name") != collection_name
+    ):
+        if manifest or rebuild:
+            print("Index layout or embedding model changed, rebuilding vectorstore...")
+        vectorstore.delete_collection()
+        vectorstore = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=persist_directory,
+        )
+        manifest = {
+            "schema_version": SCHEMA_VERSION,
+            "embedding_model": model,
+            "collection_name": collection_name,
+            # Changes on every rebuild, so consumers such as the tail
+            # checkpoint can tell their documents were dropped
+            "index_id": uuid.uuid4().hex,
+            "sources": {},
+        }
+        write_manifest(persist_directory, manifest)
+    return vectorstore, manifest
+
+
+def index_identity(manifest: dict) -> dict:
+    """What identifies the collection's contents: a different identity means
+    everything indexed earlier is gone"""
+    return {
+        key: manifest.get(key)
+        for key in ("schema_version", "embedding_model", "collection_name", "index_id")
+    }
+
+
+def open_index(
+    logs_path: str,
+    embeddings,
+    persist_directory: str = "data/db/",
+    collection_name: str = "logs",
+    rebuild: bool = False,
+) -> Chroma:
+    """Open the persisted collection, embedding only what changed in logs_path"""
+    vectorstore, manifest = open_collection(
+        embeddings, persist_directory, collection_name, rebuild=rebuild
+    )
+
+    source = os.path.abspath(logs_path)
+    indexed = manifest["sources"].get(source, {})
+    offset = indexed.get("offset", 0)
+    size = os.path.getsize(logs_path)
+    digest = None
+    if 0 < offset <= size:
+        digest = prefix_sha256(logs_path, offset)
+        if digest.hexdigest() != indexed.get("sha256"):
+            digest = None
+    if digest is None:
+        # New source, or the indexed part was rewritten or truncated
+        offset, digest = 0, hashlib.sha256()
+
+    if offset and offset == size:
+        print(f"Vectorstore is up to date with {logs_path}")
+    else:
+        if offset:
+            print(f"Indexing lines appended to {logs_path} since byte {offset}...")
+        else:
+            print(f"Syncing vectorstore with {logs_path}...")
+        added, deleted, offset = sync_source(vectorstore, logs_path, offset, digest)
+        print(f"Added {added} and removed {deleted} documents")
+        manifest["sources"][source] = {"offset": offset, "sha256": digest.hexdigest()}
+        write_manifest(persist_directory, manifest)
+
+    print(f"Total documents in vectorstore: {vectorstore._collection.count()}")
+    return vectorstore
+
+
+def get_embeddings():
+    """Embedding model for indexing and retrieval, batched and rate-limit aware.
+    EMBEDDING_PROVIDER=hash selects the local deterministic embedder and
+    EMBED_CACHE=0 turns off the on-disk template cache."""
+    from dotenv import load_dotenv
+    from embedding import BatchEmbedder, HashEmbeddings, TemplateCachedEmbeddings
+
+    load_dotenv()
+    if os.getenv("EMBEDDING_PROVIDER", "google").lower() == "hash":
+        embeddings = BatchEmbedder(HashEmbeddings())
+    else:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        embeddings = BatchEmbedder(GoogleGenerativeAIEmbeddings(model="text-embedding-004"))
+
+    if os.getenv("EMBED_CACHE", "1") != "0":
+        embeddings = TemplateCachedEmbeddings(embeddings)
+    return embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the persistent ACE log index")
+    parser.add_argument("logs_path", nargs="?", default="data/ace_syslog_400.jsonl")
+    parser.add_argument("--db", default="data/db/", help="Chroma persist directory")
+    parser.add_argument("--collection", default="logs")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the collection and embed everything again")
+    args = parser.parse_args()
+
+    open_index(args.logs_path, get_embeddings(), args.db, args.collection, rebuild=args.rebuild)
+
+
+if __name__ == "__main__":
+    main()
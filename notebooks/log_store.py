@@ -0,0 +1,187 @@
+"""Columnar store for parsed ACE logs.
+
+Parsed records (see convert.py) are written as Parquet under hive-style
+date/hour partitions:
+
+    data/store/date=2025-11-28/hour=14/part-....parquet
+
+Queries filter on the partition columns first, so a time-range question only
+opens the files for the hours it covers. They read only the requested columns,
+and files are memory-mapped rather than copied into Python buffers.
+
+    python notebooks/log_store.py ingest data/ace_syslog_400.log --year 2025
+    python notebooks/log_store.py query --since "2025-11-28 14:00" --until "2025-11-28 14:30" --severity E W
+"""
+
+import argparse
+import os
+import uuid
+from datetime import datetime
+from multiprocessing import Pool
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from convert import (
+    CHUNK_BYTES,
+    CHUNKS_IN_FLIGHT_PER_WORKER,
+    arrow_table,
+    bounded_imap,
+    convert_chunk,
+    read_chunks,
+    year,
+)
+
+STORE_ROOT = os.getenv("LOG_STORE_ROOT", "data/store")
+
+# Parsed rows buffered before a write. Each write adds one file per partition
+# it touches, so larger buffers mean fewer, larger files.
+ROWS_PER_WRITE = int(os.getenv("LOG_STORE_ROWS_PER_WRITE", "1000000"))
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("hour", pa.int8())]), flavor="hive"
+)
+
+DEFAULT_COLUMNS = ["timestamp", "severity", "code", "component", "flow", "node", "application", "text"]
+
+
+def with_partitions(table: pa.Table) -> pa.Table:
+    """Add the date (YYYY-MM-DD) and hour columns the store is partitioned by"""
+    timestamps = table.column("timestamp")
+    table = table.append_column("date", pc.strftime(timestamps, format="%Y-%m-%d"))
+    return table.append_column("hour", pc.cast(pc.hour(timestamps), pa.int8()))
+
+
+def write_chunk(table: pa.Table, root: str) -> None:
+    pq.write_to_dataset(
+        with_partitions(table),
+        root,
+        partitioning=PARTITIONING,
+        # Unique names so repeated ingests add files instead of overwriting them
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        compression="zstd",
+    )
+
+
+def ingest(input_path: str, root: str = STORE_ROOT, year: int = year, workers: int = None,
+           rows_per_write: int = ROWS_PER_WRITE) -> int:
+    """Parse a syslog file (optionally .gz) in parallel and append it to the store"""
+    workers = workers or os.cpu_count() or 1
+    tasks = ((lines, year, True, True) for lines in read_chunks(input_path, CHUNK_BYTES))
+    count = 0
+    buffered, buffered_rows = [], 0
+
+    def flush():
+        nonlocal buffered, buffered_rows
+        if buffered:
+            write_chunk(pa.concat_tables(buffered), root)
+        buffered, buffered_rows = [], 0
+
+    with Pool(workers) as pool:
+        window = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+        for columns in bounded_imap(pool, convert_chunk, tasks, window):
+            if columns["text"]:
+                buffered.append(arrow_table(columns))
+                buffered_rows += len(columns["text"])
+                count += len(columns["text"])
+                if buffered_rows >= rows_per_write:
+                    flush()
+    flush()
+    return count
+
+
+def open_dataset(root: str = STORE_ROOT) -> ds.Dataset:
+    return ds.dataset(
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def time_filter(start: datetime = None, end: datetime = None):
+    """Partition filter (prunes whole directories) plus an exact timestamp filter"""
+    expression = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    date, hour = ds.field("date"), ds.field("hour")
+    if start is not None:
+        day = start.strftime("%Y-%m-%d")
+        expression = both(expression, (date > day) | ((date == day) & (hour >= start.hour)))
+        expression = both(expression, ds.field("timestamp") >= pa.scalar(start, type=pa.timestamp("s")))
+    if end is not None:
+        day = end.strftime("%Y-%m-%d")
+        expression = both(expression, (date < day) | ((date == day) & (hour <= end.hour)))
+        expression = both(expression, ds.field("timestamp") < pa.scalar(end, type=pa.timestamp("s")))
+    return expression
+
+
+def query(
+    start: datetime = None,
+    end: datetime = None,
+    severities=None,
+    columns=None,
+    root: str = STORE_ROOT,
+) -> pa.Table:
+    """Records in [start, end) with one of the given severities.
+
+    Args:
+        start: Earliest timestamp (inclusive), or None for no lower bound
+        end: Latest timestamp (exclusive), or None for no upper bound
+        severities: e.g. ["E", "W"]; None for all
+        columns: Columns to read; defaults to DEFAULT_COLUMNS
+        root: Store directory
+    """
+    expression = time_filter(start, end)
+    if severities:
+        severity = ds.field("severity").isin(list(severities))
+        expression = severity if expression is None else expression & severity
+    return open_dataset(root).to_table(columns=columns or DEFAULT_COLUMNS, filter=expression)
+
+
+def code_counts(start: datetime = None, end: datetime = None, severities=None,
+                root: str = STORE_ROOT) -> pa.Table:
+    """Occurrences per ACE code in a time range, most frequent first"""
+    table = query(start, end, severities, columns=["code", "severity"], root=root)
+    counts = table.group_by(["code", "severity"]).aggregate([([], "count_all")])
+    return counts.sort_by([("count_all", "descending")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned Parquet store for parsed ACE logs")
+    parser.add_argument("--root", default=STORE_ROOT, help="Store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Parse a syslog file into the store")
+    ingest_parser.add_argument("input", help="Syslog file, optionally .gz")
+    ingest_parser.add_argument("--year", type=int, default=year)
+    ingest_parser.add_argument("--workers", type=int, default=None)
+
+    query_parser = commands.add_parser("query", help="Read records for a time range")
+    query_parser.add_argument("--since", type=datetime.fromisoformat)
+    query_parser.add_argument("--until", type=datetime.fromisoformat)
+    query_parser.add_argument("--severity", nargs="*")
+    query_parser.add_argument("--columns", nargs="*")
+    query_parser.add_argument("--limit", type=int, default=20)
+    query_parser.add_argument("--counts", action="store_true", help="Show counts per ACE code instead of rows")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        count = ingest(args.input, args.root, args.year, args.workers)
+        print(f"Stored {count} records under {args.root}")
+    elif args.counts:
+        print(code_counts(args.since, args.until, args.severity, args.root).to_pandas().to_string(index=False))
+    else:
+        table = query(args.since, args.until, args.severity, args.columns, args.root)
+        print(f"{table.num_rows} records")
+        print(table.slice(0, args.limit).to_pandas().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
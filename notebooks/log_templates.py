@@ -0,0 +1,252 @@
+"""Reduce ACE log lines to templates by masking the fields that change on
+every occurrence (timestamps, PIDs, MsgID, CorrelationID).
+
+    Nov 28 14:01:47 ace-host Trace[12456]: ACE0624I: Execution group 'EG1' started ...
+    <TS> ace-host Trace[<PID>]: ACE0624I: Execution group 'EG1' started ...
+
+TemplateMiner goes further and clusters messages Drain-style: messages with
+the same length and leading token are compared position by position, and
+positions that differ between similar messages become <*> wildcards. Each
+cluster keeps its count, first/last seen timestamps, sample lines and the
+most common values of every wildcard.
+
+    python notebooks/log_templates.py data/ace_syslog_400.jsonl --severity E W
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import Counter
+
+from convert import header_pattern, log_pattern, parse_syslog_line
+
+VOLATILE_FIELDS = [
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?\b"), "<TS>"),
+    (re.compile(r"\b[A-Z][a-z]{2} +\d{1,2} \d{2}:\d{2}:\d{2}\b"), "<TS>"),
+    (re.compile(r"(\w\[)\d+(\])"), r"\1<PID>\2"),
+    (re.compile(r"\b(PID=)\d+"), r"\1<PID>"),
+    (re.compile(r"\b(MsgID=)[^\s,\"]+"), r"\1<MSGID>"),
+    (re.compile(r"\b(CorrelationID=)[^\s,\"]+"), r"\1<CORRID>"),
+]
+
+
+def template_of(text: str) -> str:
+    """Mask volatile fields so repeated events map to the same string"""
+    for pattern, replacement in VOLATILE_FIELDS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def template_key(text: str) -> str:
+    return hashlib.sha256(template_of(text).encode("utf-8")).hexdigest()
+
+
+WILDCARD = "<*>"
+
+
+def message_of(text: str) -> tuple[str, str]:
+    """Split a syslog line into (component, message), dropping time, host and PID"""
+    m = log_pattern.match(text)
+    rest = m.group("rest") if m else text
+    header = header_pattern.match(rest)
+    if not header:
+        return "", rest
+    return header.group("component"), rest[header.start("code") if header.group("code") else header.end():]
+
+
+class LogCluster:
+    def __init__(self, cluster_id: int, tokens: list[str], max_samples: int):
+        self.id = cluster_id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.samples = []
+        self.max_samples = max_samples
+        self.components = Counter()
+        self.variables = {}
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: list[str]) -> float:
+        same = sum(1 for a, b in zip(self.tokens, tokens) if a == b and a != WILDCARD)
+        return same / len(tokens)
+
+    def add(self, tokens: list[str], text: str, component: str, timestamp: str = None) -> None:
+        for position, (current, token) in enumerate(zip(self.tokens, tokens)):
+            if current != token and current != WILDCARD:
+                # Position just became a variable; every earlier message had the old value
+                self.tokens[position] = WILDCARD
+                self.variables[position] = Counter({current: self.count})
+            if self.tokens[position] == WILDCARD:
+                self.variables[position][token] += 1
+        self.count += 1
+        if component:
+            self.components[component] += 1
+        if timestamp:
+            if self.first_seen is None or timestamp < self.first_seen:
+                self.first_seen = timestamp
+            if self.last_seen is None or timestamp > self.last_seen:
+                self.last_seen = timestamp
+        if len(self.samples) < self.max_samples:
+            self.samples.append(text)
+
+    def to_dict(self, top_values: int = 5) -> dict:
+        return {
+            "id": self.id,
+            "template": self.template,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "components": dict(self.components.most_common(top_values)),
+            "variables": [
+                dict(self.variables[position].most_common(top_values))
+                for position in sorted(self.variables)
+            ],
+            "samples": self.samples,
+        }
+
+
+class TemplateMiner:
+    """Streaming Drain-style template miner for ACE syslog messages"""
+
+    def __init__(self, similarity_threshold: float = 0.5, max_samples: int = 3):
+        self.similarity_threshold = similarity_threshold
+        self.max_samples = max_samples
+        # (token count, leading token) -> clusters; the Drain parse tree flattened to depth 2
+        self.groups = {}
+        self.clusters = []
+
+    def _tokens(self, text: str) -> tuple[str, list[str]]:
+        component, message = message_of(text)
+        return component, template_of(message).split()
+
+    def _group_key(self, tokens: list[str]) -> tuple[int, str]:
+        first = tokens[0] if tokens else ""
+        # Tokens with digits are usually values, except ACE message codes
+        if any(c.isdigit() for c in first) and not first.startswith("ACE"):
+            first = WILDCARD
+        return len(tokens), first
+
+    def _best_match(self, tokens: list[str]):
+        best, best_score = None, self.similarity_threshold
+        for cluster in self.groups.get(self._group_key(tokens), []):
+            score = cluster.similarity(tokens)
+            if score >= best_score:
+                best, best_score = cluster, score
+        return best
+
+    def add(self, text: str, timestamp: str = None) -> LogCluster:
+        component, tokens = self._tokens(text)
+        if not tokens:
+            tokens = [""]
+        cluster = self._best_match(tokens)
+        if cluster is None:
+            cluster = LogCluster(len(self.clusters), list(tokens), self.max_samples)
+            self.clusters.append(cluster)
+            self.groups.setdefault(self._group_key(tokens), []).append(cluster)
+        cluster.add(tokens, text, component, timestamp)
+        return cluster
+
+    def add_record(self, record: dict) -> LogCluster:
+        return self.add(record.get("text", ""), record.get("timestamp"))
+
+    def match(self, text: str):
+        """Cluster a line belongs to, without adding it"""
+        component, tokens = self._tokens(text)
+        return self._best_match(tokens or [""])
+
+    def sorted_clusters(self) -> list[LogCluster]:
+        return sorted(self.clusters, key=lambda c: c.count, reverse=True)
+
+
+def mine_documents(docs) -> TemplateMiner:
+    """Mine templates from the JSON documents stored in the vector store"""
+    miner = TemplateMiner()
+    for doc in docs:
+        miner.add_record(json.loads(doc.page_content))
+    return miner
+
+
+def format_clusters(docs, miner: TemplateMiner, limit: int = 5) -> str:
+    """One line per template for the retrieved documents, in retrieval order,
+    with how often and when the template occurs across the whole log"""
+    # Lines the shared miner has not seen (e.g. tailed in since it was built)
+    # are grouped in a throwaway miner, so answering a query never changes
+    # the shared clusters' counts
+    unseen = TemplateMiner(miner.similarity_threshold, miner.max_samples)
+    # Cluster -> the best-ranked retrieved line in it, used as the example
+    clusters = {}
+    for doc in docs:
+        record = json.loads(doc.page_content)
+        text = record.get("text", "")
+        cluster = miner.match(text) or unseen.match(text) or unseen.add_record(record)
+        clusters.setdefault(cluster, record.get("text", ""))
+        if len(clusters) >= limit:
+            break
+    if not clusters:
+        return "No critical errors found in the logs"
+    lines = []
+    for i, (cluster, example) in enumerate(clusters.items(), 1):
+        values = "; ".join(
+            ", ".join(f"{value} ({count})" for value, count in cluster.variables[position].most_common(3))
+            for position in sorted(cluster.variables)
+        )
+        lines.append(
+            f"Template {i}: {cluster.template} | {cluster.count} occurrences"
+            f" from {cluster.first_seen} to {cluster.last_seen}"
+            + (f" | values: {values}" if values else "")
+            + f" | example: {example}"
+        )
+    return "\n".join(lines)
+
+
+def read_records(path: str):
+    opener = open
+    if path.endswith(".gz"):
+        import gzip
+
+        opener = gzip.open
+    with opener(path, "rt") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line) if line.startswith("{") else parse_syslog_line(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mine log templates from ACE syslog or converted .jsonl")
+    parser.add_argument("logs_path")
+    parser.add_argument("--output", help="Write clusters as JSON lines here instead of a summary to stdout")
+    parser.add_argument("--severity", nargs="*", help="Only mine these severities, e.g. E W")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Token similarity needed to join a cluster")
+    parser.add_argument("--top", type=int, default=0, help="Only output the N largest clusters")
+    args = parser.parse_args()
+
+    miner = TemplateMiner(similarity_threshold=args.threshold)
+    lines = 0
+    for record in read_records(args.logs_path):
+        if args.severity and record.get("severity") not in args.severity:
+            continue
+        miner.add_record(record)
+        lines += 1
+
+    clusters = miner.sorted_clusters()
+    if args.top:
+        clusters = clusters[: args.top]
+    if args.output:
+        with open(args.output, "w") as f:
+            for cluster in clusters:
+                f.write(json.dumps(cluster.to_dict()) + "\n")
+    else:
+        for cluster in clusters:
+            print(f"{cluster.count:>7}  {cluster.first_seen} .. {cluster.last_seen}  {cluster.template}")
+    print(f"{lines} lines -> {len(miner.clusters)} templates", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Retrieval helpers for the ACE log notebooks.
+
+Severity and the other fields extracted at ingestion time (see
+log_index.record_metadata) are Chroma metadata, so the critical-only filter
+runs inside the vector store as a `where` clause instead of discarding
+retrieved INFO lines afterwards. Repeats of the same event share a template
+(and, with the template cache, an identical vector) and would crowd out
+everything else, so results are de-duplicated by template and the fetch size
+doubles until enough distinct hits are found, in both the vector-only
+search_critical and the hybrid path.
+
+KeywordIndex is an in-memory BM25 inverted index over the same documents.
+HybridRetriever fuses its ranking with the vector ranking (reciprocal rank
+fusion). Before each search it catches the keyword index up with documents
+added (e.g. by ingest_tail) or deleted as stale (by log_index) since. Queries
+naming an ACE message code are answered from the keyword index alone, without
+embedding the query.
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+
+from log_index import record_id
+from log_templates import template_of
+
+CRITICAL_SEVERITIES = ("E", "W")
+
+# Upper bound for adaptive over-fetching
+MAX_FETCH_K = 200
+
+# BM25 parameters and the reciprocal rank fusion constant
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+
+ACE_CODE = re.compile(r"\bACE\d{4}[A-Z]\b", re.IGNORECASE)
+TOKEN = re.compile(r"\w+")
+
+# Metadata fields that are also searchable as keywords
+KEYWORD_FIELDS = ("code", "component", "flow", "node", "application")
+
+
+def severity_filter(severities=CRITICAL_SEVERITIES, where: dict = None) -> dict:
+    clause = {"severity": {"$in": list(severities)}}
+    return {"$and": [clause, where]} if where else clause
+
+
+def distinct_templates(docs: list, limit: int = None) -> list:
+    """Keep the first document of every log template, preserving order"""
+    hits, seen = [], set()
+    for doc in docs:
+        template = template_of(doc.page_content)
+        if template not in seen:
+            seen.add(template)
+            hits.append(doc)
+            if limit is not None and len(hits) >= limit:
+                break
+    return hits
+
+
+def matches(metadata: dict, where: dict) -> bool:
+    """Evaluate the subset of Chroma's where syntax used here ($and, $in, equality)"""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and "$in" in condition:
+            if metadata.get(key) not in condition["$in"]:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def search_critical(
+    vectorstore,
+    query: str,
+    k: int = 5,
+    severities=CRITICAL_SEVERITIES,
+    where: dict = None,
+    max_fetch_k: int = MAX_FETCH_K,
+) -> list:
+    """Return up to k distinct critical log documents most similar to query.
+
+    Args:
+        vectorstore: The Chroma collection opened by log_index
+        query: Description of the error or issue to search for
+        k: Number of distinct log templates to return
+        severities: Severities to keep, pushed down as a metadata filter
+        where: Extra Chroma metadata filter, e.g. {"application": "Payment"}
+        max_fetch_k: Stop over-fetching after this many candidates
+    """
+    query_vector = vectorstore.embeddings.embed_query(query)
+    where_filter = severity_filter(severities, where)
+
+    fetch_k = 2 * k
+    while True:
+        docs = vectorstore.similarity_search_by_vector(query_vector, k=fetch_k, filter=where_filter)
+        hits = distinct_templates(docs)
+        # Enough distinct hits, nothing more matches the filter, or at the cap
+        if len(hits) >= k or len(docs) < fetch_k or fetch_k >= max_fetch_k:
+            return hits[:k]
+        fetch_k = min(2 * fetch_k, max_fetch_k)
+
+
+def format_logs(docs: list) -> str:
+    if not docs:
+        return "No critical errors found in the logs"
+    return "\n".join(f"Log {i}:\n{doc.page_content}\n" for i, doc in enumerate(docs, 1))
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+def log_text(doc) -> str:
+    """The log line itself, without the JSON field names around it"""
+    try:
+        return json.loads(doc.page_content).get("text", "")
+    except ValueError:
+        return doc.page_content
+
+
+def reciprocal_rank_fusion(*rankings) -> list:
+    """Merge rankings by summing 1 / (RRF_K + rank) for every document"""
+    scores = defaultdict(float)
+    docs = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            doc_id = record_id(doc.page_content)
+            scores[doc_id] += 1 / (RRF_K + rank + 1)
+            docs.setdefault(doc_id, doc)
+    return [docs[doc_id] for doc_id in sorted(scores, key=scores.get, reverse=True)]
+
+
+class KeywordIndex:
+    """BM25 inverted index over log documents, kept in memory"""
+
+    def __init__(self):
+        self.docs = []
+        self.ids = {}
+        self.lengths = []
+        self.postings = defaultdict(dict)
+        self.total_length = 0
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, page_size: int = 5000) -> "KeywordIndex":
+        from langchain_core.documents import Document
+
+        index = cls()
+        offset = 0
+        while True:
+            page = vectorstore.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            index.add(
+                Document(page_content=content, metadata=metadata or {})
+                for content, metadata in zip(page["documents"], page["metadatas"])
+            )
+            if len(page["documents"]) < page_size:
+                return index
+            offset += page_size
+
+    def refresh(self, vectorstore, page_size: int = 5000) -> tuple[int, int]:
+        """Match the collection again after documents were added (e.g. by
+        ingest_tail) or deleted as stale (by log_index.sync_source).
+        Collection ids are content hashes, the same keys as self.ids, so only
+        the missing documents are fetched. Returns (added, removed)."""
+        from langchain_core.documents import Document
+
+        collection_ids = vectorstore.get(include=[])["ids"]
+        current = set(collection_ids)
+        stale_ids = [i for i in self.ids if i not in current]
+        self.remove(stale_ids)
+        new_ids = [i for i in collection_ids if i not in self.ids]
+        for start in range(0, len(new_ids), page_size):
+            page = vectorstore.get(ids=new_ids[start : start + page_size], include=["documents", "metadatas"])
+            self.add(
+                Document(page_content=content, metadata=metadata or {})
+                for content, metadata in zip(page["documents"], page["metadatas"])
+            )
+        return len(new_ids), len(stale_ids)
+
+    @staticmethod
+    def terms(doc) -> Counter:
+        metadata_text = " ".join(str(doc.metadata.get(field, "")) for field in KEYWORD_FIELDS)
+        return Counter(tokenize(log_text(doc) + " " + metadata_text))
+
+    def add(self, docs) -> None:
+        for doc in docs:
+            doc_id = record_id(doc.page_content)
+            if doc_id in self.ids:
+                continue
+            position = len(self.docs)
+            self.ids[doc_id] = position
+            self.docs.append(doc)
+            terms = self.terms(doc)
+            for term, count in terms.items():
+                self.postings[term][position] = count
+            length = sum(terms.values())
+            self.lengths.append(length)
+            self.total_length += length
+
+    def remove(self, doc_ids) -> None:
+        """Drop documents from the postings; their positions stay as tombstones"""
+        for doc_id in doc_ids:
+            position = self.ids.pop(doc_id, None)
+            if position is None:
+                continue
+            for term in self.terms(self.docs[position]):
+                postings = self.postings[term]
+                postings.pop(position, None)
+                if not postings:
+                    del self.postings[term]
+            self.total_length -= self.lengths[position]
+            self.docs[position] = None
+
+    def search(self, query: str, k: int = 10, where: dict = None, codes=None) -> list:
+        """BM25-ranked documents, optionally restricted by metadata and ACE code"""
+        if not self.ids:
+            return []
+        average_length = self.total_length / len(self.ids)
+        # With codes given, only documents carrying one of them are scored
+        candidates = None
+        if codes:
+            candidates = set()
+            for code in codes:
+                candidates.update(self.postings.get(code.lower(), ()))
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.ids) - len(postings) + 0.5) / (len(postings) + 0.5))
+            if candidates is not None:
+                postings = {p: postings[p] for p in candidates if p in postings}
+            for position, tf in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / average_length)
+                scores[position] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = []
+        for position in sorted(scores, key=scores.get, reverse=True):
+            doc = self.docs[position]
+            if codes and doc.metadata.get("code", "").upper() not in codes:
+                continue
+            if where and not matches(doc.metadata, where):
+                continue
+            ranked.append(doc)
+            if len(ranked) >= k:
+                break
+        return ranked
+
+
+class HybridRetriever:
+    """Fuse BM25 and vector rankings; exact ACE code lookups skip the vector search"""
+
+    def __init__(self, vectorstore, keyword_index: KeywordIndex = None):
+        self.vectorstore = vectorstore
+        self.keyword_index = keyword_index or KeywordIndex.from_vectorstore(vectorstore)
+
+    def refresh(self) -> None:
+        """Catch the keyword index up with documents added to or deleted from
+        the collection. Ids are compared rather than counts, which would miss
+        a sync that deletes and adds the same number of documents."""
+        self.keyword_index.refresh(self.vectorstore)
+
+    def search_critical(
+        self,
+        query: str,
+        k: int = 5,
+        severities=CRITICAL_SEVERITIES,
+        where: dict = None,
+        fetch_k: int = 50,
+        max_fetch_k: int = MAX_FETCH_K,
+    ) -> list:
+        where_filter = severity_filter(severities, where)
+        self.refresh()
+
+        codes = {code.upper() for code in ACE_CODE.findall(query)}
+        if codes:
+            hits = distinct_templates(
+                self.keyword_index.search(query, k=fetch_k, where=where_filter, codes=codes), limit=k
+            )
+            if hits:
+                return hits
+
+        # Raw candidates for fusion; templates are de-duplicated after fusing.
+        # Repeats of one template share a vector and can fill every candidate
+        # slot, so both fetches double until k distinct templates come back
+        query_vector = self.vectorstore.embeddings.embed_query(query)
+        while True:
+            keyword_hits = self.keyword_index.search(query, k=fetch_k, where=where_filter)
+            vector_hits = self.vectorstore.similarity_search_by_vector(query_vector, k=fetch_k, filter=where_filter)
+            hits = distinct_templates(reciprocal_rank_fusion(keyword_hits, vector_hits), limit=k)
+            exhausted = len(keyword_hits) < fetch_k and len(vector_hits) < fetch_k
+            if len(hits) >= k or exhausted or fetch_k >= max_fetch_k:
+                return hits
+            fetch_k = min(2 * fetch_k, max_fetch_k)
@@ -12,17 +12,21 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import logging
 import httpx
 import json
+import os
+import re
 import sys
+import time
 
-from typing import Any
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Optional
 from mcp.server.fastmcp import FastMCP
 
-# Initialize FastMCP server
-mcp = FastMCP("mqmcpserver")
-
 # Change this to point to your mqweb server
 URL_BASE = "https://localhost:9443/ibmmq/rest/v3/admin/"
 
@@ -30,72 +34,504 @@ URL_BASE = "https://localhost:9443/ibmmq/rest/v3/admin/"
 USER_NAME = "mqreader"
 PASSWORD = "mqreader"
 
+# mqweb accepts any value for the CSRF header, it only has to be present
+CSRF_TOKEN = "token"
+
+# Limits for the shared HTTP client
+MAX_CONNECTIONS = int(os.environ.get("MQ_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("MQ_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.environ.get("MQ_KEEPALIVE_EXPIRY", "60"))
+REQUEST_TIMEOUT = 30.0
+
+# Default number of MQSC commands in flight at once for runmqsc_batch
+BATCH_CONCURRENCY = int(os.environ.get("MQ_BATCH_CONCURRENCY", "10"))
+
+# Background status snapshot: seconds between polls (0 disables) and number of changes kept
+SNAPSHOT_INTERVAL = float(os.environ.get("MQ_SNAPSHOT_INTERVAL", "30"))
+SNAPSHOT_HISTORY = int(os.environ.get("MQ_SNAPSHOT_HISTORY", "1000"))
+# Oldest snapshot the status tools answer from; defaults to two poll intervals
+SNAPSHOT_MAX_AGE = float(os.environ.get("MQ_SNAPSHOT_MAX_AGE", str(2 * SNAPSHOT_INTERVAL)))
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One client per process so TLS sessions and connections are reused across tool calls
+_client = None
+_client_lock = asyncio.Lock()
+
+async def login(client: httpx.AsyncClient) -> bool:
+    """Swap basic auth for an LTPA token cookie so mqweb does not re-authenticate every request.
+    Falls back to basic auth if token login is not available.
+    """
+    login_url = URL_BASE.split("/admin/")[0] + "/login"
+    try:
+        response = await client.post(login_url, json={"username": USER_NAME, "password": PASSWORD}, auth=None)
+        response.raise_for_status()
+    except Exception as err:
+        print(f"Token login failed, using basic auth: {err}", file=sys.stderr)
+        client.auth = httpx.BasicAuth(username=USER_NAME, password=PASSWORD)
+        return False
+    client.auth = None
+    return True
+
+async def get_client() -> httpx.AsyncClient:
+    global _client
+    async with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.AsyncClient(
+                base_url=URL_BASE,
+                verify=False,
+                auth=httpx.BasicAuth(username=USER_NAME, password=PASSWORD),
+                headers={
+                    "Content-Type": "application/json",
+                    "ibm-mq-rest-csrf-token": CSRF_TOKEN
+                },
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY
+                ),
+                http2=HTTP2_AVAILABLE,
+                timeout=REQUEST_TIMEOUT
+            )
+            await login(_client)
+        return _client
+
+async def close_client() -> None:
+    global _client
+    async with _client_lock:
+        if _client is not None:
+            await _client.aclose()
+            _client = None
+
+async def mq_request(method: str, path: str, **kwargs) -> httpx.Response:
+    """Send a request to mqweb on the shared client, logging in again once if the token has expired"""
+    client = await get_client()
+    response = await client.request(method, path, **kwargs)
+    if response.status_code == 401 and client.auth is None:
+        async with _client_lock:
+            await login(client)
+        response = await client.request(method, path, **kwargs)
+    response.raise_for_status()
+    return response
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    mq_snapshot.start()
+    try:
+        yield
+    finally:
+        await mq_snapshot.stop()
+        await close_client()
+
+# Initialize FastMCP server
+mcp = FastMCP("mqmcpserver", lifespan=lifespan)
+
+async def run_mqsc(qmgr_name: str, mqsc_command: str) -> dict[str, Any]:
+    """Run an MQSC command through mqweb and return the decoded JSON response"""
+    data = {"type": "runCommand", "parameters": {"command": mqsc_command}}
+    response = await mq_request("POST", "action/qmgr/" + qmgr_name + "/mqsc", json=data)
+    return response.json()
+
 @mcp.tool()
-async def dspmq() -> str:
-    """List available queue managers and whether they are running or not
+async def dspmq(output_format: str = "text", live: bool = False) -> str | list[dict[str, Any]]:
+    """List available queue managers and whether they are running or not.
+    Answers from the background status snapshot while it is being kept up to date.
+
+    Args:
+        output_format: "text" for readable output or "json" for a list of {name, state} records
+        live: Query mqweb directly instead of using the snapshot
     """
-    headers = {
-        "Content-Type": "application/json",
-        "ibm-mq-rest-csrf-token": "token"
-    }    
-    
-    url = URL_BASE + "qmgr/"
-
-    auth = httpx.BasicAuth(username=USER_NAME, password=PASSWORD)
-    async with httpx.AsyncClient(verify=False,auth=auth) as client:
-        try:            
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return prettify_dspmq(response.content)
-        except Exception as err:
-            print(err, file=sys.stderr)
-            return "Something went wrong!"
-                        
-# Put the output of for each queue manager on its own line, separated by ---                        
-def prettify_dspmq(payload: str) -> str:
+    if not live and mq_snapshot.fresh():
+        qmgrs = [{"name": name, "state": qmgr["state"]} for name, qmgr in mq_snapshot.qmgrs.items()]
+        if output_format == "json":
+            return qmgrs
+        lines = ["name = " + x['name'] + ", running = " + x['state'] for x in qmgrs]
+        return (f"(snapshot {mq_snapshot.age():.0f}s old)\n---\n"
+                + "".join(line + "\n---\n" for line in lines))
+    try:
+        response = await mq_request("GET", "qmgr/")
+        if output_format == "json":
+            return parse_dspmq(response.content)
+        return prettify_dspmq(response.content)
+    except Exception as err:
+        print(err, file=sys.stderr)
+        return "Something went wrong!"
+
+# One record per queue manager, e.g. {"name": "QM1", "state": "running"}
+def parse_dspmq(payload: bytes) -> list[dict[str, Any]]:
     jsonOutput = json.loads(payload.decode("utf-8"))
-    prettifiedOutput="\n---\n"
-    for x in jsonOutput['qmgr']:
-      prettifiedOutput += "name = " + x['name'] + ", running = " + x['state'] + "\n---\n"
-    
-    return prettifiedOutput
+    return [{"name": x['name'], "state": x['state']} for x in jsonOutput['qmgr']]
+
+# Put the output of for each queue manager on its own line, separated by ---                        
+def prettify_dspmq(payload: bytes) -> str:
+    lines = ["name = " + x['name'] + ", running = " + x['state'] for x in parse_dspmq(payload)]
+    return "\n---\n" + "".join(line + "\n---\n" for line in lines)
     
 @mcp.tool()
-async def runmqsc(qmgr_name: str, mqsc_command: str) -> str:
+async def runmqsc(qmgr_name: str, mqsc_command: str, output_format: str = "text") -> str | list[dict[str, Any]]:
     """Run an MQSC command against a specific queue manager
 
     Args:
         qmgr_name: A queue manager name   
         mqsc_command: An MQSC command to run on the queue manager   
+        output_format: "text" for the raw MQSC output or "json" for one record of typed attributes
+            (e.g. {"QUEUE": "Q1", "CURDEPTH": 3, "MAXDEPTH": 5000}) per object
     """
-    headers = {
-        "Content-Type": "application/json",
-        "ibm-mq-rest-csrf-token": "a"
-    }
-    
-    data = "{\"type\":\"runCommand\",\"parameters\":{\"command\":\"" + mqsc_command + "\"}}"
-    
-    url = URL_BASE + "action/qmgr/" + qmgr_name + "/mqsc"
-
-    auth = httpx.BasicAuth(username=USER_NAME, password=PASSWORD)
-    async with httpx.AsyncClient(verify=False,auth=auth) as client:
-        try:            
-            response = await client.post(url, data=data, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return prettify_runmqsc(response.content)
-        except Exception as err:
-            print(err, file=sys.stderr)
-            return "Something went wrong!"
+    try:
+        payload = await run_mqsc(qmgr_name, mqsc_command)
+        if output_format == "json":
+            return parse_runmqsc(payload)
+        return prettify_runmqsc(payload)
+    except Exception as err:
+        print(err, file=sys.stderr)
+        return "Something went wrong!"
+
+# Matches MQSC attributes such as CURDEPTH(12), STATUS(RUNNING) or CONNAME(host(1414)),
+# allowing one level of nested parentheses and quoted values
+MQSC_ATTRIBUTE = re.compile(r"([A-Z][A-Z0-9_.]*)\(((?:'(?:[^']|'')*'|\([^()]*\)|[^()'])*)\)")
+MQSC_INTEGER = re.compile(r"-?\d+")
+
+# Only these attributes are counts or sizes; object names such as QUEUE(0001) stay strings
+MQSC_NUMERIC_ATTRIBUTES = {
+    "CURDEPTH", "MAXDEPTH", "MSGS", "CURMSGS", "IPPROCS", "OPPROCS", "UNCOM",
+    "MAXMSGL", "DEFPRTY", "QDEPTHHI", "QDEPTHLO", "BOTHRESH", "MSGAGE",
+    "BATCHES", "BATCHSZ", "BYTSSENT", "BYTSRCVD", "BUFSSENT", "BUFSRCVD",
+    "LONGRTS", "SHORTRTS", "HBINT", "DISCINT", "CURSHCNV", "MAXSHCNV", "SHARECNV",
+    "MAXINST", "MAXINSTC", "INDOUBT",
+}
+
+def mqsc_value(name: str, value: str) -> Any:
+    """Unquote 'quoted' values (un-doubling '') and convert numeric attributes to int"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    if name in MQSC_NUMERIC_ATTRIBUTES and MQSC_INTEGER.fullmatch(value):
+        return int(value)
+    return value
+
+def parse_mqsc_text(text: str) -> dict[str, Any]:
+    """Turn one MQSC response text into a record of attributes.
+    The AMQ message line is kept under "message", counts and sizes become ints.
+    """
+    message, _, body = text.partition("\n")
+    record = {"message": message.strip()}
+    for name, value in MQSC_ATTRIBUTE.findall(body):
+        record[name] = mqsc_value(name, value)
+    return record
+
+# One record per object in the response
+# For the moment this will not work against z/OS queue managers which use a slightly different format.
+def parse_runmqsc(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    return [parse_mqsc_text(x['text'][0]) for x in payload.get('commandResponse', [])]
             
 # Put the output of each MQSC command on its own line, separated by ---
 # For the moment this will not work against z/OS queue managers which use a slightly different format.
-def prettify_runmqsc(payload: str) -> str:
-    jsonOutput = json.loads(payload.decode("utf-8"))
-    prettifiedOutput="\n---\n"
-    for x in jsonOutput['commandResponse']:
-      prettifiedOutput += x['text'][0] + "\n---\n"
-    
-    return prettifiedOutput    
+def prettify_runmqsc(payload: dict[str, Any]) -> str:
+    return "\n---\n" + "".join(x['text'][0] + "\n---\n" for x in payload['commandResponse'])
+
+async def fetch_queues(qmgr_name: str, queue_pattern: str = "*") -> list[dict[str, Any]]:
+    """Current and maximum depth of the local queues matching a pattern"""
+    records = parse_runmqsc(await run_mqsc(qmgr_name, f"DISPLAY QLOCAL({queue_pattern}) CURDEPTH MAXDEPTH"))
+    queues = []
+    for record in records:
+        if "QUEUE" not in record or not isinstance(record.get("CURDEPTH"), int):
+            continue
+        maxdepth = record.get("MAXDEPTH")
+        queues.append({
+            "queue": record["QUEUE"],
+            "curdepth": record["CURDEPTH"],
+            "maxdepth": maxdepth,
+            "depth_pct": round(100 * record["CURDEPTH"] / maxdepth, 1) if isinstance(maxdepth, int) and maxdepth else None
+        })
+    return queues
+
+async def fetch_channels(qmgr_name: str, channel_pattern: str = "*") -> list[dict[str, Any]]:
+    """Status of the channel instances matching a pattern, with lower-cased attribute names"""
+    records = parse_runmqsc(await run_mqsc(qmgr_name, f"DISPLAY CHSTATUS({channel_pattern}) STATUS"))
+    return [
+        {key.lower(): value for key, value in record.items() if key != "message"}
+        for record in records if "CHANNEL" in record
+    ]
+
+def summarize_queues(qmgr_name: str, queues: list[dict[str, Any]], min_depth: int, top: int) -> dict[str, Any]:
+    matching = [q for q in queues if q["curdepth"] >= min_depth]
+    matching.sort(key=lambda q: q["curdepth"], reverse=True)
+    return {
+        "qmgr": qmgr_name,
+        "queues_scanned": len(queues),
+        "queues_matching": len(matching),
+        "total_depth": sum(q["curdepth"] for q in queues),
+        "queues": matching[:max(0, top)]
+    }
+
+def summarize_channels(qmgr_name: str, channels: list[dict[str, Any]], status: Optional[str]) -> dict[str, Any]:
+    counts = {}
+    for channel in channels:
+        counts[channel.get("status", "UNKNOWN")] = counts.get(channel.get("status", "UNKNOWN"), 0) + 1
+    if status:
+        channels = [c for c in channels if str(c.get("status", "")).upper() == status.upper()]
+    return {
+        "qmgr": qmgr_name,
+        "status_counts": counts,
+        "channels": channels
+    }
+
+@mcp.tool()
+async def queue_depths(qmgr_name: str, queue_pattern: str = "*", min_depth: int = 0, top: int = 20,
+                       live: bool = False) -> dict[str, Any]:
+    """Show the deepest local queues on a queue manager, sorted by current depth.
+    Filtering and sorting happen in the server, so only the interesting queues are returned.
+    Answers from the background status snapshot for queue_pattern "*" unless live is set.
+
+    Args:
+        qmgr_name: A queue manager name
+        queue_pattern: Queue name or generic pattern, e.g. "APP.*"
+        min_depth: Only include queues with at least this many messages
+        top: Maximum number of queues to return
+        live: Query mqweb directly instead of using the snapshot
+    """
+    qmgr = mq_snapshot.qmgrs.get(qmgr_name)
+    if not live and queue_pattern == "*" and mq_snapshot.fresh() and qmgr is not None and "queues" in qmgr:
+        result = summarize_queues(qmgr_name, list(qmgr["queues"].values()), min_depth, top)
+        result["snapshot_age_seconds"] = round(mq_snapshot.age(), 1)
+        return result
+    try:
+        return summarize_queues(qmgr_name, await fetch_queues(qmgr_name, queue_pattern), min_depth, top)
+    except Exception as err:
+        print(err, file=sys.stderr)
+        return {"qmgr": qmgr_name, "error": str(err)}
+
+@mcp.tool()
+async def channel_status(qmgr_name: str, channel_pattern: str = "*", status: Optional[str] = None,
+                         live: bool = False) -> dict[str, Any]:
+    """Summarise channel status on a queue manager, optionally only channels in one status.
+    Answers from the background status snapshot for channel_pattern "*" unless live is set.
+
+    Args:
+        qmgr_name: A queue manager name
+        channel_pattern: Channel name or generic pattern, e.g. "TO.*"
+        status: Only return channels in this status, e.g. "RETRYING" or "STOPPED"
+        live: Query mqweb directly instead of using the snapshot
+    """
+    qmgr = mq_snapshot.qmgrs.get(qmgr_name)
+    if not live and channel_pattern == "*" and mq_snapshot.fresh() and qmgr is not None and "channels" in qmgr:
+        result = summarize_channels(qmgr_name, list(qmgr["channels"].values()), status)
+        result["snapshot_age_seconds"] = round(mq_snapshot.age(), 1)
+        return result
+    try:
+        return summarize_channels(qmgr_name, await fetch_channels(qmgr_name, channel_pattern), status)
+    except Exception as err:
+        print(err, file=sys.stderr)
+        return {"qmgr": qmgr_name, "error": str(err)}
+
+class MQSnapshot:
+    """In-memory view of queue manager state, queue depths and channel status.
+    A background task re-polls mqweb every interval. The version number only
+    increases when something changed, and the changes themselves are kept so
+    clients can ask for just the deltas since a version they already have.
+    """
+
+    def __init__(self, interval: float = SNAPSHOT_INTERVAL, history: int = SNAPSHOT_HISTORY,
+                 max_age: float = SNAPSHOT_MAX_AGE):
+        self.interval = interval
+        self.max_age = max_age
+        self.version = 0
+        self.qmgrs: dict[str, dict[str, Any]] = {}
+        self.updated_at: Optional[float] = None
+        self.changes = deque(maxlen=history)
+        # Newest version with a change that fell out of the history
+        self.dropped_version = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def age(self) -> Optional[float]:
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    def fresh(self) -> bool:
+        """True while the background poller is running and the last poll is recent.
+        Without the poller (interval 0) a one-off snapshot would never be refreshed,
+        so the status tools must query mqweb instead."""
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self.updated_at is not None
+            and self.age() <= self.max_age
+        )
+
+    async def poll_qmgr(self, name: str, state: str, previous: dict[str, Any]) -> dict[str, Any]:
+        qmgr = {"state": state}
+        if state != "running":
+            return qmgr
+        try:
+            queues, channels = await asyncio.gather(fetch_queues(name), fetch_channels(name))
+            qmgr["queues"] = {q["queue"]: q for q in queues}
+            # SVRCONN channels can have many instances, so key instances by connection name too
+            qmgr["channels"] = {
+                c["channel"] + (f"({c['conname']})" if c.get("conname") else ""): c for c in channels
+            }
+        except Exception as err:
+            print(f"{name}: {err}", file=sys.stderr)
+            qmgr["error"] = str(err)
+            # Keep the last known queues and channels rather than reporting them all as removed
+            for key in ("queues", "channels"):
+                if key in previous:
+                    qmgr[key] = previous[key]
+        return qmgr
+
+    async def poll(self) -> None:
+        """Poll every queue manager once and record what changed"""
+        async with self._lock:
+            response = await mq_request("GET", "qmgr/")
+            semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+            async def poll_one(x: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+                async with semaphore:
+                    return x['name'], await self.poll_qmgr(x['name'], x['state'], self.qmgrs.get(x['name'], {}))
+
+            qmgrs = dict(await asyncio.gather(*(poll_one(x) for x in parse_dspmq(response.content))))
+            if not self.version:
+                # The first poll is the baseline, not a list of changes; deltas
+                # before it cannot be served, so a client at version 0 is truncated
+                self.version = self.dropped_version = 1
+                changes = []
+            else:
+                changes = diff_snapshots(self.qmgrs, qmgrs)
+            if changes:
+                self.version += 1
+                for change in changes:
+                    change["version"] = self.version
+                    if len(self.changes) == self.changes.maxlen:
+                        # Appending drops the oldest change (or this one, with no history)
+                        self.dropped_version = self.changes[0]["version"] if self.changes else self.version
+                    self.changes.append(change)
+            self.qmgrs = qmgrs
+            self.updated_at = time.time()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as err:
+                print(f"Snapshot poll failed: {err}", file=sys.stderr)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+def diff_snapshots(old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """List queue manager state, queue depth and channel status changes between two polls"""
+    changes = []
+    for name in sorted(set(old) | set(new)):
+        before, after = old.get(name, {}), new.get(name, {})
+        if before.get("state") != after.get("state"):
+            changes.append({"qmgr": name, "kind": "qmgr", "name": name, "field": "state",
+                            "old": before.get("state"), "new": after.get("state")})
+        for kind, key, field in (("queue", "queues", "curdepth"), ("channel", "channels", "status")):
+            old_objects, new_objects = before.get(key, {}), after.get(key, {})
+            for object_name in sorted(set(old_objects) | set(new_objects)):
+                old_value = old_objects.get(object_name, {}).get(field)
+                new_value = new_objects.get(object_name, {}).get(field)
+                if old_value != new_value:
+                    changes.append({"qmgr": name, "kind": kind, "name": object_name, "field": field,
+                                    "old": old_value, "new": new_value})
+    return changes
+
+mq_snapshot = MQSnapshot()
+
+@mcp.tool()
+async def mq_status_snapshot(qmgr_name: Optional[str] = None) -> dict[str, Any]:
+    """Return the background snapshot of queue managers, queue depths and channel status, with its age.
+    Much cheaper than re-running DISPLAY commands while polling during an incident.
+
+    Args:
+        qmgr_name: Only return this queue manager; defaults to all of them
+    """
+    if not mq_snapshot.fresh():
+        # No poller, or it has fallen behind: refresh on demand
+        await mq_snapshot.poll()
+    qmgrs = mq_snapshot.qmgrs
+    if qmgr_name:
+        qmgrs = {qmgr_name: qmgrs[qmgr_name]} if qmgr_name in qmgrs else {}
+    return {
+        "version": mq_snapshot.version,
+        "updated_at": datetime.fromtimestamp(mq_snapshot.updated_at).isoformat(),
+        "age_seconds": round(mq_snapshot.age(), 1),
+        "qmgrs": qmgrs
+    }
+
+@mcp.tool()
+async def mq_changes_since(version: int) -> dict[str, Any]:
+    """Return only what changed in the MQ status snapshot after a given version.
+    Pass the version from a previous mq_status_snapshot or mq_changes_since call.
+    If "truncated" is true, older changes were dropped and a full snapshot should be fetched.
+
+    Args:
+        version: The snapshot version the client already has
+    """
+    changes = [change for change in mq_snapshot.changes if change["version"] > version]
+    return {
+        "version": mq_snapshot.version,
+        "age_seconds": round(mq_snapshot.age(), 1) if mq_snapshot.updated_at else None,
+        # A change the client has not seen yet was dropped from the history
+        "truncated": version < mq_snapshot.dropped_version,
+        "changes": changes
+    }
+
+@mcp.tool()
+async def runmqsc_batch(mqsc_commands: list[str], qmgr_names: Optional[list[str]] = None,
+                        max_concurrency: int = BATCH_CONCURRENCY, output_format: str = "text") -> list[dict[str, Any]]:
+    """Run MQSC commands against many queue managers at once.
+    Every command is run on every queue manager. A failing queue manager only
+    marks its own entries as errors, the rest of the batch still completes.
+
+    Args:
+        mqsc_commands: MQSC commands to run on each queue manager
+        qmgr_names: Queue manager names; defaults to every running queue manager
+        max_concurrency: Maximum number of commands in flight at once
+        output_format: "text" for raw output lines or "json" for typed attribute records
+    """
+    if not qmgr_names:
+        response = await mq_request("GET", "qmgr/")
+        qmgr_names = [x['name'] for x in parse_dspmq(response.content) if x['state'] == "running"]
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_one(qmgr_name: str, mqsc_command: str) -> dict[str, Any]:
+        result = {"qmgr": qmgr_name, "command": mqsc_command}
+        async with semaphore:
+            try:
+                payload = await run_mqsc(qmgr_name, mqsc_command)
+                result["status"] = "ok"
+                result["completion_code"] = payload.get('overallCompletionCode')
+                result["reason_code"] = payload.get('overallReasonCode')
+                if output_format == "json":
+                    result["records"] = parse_runmqsc(payload)
+                else:
+                    result["output"] = [x['text'][0] for x in payload.get('commandResponse', [])]
+            except Exception as err:
+                print(f"{qmgr_name}: {err}", file=sys.stderr)
+                result["status"] = "error"
+                result["error"] = str(err)
+        return result
+
+    return list(await asyncio.gather(*(run_one(qmgr_name, mqsc_command)
+                                       for qmgr_name in qmgr_names
+                                       for mqsc_command in mqsc_commands)))
 
 if __name__ == "__main__":
     print("Starting MQ MCP Server...", file=sys.stderr)
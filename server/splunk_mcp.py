@@ -1,16 +1,25 @@
 # Import packages
+import asyncio
+import functools
 import json
 import logging
 import os
+import re
 import ssl
+import threading
+import time
 import traceback
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union
 
 import splunklib.client
 from decouple import config
 from mcp.server.fastmcp import FastMCP
 from splunklib import results
+from splunklib.binding import HTTPError
 import sys
 import socket
 from fastapi import FastAPI, APIRouter, Request
@@ -21,6 +30,8 @@ from mcp.server.sse import SseServerTransport
 from starlette.routing import Mount
 import uvicorn
 
+from splunk_config import SPLUNK_CONFIG
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -289,11 +300,43 @@ SPLUNK_PASSWORD = os.environ.get("SPLUNK_PASSWORD", "admin")
 VERIFY_SSL = config("VERIFY_SSL", default="true", cast=bool)
 SPLUNK_TOKEN = os.environ.get("SPLUNK_TOKEN")  # New: support for token-based auth
 
+# Connection pool settings
+SPLUNK_POOL_SIZE = int(os.environ.get("SPLUNK_POOL_SIZE", "4"))
+SPLUNK_POOL_TIMEOUT = float(os.environ.get("SPLUNK_POOL_TIMEOUT", "30"))
+SPLUNK_KEEPALIVE_INTERVAL = float(os.environ.get("SPLUNK_KEEPALIVE_INTERVAL", "300"))
+SPLUNK_SESSION_TTL = float(os.environ.get("SPLUNK_SESSION_TTL", "3000"))
+
+# Async search settings
+SPLUNK_WORKER_THREADS = int(os.environ.get("SPLUNK_WORKER_THREADS", "8"))
+SPLUNK_SEARCH_TIMEOUT = float(os.environ.get("SPLUNK_SEARCH_TIMEOUT", "300"))
+SPLUNK_POLL_INTERVAL = float(os.environ.get("SPLUNK_POLL_INTERVAL", "2"))
+SPLUNK_MAX_PAGE_SIZE = int(os.environ.get("SPLUNK_MAX_PAGE_SIZE", "1000"))
+
+# Search result cache settings
+SPLUNK_CACHE_TTL = float(os.environ.get("SPLUNK_CACHE_TTL", "60"))
+SPLUNK_CACHE_MAX_BYTES = int(os.environ.get("SPLUNK_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+SPLUNK_CACHE_SNAP_SECONDS = int(os.environ.get("SPLUNK_CACHE_SNAP_SECONDS", "60"))
+
+# Search job tracking settings
+SPLUNK_JOB_TTL = int(os.environ.get("SPLUNK_JOB_TTL", "600"))
+SPLUNK_MAX_TRACKED_JOBS = int(os.environ.get("SPLUNK_MAX_TRACKED_JOBS", "20"))
+
+# Batch search settings
+SPLUNK_BATCH_CONCURRENCY = int(os.environ.get("SPLUNK_BATCH_CONCURRENCY", "4"))
+
+# Index/sourcetype catalog settings
+SPLUNK_CATALOG_REFRESH_INTERVAL = float(os.environ.get("SPLUNK_CATALOG_REFRESH_INTERVAL", "900"))
+SPLUNK_CATALOG_TIME_RANGE = os.environ.get("SPLUNK_CATALOG_TIME_RANGE", "-24h")
+
 def get_splunk_connection() -> splunklib.client.Service:
     """
     Get a connection to the Splunk service.
     Supports both username/password and token-based authentication.
     If SPLUNK_TOKEN is set, it will be used for authentication and username/password will be ignored.
+
+    Tools should not call this directly; use splunk_pool.connection() so the
+    logged-in session is reused across calls.
+
     Returns:
         splunklib.client.Service: Connected Splunk service
     """
@@ -305,7 +348,8 @@ def get_splunk_connection() -> splunklib.client.Service:
                 port=SPLUNK_PORT,
                 scheme=SPLUNK_SCHEME,
                 verify=VERIFY_SSL,
-                token=f"Bearer {SPLUNK_TOKEN}"
+                token=f"Bearer {SPLUNK_TOKEN}",
+                autologin=True
             )
         else:
             username = os.environ.get("SPLUNK_USERNAME", "admin")
@@ -316,7 +360,8 @@ def get_splunk_connection() -> splunklib.client.Service:
                 username=username,
                 password=SPLUNK_PASSWORD,
                 scheme=SPLUNK_SCHEME,
-                verify=VERIFY_SSL
+                verify=VERIFY_SSL,
+                autologin=True
             )
         logger.debug(f"[OK] Connected to Splunk successfully")
         return service
@@ -324,19 +369,623 @@ def get_splunk_connection() -> splunklib.client.Service:
         logger.error(f"[ERROR] Failed to connect to Splunk: {str(e)}")
         raise
 
+class PooledSession:
+    """A logged-in Splunk service together with its session bookkeeping"""
+
+    def __init__(self, service: splunklib.client.Service):
+        self.service = service
+        self.token = service.token
+        self.logged_in_at = time.monotonic()
+        self.last_used = self.logged_in_at
+
+class SplunkConnectionPool:
+    """
+    Thread-safe pool of logged-in Splunk services shared by all MCP tools.
+
+    Idle services keep their session token and are handed out again instead of
+    doing a login round-trip per call. Sessions that have been idle for longer
+    than the keepalive interval are pinged before reuse, sessions older than the
+    session TTL are logged in again proactively, and sessions rejected by Splunk
+    are re-established by splunklib's autologin.
+    """
+
+    def __init__(self, factory, max_size: int = SPLUNK_POOL_SIZE, acquire_timeout: float = SPLUNK_POOL_TIMEOUT,
+                 keepalive_interval: float = SPLUNK_KEEPALIVE_INTERVAL, session_ttl: float = SPLUNK_SESSION_TTL):
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._acquire_timeout = acquire_timeout
+        self._keepalive_interval = keepalive_interval
+        self._session_ttl = session_ttl
+        self._idle: List[PooledSession] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "relogins": 0,
+            "keepalive_checks": 0,
+            "discarded": 0,
+            "waits": 0,
+        }
+
+    def _acquire(self) -> PooledSession:
+        deadline = time.monotonic() + self._acquire_timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._stats["hits"] += 1
+                    break
+                if self._size < self._max_size:
+                    self._size += 1
+                    self._stats["misses"] += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out after {self._acquire_timeout}s waiting for a pooled Splunk connection")
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+
+        try:
+            if entry is None:
+                logger.debug(f"[POOL] Opening new Splunk session ({self._size}/{self._max_size})")
+                return PooledSession(self._factory())
+            self._refresh(entry)
+            return entry
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _refresh(self, entry: PooledSession) -> None:
+        """Re-login sessions past their TTL and ping sessions idle past the keepalive interval"""
+        now = time.monotonic()
+        if now - entry.logged_in_at >= self._session_ttl:
+            logger.debug("[POOL] Session TTL reached, logging in again")
+            entry.service.login()
+            self._record_login(entry)
+        elif now - entry.last_used >= self._keepalive_interval:
+            self._count("keepalive_checks")
+            try:
+                entry.service.get("/services/authentication/current-context", output_mode="json").body.read()
+            except (ConnectionError, ssl.SSLError, socket.timeout) as e:
+                logger.warning(f"[WARN] Pooled Splunk session failed keepalive, reconnecting: {str(e)}")
+                self._count("discarded")
+                entry.service = self._factory()
+                entry.token = entry.service.token
+                entry.logged_in_at = time.monotonic()
+            self._check_token(entry)
+
+    def _count(self, name: str) -> None:
+        # Counters are updated from many worker threads
+        with self._cond:
+            self._stats[name] += 1
+
+    def _record_login(self, entry: PooledSession) -> None:
+        self._count("relogins")
+        entry.token = entry.service.token
+        entry.logged_in_at = time.monotonic()
+
+    def _check_token(self, entry: PooledSession) -> None:
+        # autologin swaps the session token when Splunk rejects an expired session
+        if entry.service.token != entry.token:
+            logger.debug("[POOL] Session token was renewed by autologin")
+            self._record_login(entry)
+
+    def _release(self, entry: PooledSession) -> None:
+        self._check_token(entry)
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _discard(self, entry: PooledSession) -> None:
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a logged-in Splunk service for the duration of a with-block.
+
+        Connection-level failures (dropped connections, SSL errors) drop the
+        session from the pool; any other exception returns it for reuse.
+        """
+        entry = self._acquire()
+        try:
+            yield entry.service
+        except (ConnectionError, ssl.SSLError):
+            self._discard(entry)
+            raise
+        except BaseException:
+            self._release(entry)
+            raise
+        else:
+            self._release(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters and current occupancy"""
+        with self._cond:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self._max_size,
+            }
+
+# Shared by every tool in this process
+splunk_pool = SplunkConnectionPool(get_splunk_connection)
+
+# Bounded worker pool for blocking splunklib calls so they never run on the event loop
+splunk_executor = ThreadPoolExecutor(max_workers=SPLUNK_WORKER_THREADS, thread_name_prefix="splunk")
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking splunklib call on the Splunk worker pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(splunk_executor, functools.partial(func, *args, **kwargs))
+
+def dispatch_search(search_query: str, **kwargs_search) -> splunklib.client.Job:
+    """Create a search job on a pooled connection without waiting for it to finish"""
+    with splunk_pool.connection() as service:
+        return service.jobs.create(search_query, **kwargs_search)
+
+def cancel_job(job: splunklib.client.Job) -> None:
+    """Cancel a search job on the Splunk side, logging rather than raising on failure"""
+    try:
+        job.cancel()
+        logger.info(f"[SEARCH] Cancelled search job {job.sid}")
+    except Exception as e:
+        logger.warning(f"[WARN] Could not cancel search job {job.sid}: {str(e)}")
+
+async def wait_for_job(job: splunklib.client.Job, timeout: float, cancel_on_abort: bool = True) -> None:
+    """
+    Poll a search job until it is done without blocking the event loop.
+
+    The polling interval starts short and backs off to SPLUNK_POLL_INTERVAL.
+    If the wait times out, or the awaiting task is cancelled because the MCP
+    client went away, the job is cancelled on the Splunk side unless
+    cancel_on_abort is False (used when another caller owns the job).
+
+    Raises:
+        TimeoutError: If the job did not finish within the timeout
+        RuntimeError: If Splunk reports the job as failed
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = min(0.2, SPLUNK_POLL_INTERVAL)
+    try:
+        while not await run_blocking(job.is_done):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Search job {job.sid} did not finish within {timeout}s")
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 1.5, SPLUNK_POLL_INTERVAL)
+    except (asyncio.CancelledError, TimeoutError):
+        # Fire and forget: a cancelled task cannot await the cancellation itself
+        if cancel_on_abort:
+            splunk_executor.submit(cancel_job, job)
+        raise
+
+    if job["isFailed"] == "1":
+        raise RuntimeError(f"Search job {job.sid} failed: {job.content.get('messages', {})}")
+
+def get_job(sid: str) -> splunklib.client.Job:
+    """Look up an existing search job by SID on a pooled connection"""
+    try:
+        with splunk_pool.connection() as service:
+            return service.job(sid)
+    except HTTPError as e:
+        if e.status == 404:
+            raise ValueError(f"Search job not found (it may have expired): {sid}")
+        raise
+
+def read_results_page(job: splunklib.client.Job, offset: int, count: int,
+                      post_process: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch one page of a finished job's results.
+
+    Only the requested page is downloaded, and JSONResultsReader parses that
+    whole page at once, so memory is bounded by the page size (capped by
+    SPLUNK_MAX_PAGE_SIZE), not by the job's result count. A post-process search (for example
+    "| sort - count" or "search host=qm1") re-sorts or filters the job's
+    results on the search head without re-running the search.
+    """
+    kwargs_results = {"output_mode": "json", "offset": offset, "count": count}
+    if post_process:
+        kwargs_results["search"] = post_process
+    stream = job.results(**kwargs_results)
+    page = []
+    for item in results.JSONResultsReader(stream):
+        if isinstance(item, results.Message):
+            logger.debug(f"[SEARCH] {item.type}: {item.message}")
+            continue
+        page.append(item)
+    return page
+
+def build_page(job: splunklib.client.Job, offset: int, page: List[Dict[str, Any]],
+               page_size: Optional[int] = None, post_process: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Wrap a page of results with the cursor needed to fetch the next one.
+
+    With a post-process search the filtered total is unknown, so another page
+    is assumed to exist whenever this one came back full.
+    """
+    next_offset = offset + len(page)
+    if post_process:
+        result_count = None
+        has_more = page_size is not None and len(page) >= page_size
+    else:
+        result_count = int(job["resultCount"])
+        has_more = bool(page) and next_offset < result_count
+    return {
+        "sid": job.sid,
+        "offset": offset,
+        "results": page,
+        "result_count": result_count,
+        "next_cursor": str(next_offset) if has_more else None
+    }
+
+_TIME_UNITS = {
+    "s": "s", "sec": "s", "secs": "s", "second": "s", "seconds": "s",
+    "m": "m", "min": "m", "mins": "m", "minute": "m", "minutes": "m",
+    "h": "h", "hr": "h", "hrs": "h", "hour": "h", "hours": "h",
+    "d": "d", "day": "d", "days": "d",
+    "w": "w", "week": "w", "weeks": "w",
+    "mon": "mon", "month": "mon", "months": "mon",
+    "q": "q", "qtr": "q", "qtrs": "q", "quarter": "q", "quarters": "q",
+    "y": "y", "yr": "y", "yrs": "y", "year": "y", "years": "y",
+}
+_TIME_OFFSET = re.compile(r"([+-])(\d*)([a-zA-Z]+)")
+_TIME_SNAP = re.compile(r"@([a-zA-Z]+)(\d?)")
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    month_index = dt.year * 12 + dt.month - 1 + months
+    year, month = divmod(month_index, 12)
+    for day in range(dt.day, 27, -1):
+        try:
+            return dt.replace(year=year, month=month + 1, day=day)
+        except ValueError:
+            continue
+    return dt.replace(year=year, month=month + 1, day=min(dt.day, 28))
+
+def _snap_time(dt: datetime, unit: str, weekday: str) -> datetime:
+    if unit == "s":
+        return dt.replace(microsecond=0)
+    if unit == "m":
+        return dt.replace(second=0, microsecond=0)
+    if unit == "h":
+        return dt.replace(minute=0, second=0, microsecond=0)
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "d":
+        return day
+    if unit == "w":
+        # Splunk weeks start on Sunday (w0); wN snaps to the most recent weekday N
+        target = int(weekday or 0)
+        days_back = (day.isoweekday() % 7 - target) % 7
+        return day - timedelta(days=days_back)
+    if unit == "mon":
+        return day.replace(day=1)
+    if unit == "q":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day.replace(month=1, day=1)
+
+def resolve_time_modifier(value: str, now: float) -> Optional[float]:
+    """
+    Resolve a Splunk time modifier such as "-24h", "-1d@d", "@w1" or "now" to an epoch timestamp.
+
+    Args:
+        value: The earliest/latest time string passed to the search
+        now: The reference epoch time
+        
+    Returns:
+        The absolute epoch time, or None if the modifier is not understood
+    """
+    value = str(value).strip()
+    if value in ("", "now"):
+        return now
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+
+    dt = datetime.fromtimestamp(now)
+    pos = 0
+    while pos < len(value):
+        offset = _TIME_OFFSET.match(value, pos)
+        snap = _TIME_SNAP.match(value, pos)
+        if offset:
+            sign, amount, unit = offset.groups()
+            unit = _TIME_UNITS.get(unit.lower())
+            if unit is None:
+                return None
+            amount = int(amount or 1) * (-1 if sign == "-" else 1)
+            if unit in ("mon", "q", "y"):
+                dt = _add_months(dt, amount * {"mon": 1, "q": 3, "y": 12}[unit])
+            else:
+                dt += timedelta(seconds=amount * {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}[unit])
+            pos = offset.end()
+        elif snap:
+            unit = _TIME_UNITS.get(snap.group(1).lower())
+            if unit is None:
+                return None
+            dt = _snap_time(dt, unit, snap.group(2))
+            pos = snap.end()
+        else:
+            return None
+    return dt.timestamp()
+
+def normalize_query(search_query: str) -> str:
+    """Collapse whitespace outside quoted strings so equivalent SPL maps to the same text"""
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', search_query.strip())
+    return "".join(part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts))
+
+def search_cache_key(search_query: str, earliest_time: str, latest_time: str, max_results: int) -> tuple:
+    """
+    Build the result cache key for a search.
+
+    Relative time modifiers are resolved to absolute times snapped to
+    SPLUNK_CACHE_SNAP_SECONDS, so "-24h" and "-1d" issued within the same
+    window share an entry. Modifiers that cannot be resolved are kept verbatim.
+    """
+    now = time.time()
+    window = []
+    for value in (earliest_time, latest_time):
+        resolved = resolve_time_modifier(value, now)
+        if resolved is None:
+            window.append(str(value))
+        else:
+            window.append(int(resolved // SPLUNK_CACHE_SNAP_SECONDS * SPLUNK_CACHE_SNAP_SECONDS))
+    return (normalize_query(search_query), window[0], window[1], max_results)
+
+class SearchResultCache:
+    """
+    LRU cache of search results with a TTL and a total size bound in bytes.
+
+    Entry size is the length of the JSON-encoded results; results larger than
+    the whole budget are not cached.
+    """
+
+    def __init__(self, max_bytes: int = SPLUNK_CACHE_MAX_BYTES, ttl: float = SPLUNK_CACHE_TTL):
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "skipped_oversize": 0}
+
+    def _remove(self, key) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[2]
+
+    def put(self, key, value: Any) -> None:
+        size = len(json.dumps(value, default=str))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self._max_bytes:
+                self._stats["skipped_oversize"] += 1
+                return
+            while self._bytes + size > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+            self._entries[key] = (time.monotonic() + self._ttl, size, value)
+            self._bytes += size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+            }
+
+search_cache = SearchResultCache()
+
+class SearchJobRegistry:
+    """
+    Tracks search jobs dispatched by this server so follow-up calls can reuse them.
+
+    Jobs are indexed by SID and by their normalized query and time window.
+    Jobs idle for longer than the TTL, or pushed out by the tracked-job limit,
+    are handed back to the caller for cancellation so they stop holding
+    search-head concurrency slots and dispatch directory space.
+    """
+
+    def __init__(self, ttl: float = SPLUNK_JOB_TTL, max_jobs: int = SPLUNK_MAX_TRACKED_JOBS):
+        self._ttl = ttl
+        self._max_jobs = max(1, max_jobs)
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def _pop(self, sid: str) -> Optional[Dict[str, Any]]:
+        entry = self._jobs.pop(sid, None)
+        if entry is not None and self._by_key.get(entry["key"]) == sid:
+            del self._by_key[entry["key"]]
+        return entry
+
+    def register(self, key: tuple, job: splunklib.client.Job, search_query: str,
+                 earliest_time: str, latest_time: str) -> List[splunklib.client.Job]:
+        """Track a newly dispatched job; returns jobs evicted by the tracked-job limit"""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            self._jobs[job.sid] = {
+                "job": job,
+                "key": key,
+                "search_query": search_query,
+                "earliest_time": earliest_time,
+                "latest_time": latest_time,
+                "created_at": now,
+                "last_access": now,
+            }
+            self._by_key[key] = job.sid
+            while len(self._jobs) > self._max_jobs:
+                evicted.append(self._pop(next(iter(self._jobs)))["job"])
+        return evicted
+
+    def _touch(self, sid: str) -> Optional[splunklib.client.Job]:
+        entry = self._jobs.get(sid)
+        if entry is None:
+            return None
+        entry["last_access"] = time.monotonic()
+        self._jobs.move_to_end(sid)
+        return entry["job"]
+
+    def get(self, sid: str) -> Optional[splunklib.client.Job]:
+        with self._lock:
+            return self._touch(sid)
+
+    def find(self, key: tuple) -> Optional[splunklib.client.Job]:
+        """Return the tracked job for the same query and time window, if any"""
+        with self._lock:
+            sid = self._by_key.get(key)
+            return self._touch(sid) if sid else None
+
+    def remove(self, sid: str) -> Optional[splunklib.client.Job]:
+        with self._lock:
+            entry = self._pop(sid)
+            return entry["job"] if entry else None
+
+    def sweep(self) -> List[splunklib.client.Job]:
+        """Stop tracking and return jobs idle for longer than the TTL"""
+        cutoff = time.monotonic() - self._ttl
+        with self._lock:
+            expired = [sid for sid, entry in self._jobs.items() if entry["last_access"] <= cutoff]
+            return [self._pop(sid)["job"] for sid in expired]
+
+    def list(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "sid": sid,
+                    "search_query": entry["search_query"],
+                    "earliest_time": entry["earliest_time"],
+                    "latest_time": entry["latest_time"],
+                    "age_seconds": round(now - entry["created_at"], 1),
+                    "idle_seconds": round(now - entry["last_access"], 1),
+                }
+                for sid, entry in reversed(self._jobs.items())
+            ]
+
+job_registry = SearchJobRegistry()
+
+def cancel_jobs_in_background(jobs: List[splunklib.client.Job]) -> None:
+    for job in jobs:
+        splunk_executor.submit(cancel_job, job)
+
+async def start_search_job(search_query: str, earliest_time: str, latest_time: str,
+                           timeout: float, reuse_job: bool = True) -> splunklib.client.Job:
+    """
+    Return a finished search job for the query, reusing a tracked job when possible.
+
+    Expired tracked jobs are cancelled first. A reused job that Splunk has
+    already deleted is dropped and the search is dispatched again.
+    """
+    cancel_jobs_in_background(job_registry.sweep())
+    key = search_cache_key(search_query, earliest_time, latest_time, None)[:3]
+
+    job = job_registry.find(key) if reuse_job else None
+    if job is not None:
+        logger.info(f"[SEARCH] Reusing search job {job.sid} for: {search_query}")
+        try:
+            await wait_for_job(job, timeout, cancel_on_abort=False)
+            return job
+        except HTTPError as e:
+            if e.status != 404:
+                raise
+            logger.info(f"[SEARCH] Search job {job.sid} no longer exists, dispatching again")
+            job_registry.remove(job.sid)
+
+    logger.info(f"[SEARCH] Executing search: {search_query}")
+    kwargs_search = {
+        "earliest_time": earliest_time,
+        "latest_time": latest_time,
+        "preview": False,
+        "exec_mode": "normal",
+        # Let Splunk reap the job even if this server never cancels it
+        "timeout": SPLUNK_JOB_TTL
+    }
+    job = await run_blocking(dispatch_search, search_query, **kwargs_search)
+    cancel_jobs_in_background(job_registry.register(key, job, search_query, earliest_time, latest_time))
+    try:
+        await wait_for_job(job, timeout)
+    except BaseException:
+        job_registry.remove(job.sid)
+        raise
+    return job
+
+async def lookup_job(sid: str) -> splunklib.client.Job:
+    """Return a tracked job by SID, falling back to looking it up in Splunk"""
+    job = job_registry.get(sid)
+    if job is None:
+        job = await run_blocking(get_job, sid)
+    return job
+
 @mcp.tool()
-async def search_splunk(search_query: str, earliest_time: str = "-24h", latest_time: str = "now", max_results: int = 100) -> List[Dict[str, Any]]:
+async def search_splunk(search_query: str, earliest_time: str = "-24h", latest_time: str = "now", max_results: int = 100,
+                        timeout: Optional[float] = None, paginate: bool = False,
+                        page_size: int = 100, use_cache: bool = True,
+                        reuse_job: bool = True) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Execute a Splunk search query and return the results.
+
+    The search is dispatched asynchronously and polled, so a slow query does not
+    stall other MCP clients. The job is cancelled in Splunk if it times out or the
+    client disconnects.
+
+    For searches that return many events, set paginate=True: only the first page
+    is returned together with the job SID and a cursor, and further pages are
+    fetched with fetch_search_page. max_results is ignored in that mode.
+
+    Non-paginated results are cached for SPLUNK_CACHE_TTL seconds, keyed on the
+    normalized query, the resolved time window and max_results. Dispatched jobs
+    are tracked by SID, so an identical follow-up search reuses the existing job
+    and its results can be re-paged, re-sorted or filtered with fetch_search_page.
     
     Args:
         search_query: The search query to execute
         earliest_time: Start time for the search (default: 24 hours ago)
         latest_time: End time for the search (default: now)
         max_results: Maximum number of results to return (default: 100)
+        timeout: Seconds to wait for the search before cancelling it (default: SPLUNK_SEARCH_TIMEOUT)
+        paginate: Return the first page and a cursor instead of a capped list (default: False)
+        page_size: Number of results per page when paginating (default: 100)
+        use_cache: Serve and store results in the search result cache (default: True)
+        reuse_job: Reuse a tracked job for the same query and time window (default: True)
         
     Returns:
-        List of search results
+        List of search results, or a page dictionary with sid, results and next_cursor when paginating
     """
     if not search_query:
         raise ValueError("Search query cannot be empty")
@@ -346,77 +995,428 @@ async def search_splunk(search_query: str, earliest_time: str = "-24h", latest_t
     if not (stripped_query.startswith('|') or stripped_query.lower().startswith('search')):
         search_query = f"search {search_query}"
     
+    cache_key = None
+    if use_cache and not paginate:
+        cache_key = search_cache_key(search_query, earliest_time, latest_time, max_results)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"[CACHE] Serving cached results for: {search_query}")
+            return cached
+    
     try:
-        service = get_splunk_connection()
-        logger.info(f"[SEARCH] Executing search: {search_query}")
-        
-        # Create the search job
-        kwargs_search = {
-            "earliest_time": earliest_time,
-            "latest_time": latest_time,
-            "preview": False,
-            "exec_mode": "blocking"
-        }
+        job = await start_search_job(search_query, earliest_time, latest_time,
+                                     timeout or SPLUNK_SEARCH_TIMEOUT, reuse_job=reuse_job)
         
-        job = service.jobs.create(search_query, **kwargs_search)
+        if paginate:
+            page_size = max(1, min(page_size, SPLUNK_MAX_PAGE_SIZE))
+            page = await run_blocking(read_results_page, job, 0, page_size)
+            return build_page(job, 0, page, page_size)
         
         # Get the results
-        result_stream = job.results(output_mode='json', count=max_results)
-        results_data = json.loads(result_stream.read().decode('utf-8'))
-        
-        return results_data.get("results", [])
+        results_data = await run_blocking(read_results_page, job, 0, max_results)
+        if cache_key is not None:
+            search_cache.put(cache_key, results_data)
+        return results_data
         
     except Exception as e:
         logger.error(f"[ERROR] Search failed: {str(e)}")
         raise
 
+_search_quota: Optional[int] = None
+
+def get_search_quota() -> Optional[int]:
+    """
+    Return the current user's concurrent search quota (highest srchJobsQuota across their roles).
+
+    The value is looked up once per process; None means it could not be determined.
+    """
+    global _search_quota
+    if _search_quota is not None:
+        return _search_quota
+    try:
+        with splunk_pool.connection() as service:
+            context = json.loads(service.get("/services/authentication/current-context", output_mode="json").body.read())
+            roles = context["entry"][0]["content"].get("roles", [])
+            quotas = []
+            for role in roles:
+                role_info = json.loads(service.get(f"/services/authorization/roles/{role}", output_mode="json").body.read())
+                quota = int(role_info["entry"][0]["content"].get("srchJobsQuota", 0))
+                if quota > 0:
+                    quotas.append(quota)
+        _search_quota = max(quotas) if quotas else None
+        logger.debug(f"[SEARCH] Concurrent search quota: {_search_quota}")
+    except Exception as e:
+        logger.warning(f"[WARN] Could not determine search quota: {str(e)}")
+    return _search_quota
+
+def expand_query_template(query: str) -> str:
+    """Expand a SPLUNK_CONFIG query template name (e.g. "mq errors") into SPL on the default index"""
+    template = SPLUNK_CONFIG["query_templates"].get(query.strip().lower())
+    if template is None:
+        return query
+    return f'index="{SPLUNK_CONFIG["default_index"]}" {template}'
+
 @mcp.tool()
-async def list_indexes() -> Dict[str, List[str]]:
+async def search_splunk_batch(queries: List[str], earliest_time: str = "-24h", latest_time: str = "now",
+                              max_results: int = 100, max_concurrency: Optional[int] = None,
+                              timeout: Optional[float] = None, use_cache: bool = True) -> Dict[str, Any]:
     """
-    Get a list of all available Splunk indexes.
+    Execute several Splunk searches concurrently and return per-query results.
+
+    Each query is either SPL or the name of a query template such as "mq errors",
+    "channel retries", "queue full" or "dlq issues". A failing query does not
+    fail the batch; its entry carries the error instead.
     
+    Args:
+        queries: The search queries or template names to execute
+        earliest_time: Start time for every search (default: 24 hours ago)
+        latest_time: End time for every search (default: now)
+        max_results: Maximum number of results per query (default: 100)
+        max_concurrency: Searches to run at once, capped by the user's Splunk search quota (default: SPLUNK_BATCH_CONCURRENCY)
+        timeout: Seconds to wait for each search before cancelling it (default: SPLUNK_SEARCH_TIMEOUT)
+        use_cache: Serve and store results in the search result cache (default: True)
+        
     Returns:
-        Dictionary containing list of indexes
+        Dict[str, Any]: Dictionary containing:
+            - searches: Per-query status, results, result count and elapsed seconds, in input order
+            - concurrency: The concurrency limit that was applied
+            - elapsed_seconds: Wall-clock time for the whole batch
+    """
+    if not queries:
+        raise ValueError("At least one search query is required")
+    
+    concurrency = max(1, max_concurrency or SPLUNK_BATCH_CONCURRENCY)
+    quota = await run_blocking(get_search_quota)
+    if quota:
+        concurrency = min(concurrency, quota)
+    semaphore = asyncio.Semaphore(concurrency)
+    logger.info(f"[SEARCH] Running batch of {len(queries)} searches with concurrency {concurrency}")
+    
+    async def run_one(query: str) -> Dict[str, Any]:
+        search_query = expand_query_template(query)
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                results_data = await search_splunk(search_query, earliest_time, latest_time, max_results,
+                                                   timeout=timeout, use_cache=use_cache)
+                return {
+                    "query": query,
+                    "search_query": search_query,
+                    "status": "ok",
+                    "result_count": len(results_data),
+                    "results": results_data,
+                    "elapsed_seconds": round(time.monotonic() - started, 3)
+                }
+            except Exception as e:
+                return {
+                    "query": query,
+                    "search_query": search_query,
+                    "status": "error",
+                    "error": str(e),
+                    "elapsed_seconds": round(time.monotonic() - started, 3)
+                }
+    
+    started = time.monotonic()
+    searches = await asyncio.gather(*(run_one(query) for query in queries))
+    elapsed = round(time.monotonic() - started, 3)
+    
+    failed = sum(1 for search in searches if search["status"] == "error")
+    logger.info(f"[OK] Batch finished in {elapsed}s ({failed} of {len(searches)} failed)")
+    return {
+        "searches": searches,
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed
+    }
+
+@mcp.tool()
+async def fetch_search_page(sid: str, cursor: str = "0", page_size: int = 100,
+                            post_process: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Fetch one page of results from an existing search job without re-running it.
+
+    Use the sid returned by search_splunk(paginate=True) or listed by
+    list_search_jobs. A post-process search re-sorts or filters the job's
+    results, e.g. "| sort - count" or "search host=qm1".
+    
+    Args:
+        sid: The search job ID returned by search_splunk
+        cursor: The next_cursor value from the previous page (default: "0", the first page)
+        page_size: Number of results to return (default: 100)
+        post_process: Optional SPL applied to the job's results before paging
+        
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            - sid: The search job ID
+            - offset: Offset of the first result in this page
+            - results: The results in this page
+            - result_count: Total number of results in the job (None with a post-process search)
+            - next_cursor: Cursor for the next page, or None when there are no more results
     """
     try:
-        service = get_splunk_connection()
-        indexes = [index.name for index in service.indexes]
-        logger.info(f"[INFO] Found {len(indexes)} indexes")
-        return {"indexes": indexes}
+        offset = int(cursor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    page_size = max(1, min(page_size, SPLUNK_MAX_PAGE_SIZE))
+    
+    try:
+        job = await lookup_job(sid)
+        if not await run_blocking(job.is_done):
+            raise ValueError(f"Search job {sid} is still running")
+        
+        logger.info(f"[SEARCH] Fetching page of {sid} at offset {offset}")
+        page = await run_blocking(read_results_page, job, offset, page_size, post_process)
+        return build_page(job, offset, page, page_size, post_process)
+        
     except Exception as e:
-        logger.error(f"[ERROR] Failed to list indexes: {str(e)}")
+        logger.error(f"[ERROR] Failed to fetch search page: {str(e)}")
         raise
 
 @mcp.tool()
-async def get_index_info(index_name: str) -> Dict[str, Any]:
+async def list_search_jobs() -> List[Dict[str, Any]]:
     """
-    Get metadata for a specific Splunk index.
+    List search jobs dispatched by this server that can still be reused.
+    
+    Returns:
+        List of tracked jobs, most recently used first, with their sid, query,
+        time range, age and idle time in seconds
+    """
+    cancel_jobs_in_background(job_registry.sweep())
+    jobs = job_registry.list()
+    logger.info(f"[SEARCH] Tracking {len(jobs)} search jobs")
+    return jobs
+
+@mcp.tool()
+async def cancel_search_job(sid: str) -> Dict[str, Any]:
+    """
+    Cancel a search job in Splunk and stop tracking it, freeing its search slot.
     
     Args:
-        index_name: Name of the index to get metadata for
+        sid: The search job ID to cancel
         
     Returns:
-        Dictionary containing index metadata
+        Dictionary containing the sid and the cancellation status
     """
     try:
-        service = get_splunk_connection()
-        index = service.indexes[index_name]
+        job = job_registry.remove(sid)
+        if job is None:
+            job = await run_blocking(get_job, sid)
+        await run_blocking(job.cancel)
+        logger.info(f"[SEARCH] Cancelled search job {sid}")
+        return {"sid": sid, "status": "cancelled"}
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to cancel search job: {str(e)}")
+        raise
+
+def read_indexes() -> Dict[str, List[str]]:
+    """Blocking part of list_indexes; runs on splunk_executor"""
+    try:
+        with splunk_pool.connection() as service:
+            indexes = [index.name for index in service.indexes]
+            logger.info(f"[INFO] Found {len(indexes)} indexes")
+            return {"indexes": indexes}
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to list indexes: {str(e)}")
+        raise
+
+@mcp.tool()
+async def list_indexes() -> Dict[str, List[str]]:
+    """
+    Get a list of all available Splunk indexes.
+    
+    Returns:
+        Dictionary containing list of indexes
+    """
+    return await run_blocking(read_indexes)
+
+SOURCETYPE_SEARCH = """
+| tstats count WHERE index={index} BY index, sourcetype
+| stats count BY index, sourcetype
+| sort - count
+"""
+
+def run_search_to_completion(search_query: str, earliest_time: str, latest_time: str) -> List[Dict[str, Any]]:
+    """
+    Run a search in blocking mode on the calling thread and return all of its results.
+
+    Only for use from worker or background threads, never on the event loop.
+    The job is removed from Splunk once its results have been read.
+    """
+    job = dispatch_search(search_query, earliest_time=earliest_time, latest_time=latest_time,
+                          preview=False, exec_mode="blocking", timeout=SPLUNK_JOB_TTL)
+    try:
+        return read_results_page(job, 0, 0)
+    finally:
+        cancel_job(job)
+
+def group_sourcetypes(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    sourcetypes_by_index = {}
+    for result in rows:
+        index = result.get('index', '')
+        sourcetypes_by_index.setdefault(index, []).append({
+            'sourcetype': result.get('sourcetype', ''),
+            'count': result.get('count', '0')
+        })
+    return sourcetypes_by_index
+
+def fetch_index_info(index_name: str) -> Dict[str, Any]:
+    """Read the metadata of a single index from Splunk"""
+    try:
+        with splunk_pool.connection() as service:
+            index = service.indexes[index_name]
         
-        return {
-            "name": index_name,
-            "total_event_count": str(index["totalEventCount"]),
-            "current_size": str(index["currentDBSizeMB"]),
-            "max_size": str(index["maxTotalDataSizeMB"]),
-            "min_time": str(index["minTime"]),
-            "max_time": str(index["maxTime"])
-        }
+            return {
+                "name": index_name,
+                "total_event_count": str(index["totalEventCount"]),
+                "current_size": str(index["currentDBSizeMB"]),
+                "max_size": str(index["maxTotalDataSizeMB"]),
+                "min_time": str(index["minTime"]),
+                "max_time": str(index["maxTime"])
+            }
     except KeyError:
         logger.error(f"[ERROR] Index not found: {index_name}")
         raise ValueError(f"Index not found: {index_name}")
+
+class IndexCatalog:
+    """
+    In-memory snapshot of indexes and their sourcetypes.
+
+    A daemon thread rebuilds the snapshot every refresh interval, so tools answer
+    from memory instead of enumerating indexes and running tstats per call.
+    Single indexes can be refreshed incrementally between full rebuilds.
+    """
+
+    def __init__(self, refresh_interval: float = SPLUNK_CATALOG_REFRESH_INTERVAL,
+                 time_range: str = SPLUNK_CATALOG_TIME_RANGE):
+        self._refresh_interval = refresh_interval
+        self._time_range = time_range
+        self._indexes: List[str] = []
+        self._sourcetypes: Dict[str, List[Dict[str, Any]]] = {}
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def age(self) -> Optional[float]:
+        with self._lock:
+            return None if self._refreshed_at is None else time.time() - self._refreshed_at
+
+    def refresh(self, max_age: float = 0) -> None:
+        """Rebuild the full catalog unless the snapshot is younger than max_age seconds"""
+        with self._refresh_lock:
+            age = self.age()
+            if age is not None and age < max_age:
+                return
+            started = time.monotonic()
+            with splunk_pool.connection() as service:
+                indexes = [index.name for index in service.indexes]
+            rows = run_search_to_completion(SOURCETYPE_SEARCH.format(index="*"), self._time_range, "now")
+            with self._lock:
+                self._indexes = indexes
+                self._sourcetypes = group_sourcetypes(rows)
+                self._refreshed_at = time.time()
+            logger.info(f"[CATALOG] Refreshed {len(indexes)} indexes in {time.monotonic() - started:.1f}s")
+
+    def refresh_index(self, index_name: str, include_sourcetypes: bool = False) -> Dict[str, Any]:
+        """Re-read one index (and optionally its sourcetypes) and merge it into the snapshot"""
+        info = fetch_index_info(index_name)
+        sourcetypes = None
+        if include_sourcetypes:
+            rows = run_search_to_completion(SOURCETYPE_SEARCH.format(index=f'"{index_name}"'), self._time_range, "now")
+            sourcetypes = group_sourcetypes(rows).get(index_name, [])
+            info["sourcetypes"] = sourcetypes
+        with self._lock:
+            if index_name not in self._indexes:
+                self._indexes.append(index_name)
+            if sourcetypes is not None:
+                self._sourcetypes[index_name] = sourcetypes
+        return info
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            age = None if self._refreshed_at is None else time.time() - self._refreshed_at
+            return {
+                'indexes': list(self._indexes),
+                'sourcetypes': {index: list(sourcetypes) for index, sourcetypes in self._sourcetypes.items()},
+                'metadata': {
+                    'total_indexes': len(self._indexes),
+                    'total_sourcetypes': sum(len(st) for st in self._sourcetypes.values()),
+                    'search_time_range': f"{self._time_range} to now",
+                    'refreshed_at': datetime.fromtimestamp(self._refreshed_at).isoformat() if self._refreshed_at else None,
+                    'snapshot_age_seconds': round(age, 1) if age is not None else None
+                }
+            }
+
+    def start(self) -> None:
+        """Start the background refresh thread if it is not running yet"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="splunk-catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Skip the rebuild if a tool call refreshed the catalog recently
+                self.refresh(max_age=self._refresh_interval / 2)
+            except Exception as e:
+                logger.warning(f"[WARN] Catalog refresh failed: {str(e)}")
+            self._stop.wait(self._refresh_interval)
+
+index_catalog = IndexCatalog()
+
+@mcp.tool()
+async def get_index_info(index_name: str, refresh_sourcetypes: bool = False) -> Dict[str, Any]:
+    """
+    Get metadata for a specific Splunk index.
+
+    The index entry in the cached catalog is refreshed as a side effect, so this
+    can be used to update a single index without rebuilding the whole catalog.
+    
+    Args:
+        index_name: Name of the index to get metadata for
+        refresh_sourcetypes: Also re-scan the index's sourcetypes and update the catalog (default: False)
+        
+    Returns:
+        Dictionary containing index metadata
+    """
+    try:
+        return await run_blocking(index_catalog.refresh_index, index_name, refresh_sourcetypes)
+    except ValueError:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to get index info: {str(e)}")
         raise
 
+def read_saved_searches() -> List[Dict[str, Any]]:
+    """Blocking part of list_saved_searches; runs on splunk_executor"""
+    try:
+        with splunk_pool.connection() as service:
+            saved_searches = []
+        
+            for saved_search in service.saved_searches:
+                try:
+                    saved_searches.append({
+                        "name": saved_search.name,
+                        "description": saved_search.description or "",
+                        "search": saved_search.search
+                    })
+                except Exception as e:
+                    logger.warning(f"[WARN] Error processing saved search: {str(e)}")
+                    continue
+            
+            return saved_searches
+        
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to list saved searches: {str(e)}")
+        raise
+
 @mcp.tool()
 async def list_saved_searches() -> List[Dict[str, Any]]:
     """
@@ -425,25 +1425,82 @@ async def list_saved_searches() -> List[Dict[str, Any]]:
     Returns:
         List of saved searches with their names, descriptions, and search queries
     """
+    return await run_blocking(read_saved_searches)
+
+def read_current_user() -> Dict[str, Any]:
+    """Blocking part of current_user; runs on splunk_executor"""
     try:
-        service = get_splunk_connection()
-        saved_searches = []
+        with splunk_pool.connection() as service:
+            logger.info("[USER] Fetching current user information...")
+        
+            # First try to get username from environment variable
+            current_username = os.environ.get("SPLUNK_USERNAME", "admin")
+            logger.debug(f"Using username from environment: {current_username}")
         
-        for saved_search in service.saved_searches:
+            # Try to get additional context information
             try:
-                saved_searches.append({
-                    "name": saved_search.name,
-                    "description": saved_search.description or "",
-                    "search": saved_search.search
-                })
-            except Exception as e:
-                logger.warning(f"[WARN] Error processing saved search: {str(e)}")
-                continue
-            
-        return saved_searches
+                # Get the current username from the /services/authentication/current-context endpoint
+                current_context_resp = service.get("/services/authentication/current-context", **{"output_mode":"json"}).body.read()
+                current_context_obj = json.loads(current_context_resp)
+                if "entry" in current_context_obj and len(current_context_obj["entry"]) > 0:
+                    context_username = current_context_obj["entry"][0]["content"].get("username")
+                    if context_username:
+                        current_username = context_username
+                        logger.debug(f"Using username from current-context: {current_username}")
+            except Exception as context_error:
+                logger.warning(f"[WARN] Could not get username from current-context: {str(context_error)}")
         
+            try:
+                # Get the current user by username
+                current_user = service.users[current_username]
+            
+                # Ensure roles is a list
+                roles = []
+                if hasattr(current_user, 'roles') and current_user.roles:
+                    roles = list(current_user.roles)
+                else:
+                    # Try to get from content
+                    if hasattr(current_user, 'content'):
+                        roles = current_user.content.get("roles", [])
+                    else:
+                        roles = current_user.get("roles", [])
+                
+                    if roles is None:
+                        roles = []
+                    elif isinstance(roles, str):
+                        roles = [roles]
+            
+                # Determine how to access user properties
+                if hasattr(current_user, 'content') and isinstance(current_user.content, dict):
+                    user_info = {
+                        "username": current_user.name,
+                        "real_name": current_user.content.get('realname', "N/A") or "N/A",
+                        "email": current_user.content.get('email', "N/A") or "N/A",
+                        "roles": roles,
+                        "capabilities": current_user.content.get('capabilities', []) or [],
+                        "default_app": current_user.content.get('defaultApp', "search") or "search",
+                        "type": current_user.content.get('type', "user") or "user"
+                    }
+                else:
+                    user_info = {
+                        "username": current_user.name,
+                        "real_name": current_user.get("realname", "N/A") or "N/A",
+                        "email": current_user.get("email", "N/A") or "N/A",
+                        "roles": roles,
+                        "capabilities": current_user.get("capabilities", []) or [],
+                        "default_app": current_user.get("defaultApp", "search") or "search",
+                        "type": current_user.get("type", "user") or "user"
+                    }
+            
+                logger.info(f"[OK] Successfully retrieved current user information: {current_user.name}")
+                return user_info
+            
+            except KeyError:
+                logger.error(f"[ERROR] User not found: {current_username}")
+                raise ValueError(f"User not found: {current_username}")
+            
     except Exception as e:
-        logger.error(f"[ERROR] Failed to list saved searches: {str(e)}")
+        logger.error(f"[ERROR] Error getting current user: {str(e)}")
         raise
 
 @mcp.tool()
@@ -460,138 +1517,129 @@ async def current_user() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dictionary containing user information
     """
+    return await run_blocking(read_current_user)
+
+def read_users() -> List[Dict[str, Any]]:
+    """Blocking part of list_users; runs on splunk_executor"""
     try:
-        service = get_splunk_connection()
-        logger.info("[USER] Fetching current user information...")
-        
-        # First try to get username from environment variable
-        current_username = os.environ.get("SPLUNK_USERNAME", "admin")
-        logger.debug(f"Using username from environment: {current_username}")
-        
-        # Try to get additional context information
-        try:
-            # Get the current username from the /services/authentication/current-context endpoint
-            current_context_resp = service.get("/services/authentication/current-context", **{"output_mode":"json"}).body.read()
-            current_context_obj = json.loads(current_context_resp)
-            if "entry" in current_context_obj and len(current_context_obj["entry"]) > 0:
-                context_username = current_context_obj["entry"][0]["content"].get("username")
-                if context_username:
-                    current_username = context_username
-                    logger.debug(f"Using username from current-context: {current_username}")
-        except Exception as context_error:
-            logger.warning(f"[WARN] Could not get username from current-context: {str(context_error)}")
-        
-        try:
-            # Get the current user by username
-            current_user = service.users[current_username]
-            
-            # Ensure roles is a list
-            roles = []
-            if hasattr(current_user, 'roles') and current_user.roles:
-                roles = list(current_user.roles)
-            else:
-                # Try to get from content
-                if hasattr(current_user, 'content'):
-                    roles = current_user.content.get("roles", [])
-                else:
-                    roles = current_user.get("roles", [])
+        with splunk_pool.connection() as service:
+            logger.info("[USERS] Fetching Splunk users...")
                 
-                if roles is None:
-                    roles = []
-                elif isinstance(roles, str):
-                    roles = [roles]
-            
-            # Determine how to access user properties
-            if hasattr(current_user, 'content') and isinstance(current_user.content, dict):
-                user_info = {
-                    "username": current_user.name,
-                    "real_name": current_user.content.get('realname', "N/A") or "N/A",
-                    "email": current_user.content.get('email', "N/A") or "N/A",
-                    "roles": roles,
-                    "capabilities": current_user.content.get('capabilities', []) or [],
-                    "default_app": current_user.content.get('defaultApp', "search") or "search",
-                    "type": current_user.content.get('type', "user") or "user"
-                }
-            else:
-                user_info = {
-                    "username": current_user.name,
-                    "real_name": current_user.get("realname", "N/A") or "N/A",
-                    "email": current_user.get("email", "N/A") or "N/A",
-                    "roles": roles,
-                    "capabilities": current_user.get("capabilities", []) or [],
-                    "default_app": current_user.get("defaultApp", "search") or "search",
-                    "type": current_user.get("type", "user") or "user"
-                }
-            
-            logger.info(f"[OK] Successfully retrieved current user information: {current_user.name}")
-            return user_info
-            
-        except KeyError:
-            logger.error(f"[ERROR] User not found: {current_username}")
-            raise ValueError(f"User not found: {current_username}")
+            users = []
+            for user in service.users:
+                try:
+                    if hasattr(user, 'content'):
+                        # Ensure roles is a list
+                        roles = user.content.get('roles', [])
+                        if roles is None:
+                            roles = []
+                        elif isinstance(roles, str):
+                            roles = [roles]
+                    
+                        # Ensure capabilities is a list
+                        capabilities = user.content.get('capabilities', [])
+                        if capabilities is None:
+                            capabilities = []
+                        elif isinstance(capabilities, str):
+                            capabilities = [capabilities]
+                    
+                        user_info = {
+                            "username": user.name,
+                            "real_name": user.content.get('realname', "N/A") or "N/A",
+                            "email": user.content.get('email', "N/A") or "N/A",
+                            "roles": roles,
+                            "capabilities": capabilities,
+                            "default_app": user.content.get('defaultApp', "search") or "search",
+                            "type": user.content.get('type', "user") or "user"
+                        }
+                        users.append(user_info)
+                        logger.debug(f"[OK] Successfully processed user: {user.name}")
+                    else:
+                        # Handle users without content
+                        user_info = {
+                            "username": user.name,
+                            "real_name": "N/A",
+                            "email": "N/A",
+                            "roles": [],
+                            "capabilities": [],
+                            "default_app": "search",
+                            "type": "user"
+                        }
+                        users.append(user_info)
+                        logger.warning(f"[WARN] User {user.name} has no content, using default values")
+                except Exception as e:
+                    logger.warning(f"[WARN] Error processing user {user.name}: {str(e)}")
+                    continue
             
+            logger.info(f"[OK] Found {len(users)} users")
+            return users
+        
     except Exception as e:
-        logger.error(f"[ERROR] Error getting current user: {str(e)}")
+        logger.error(f"[ERROR] Error listing users: {str(e)}")
         raise
 
 @mcp.tool()
 async def list_users() -> List[Dict[str, Any]]:
     """List all Splunk users (requires admin privileges)"""
+    return await run_blocking(read_users)
+
+def read_kvstore_collections() -> List[Dict[str, Any]]:
+    """Blocking part of list_kvstore_collections; runs on splunk_executor"""
     try:
-        service = get_splunk_connection()
-        logger.info("[USERS] Fetching Splunk users...")
-                
-        users = []
-        for user in service.users:
+        with splunk_pool.connection() as service:
+            logger.info("[KV] Fetching KV store collections...")
+        
+            collections = []
+            app_count = 0
+            collections_found = 0
+        
+            # Get KV store collection stats to retrieve record counts
+            collection_stats = {}
             try:
-                if hasattr(user, 'content'):
-                    # Ensure roles is a list
-                    roles = user.content.get('roles', [])
-                    if roles is None:
-                        roles = []
-                    elif isinstance(roles, str):
-                        roles = [roles]
-                    
-                    # Ensure capabilities is a list
-                    capabilities = user.content.get('capabilities', [])
-                    if capabilities is None:
-                        capabilities = []
-                    elif isinstance(capabilities, str):
-                        capabilities = [capabilities]
-                    
-                    user_info = {
-                        "username": user.name,
-                        "real_name": user.content.get('realname', "N/A") or "N/A",
-                        "email": user.content.get('email', "N/A") or "N/A",
-                        "roles": roles,
-                        "capabilities": capabilities,
-                        "default_app": user.content.get('defaultApp', "search") or "search",
-                        "type": user.content.get('type', "user") or "user"
-                    }
-                    users.append(user_info)
-                    logger.debug(f"[OK] Successfully processed user: {user.name}")
-                else:
-                    # Handle users without content
-                    user_info = {
-                        "username": user.name,
-                        "real_name": "N/A",
-                        "email": "N/A",
-                        "roles": [],
-                        "capabilities": [],
-                        "default_app": "search",
-                        "type": "user"
-                    }
-                    users.append(user_info)
-                    logger.warning(f"[WARN] User {user.name} has no content, using default values")
+                stats_response = service.get("/services/server/introspection/kvstore/collectionstats", output_mode="json")
+                stats_data = json.loads(stats_response.body.read())
+                if "entry" in stats_data and len(stats_data["entry"]) > 0:
+                    entry = stats_data["entry"][0]
+                    content = entry.get("content", {})
+                    data = content.get("data", {})
+                    for kvstore in data:
+                        kvstore = json.loads(kvstore)
+                        if "ns" in kvstore and "count" in kvstore:
+                            collection_stats[kvstore["ns"]] = kvstore["count"]
+                    logger.debug(f"[OK] Retrieved stats for {len(collection_stats)} KV store collections")
             except Exception as e:
-                logger.warning(f"[WARN] Error processing user {user.name}: {str(e)}")
-                continue
+                logger.warning(f"[WARN] Error retrieving KV store collection stats: {str(e)}")
+            
+            try:
+                for entry in service.kvstore:
+                    try:
+                        collection_name = entry['name']
+                        fieldsList = [f.replace('field.', '') for f in entry['content'] if f.startswith('field.')]
+                        accelFields = [f.replace('accelerated_field.', '') for f in entry['content'] if f.startswith('accelerated_field.')]
+                        app_name = entry['access']['app']
+                        collection_data = {
+                            "name": collection_name,
+                            "app": app_name,
+                            "fields": fieldsList,
+                            "accelerated_fields": accelFields,
+                            "record_count": collection_stats.get(f"{app_name}.{collection_name}", 0)
+                        }
+                        collections.append(collection_data)
+                        collections_found += 1
+                        logger.debug(f"[OK] Added collection: {collection_name} from app: {app_name}")
+                    except Exception as e:
+                        logger.warning(f"[WARN] Error processing collection entry: {str(e)}")
+                        continue
+            
+                logger.info(f"[OK] Found {collections_found} KV store collections")
+                return collections
+            
+            except Exception as e:
+                logger.error(f"[ERROR] Error accessing KV store collections: {str(e)}")
+                raise
             
-        logger.info(f"[OK] Found {len(users)} users")
-        return users
-        
     except Exception as e:
-        logger.error(f"[ERROR] Error listing users: {str(e)}")
+        logger.error(f"[ERROR] Error listing KV store collections: {str(e)}")
         raise
 
 @mcp.tool()
@@ -602,176 +1650,115 @@ async def list_kvstore_collections() -> List[Dict[str, Any]]:
     Returns:
         List of KV store collections with metadata including app, fields, and accelerated fields
     """
+    return await run_blocking(read_kvstore_collections)
+
+def read_health() -> Dict[str, Any]:
+    """Blocking part of health_check; runs on splunk_executor"""
     try:
-        service = get_splunk_connection()
-        logger.info("[KV] Fetching KV store collections...")
-        
-        collections = []
-        app_count = 0
-        collections_found = 0
+        with splunk_pool.connection() as service:
+            logger.info("[HEALTH] Performing health check...")
         
-        # Get KV store collection stats to retrieve record counts
-        collection_stats = {}
-        try:
-            stats_response = service.get("/services/server/introspection/kvstore/collectionstats", output_mode="json")
-            stats_data = json.loads(stats_response.body.read())
-            if "entry" in stats_data and len(stats_data["entry"]) > 0:
-                entry = stats_data["entry"][0]
-                content = entry.get("content", {})
-                data = content.get("data", {})
-                for kvstore in data:
-                    kvstore = json.loads(kvstore)
-                    if "ns" in kvstore and "count" in kvstore:
-                        collection_stats[kvstore["ns"]] = kvstore["count"]
-                logger.debug(f"[OK] Retrieved stats for {len(collection_stats)} KV store collections")
-        except Exception as e:
-            logger.warning(f"[WARN] Error retrieving KV store collection stats: {str(e)}")
-            
-        try:
-            for entry in service.kvstore:
+            # List available apps
+            apps = []
+            for app in service.apps:
                 try:
-                    collection_name = entry['name']
-                    fieldsList = [f.replace('field.', '') for f in entry['content'] if f.startswith('field.')]
-                    accelFields = [f.replace('accelerated_field.', '') for f in entry['content'] if f.startswith('accelerated_field.')]
-                    app_name = entry['access']['app']
-                    collection_data = {
-                        "name": collection_name,
-                        "app": app_name,
-                        "fields": fieldsList,
-                        "accelerated_fields": accelFields,
-                        "record_count": collection_stats.get(f"{app_name}.{collection_name}", 0)
+                    app_info = {
+                        "name": app['name'],
+                        "label": app['label'],
+                        "version": app['version']
                     }
-                    collections.append(collection_data)
-                    collections_found += 1
-                    logger.debug(f"[OK] Added collection: {collection_name} from app: {app_name}")
+                    apps.append(app_info)
                 except Exception as e:
-                    logger.warning(f"[WARN] Error processing collection entry: {str(e)}")
+                    logger.warning(f"[WARN] Error getting info for app {app['name']}: {str(e)}")
                     continue
-            
-            logger.info(f"[OK] Found {collections_found} KV store collections")
-            return collections
-            
-        except Exception as e:
-            logger.error(f"[ERROR] Error accessing KV store collections: {str(e)}")
-            raise
-            
-    except Exception as e:
-        logger.error(f"[ERROR] Error listing KV store collections: {str(e)}")
-        raise
-
-@mcp.tool()
-async def health_check() -> Dict[str, Any]:
-    """Get basic Splunk connection information and list available apps"""
-    try:
-        service = get_splunk_connection()
-        logger.info("[HEALTH] Performing health check...")
         
-        # List available apps
-        apps = []
-        for app in service.apps:
-            try:
-                app_info = {
-                    "name": app['name'],
-                    "label": app['label'],
-                    "version": app['version']
-                }
-                apps.append(app_info)
-            except Exception as e:
-                logger.warning(f"[WARN] Error getting info for app {app['name']}: {str(e)}")
-                continue
-        
-        response = {
-            "status": "healthy",
-            "connection": {
-                "host": SPLUNK_HOST,
-                "port": SPLUNK_PORT,
-                "scheme": SPLUNK_SCHEME,
-                "username": os.environ.get("SPLUNK_USERNAME", "admin"),
-                "ssl_verify": VERIFY_SSL
-            },
-            "apps_count": len(apps),
-            "apps": apps
-        }
+            response = {
+                "status": "healthy",
+                "connection": {
+                    "host": SPLUNK_HOST,
+                    "port": SPLUNK_PORT,
+                    "scheme": SPLUNK_SCHEME,
+                    "username": os.environ.get("SPLUNK_USERNAME", "admin"),
+                    "ssl_verify": VERIFY_SSL
+                },
+                "apps_count": len(apps),
+                "apps": apps,
+                "connection_pool": splunk_pool.stats()
+            }
         
-        logger.info(f"[OK] Health check successful. Found {len(apps)} apps")
-        return response
+            logger.info(f"[OK] Health check successful. Found {len(apps)} apps")
+            return response
         
     except Exception as e:
         logger.error(f"[ERROR] Health check failed: {str(e)}")
         raise
 
 @mcp.tool()
-async def get_indexes_and_sourcetypes() -> Dict[str, Any]:
+async def health_check() -> Dict[str, Any]:
+    """Get basic Splunk connection information and list available apps"""
+    return await run_blocking(read_health)
+
+@mcp.tool()
+async def get_connection_pool_stats() -> Dict[str, Any]:
+    """
+    Get Splunk connection pool statistics.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            - hits / misses: Sessions reused vs. newly logged in
+            - relogins: Sessions re-authenticated after TTL or expiry
+            - keepalive_checks: Idle sessions pinged before reuse
+            - discarded: Sessions dropped after connection errors
+            - size / idle / in_use / max_size: Current pool occupancy
+    """
+    stats = splunk_pool.stats()
+    logger.info(f"[POOL] hits={stats['hits']} misses={stats['misses']} relogins={stats['relogins']}")
+    return stats
+
+@mcp.tool()
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get search result cache statistics.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            - hits / misses / hit_rate: Cache lookups served from memory vs. Splunk
+            - evictions / expirations: Entries dropped by the LRU size bound or TTL
+            - entries / bytes / max_bytes / ttl_seconds: Current cache occupancy and limits
+    """
+    stats = search_cache.stats()
+    logger.info(f"[CACHE] hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']}")
+    return stats
+
+@mcp.tool()
+async def get_indexes_and_sourcetypes(refresh: bool = False) -> Dict[str, Any]:
     """
     Get a list of all indexes and their sourcetypes.
     
-    This endpoint performs a search to gather:
+    Answers from an in-memory catalog that a background task refreshes every
+    SPLUNK_CATALOG_REFRESH_INTERVAL seconds. The catalog holds:
     - All available indexes
     - All sourcetypes within each index
     - Event counts for each sourcetype
     - Time range information
     
+    Args:
+        refresh: Rebuild the catalog from Splunk before answering (default: False)
+    
     Returns:
         Dict[str, Any]: Dictionary containing:
             - indexes: List of all accessible indexes
             - sourcetypes: Dictionary mapping indexes to their sourcetypes
-            - metadata: Additional information about the search
+            - metadata: Additional information about the search, including snapshot_age_seconds
     """
     try:
-        service = get_splunk_connection()
-        logger.info("[INFO] Fetching indexes and sourcetypes...")
-        
-        # Get list of indexes
-        indexes = [index.name for index in service.indexes]
-        logger.info(f"Found {len(indexes)} indexes")
-        
-        # Search for sourcetypes across all indexes
-        search_query = """
-        | tstats count WHERE index=* BY index, sourcetype
-        | stats count BY index, sourcetype
-        | sort - count
-        """
-        
-        kwargs_search = {
-            "earliest_time": "-24h",
-            "latest_time": "now",
-            "preview": False,
-            "exec_mode": "blocking"
-        }
+        index_catalog.start()
+        if refresh or index_catalog.age() is None:
+            logger.info("[INFO] Fetching indexes and sourcetypes...")
+            await run_blocking(index_catalog.refresh, 0 if refresh else SPLUNK_CATALOG_REFRESH_INTERVAL)
         
-        logger.info("[SEARCH] Executing search for sourcetypes...")
-        job = service.jobs.create(search_query, **kwargs_search)
-        
-        # Get the results
-        result_stream = job.results(output_mode='json')
-        results_data = json.loads(result_stream.read().decode('utf-8'))
-        
-        # Process results
-        sourcetypes_by_index = {}
-        for result in results_data.get('results', []):
-            index = result.get('index', '')
-            sourcetype = result.get('sourcetype', '')
-            count = result.get('count', '0')
-            
-            if index not in sourcetypes_by_index:
-                sourcetypes_by_index[index] = []
-            
-            sourcetypes_by_index[index].append({
-                'sourcetype': sourcetype,
-                'count': count
-            })
-        
-        response = {
-            'indexes': indexes,
-            'sourcetypes': sourcetypes_by_index,
-            'metadata': {
-                'total_indexes': len(indexes),
-                'total_sourcetypes': sum(len(st) for st in sourcetypes_by_index.values()),
-                'search_time_range': '24 hours'
-            }
-        }
-        
-        logger.info(f"[OK] Successfully retrieved indexes and sourcetypes")
+        response = index_catalog.snapshot()
+        logger.info(f"[OK] Returning catalog snapshot ({response['metadata']['snapshot_age_seconds']}s old)")
         return response
         
     except Exception as e:
@@ -908,6 +1895,9 @@ if __name__ == "__main__":
     # Start the server
     logger.info(f"[START] Starting Splunk MCP server in {mode.upper()} mode")
     
+    # Warm the index/sourcetype catalog in the background
+    index_catalog.start()
+    
     if mode == "stdio":
         # Run in stdio mode
         mcp.run(transport=mode)
@@ -0,0 +1,241 @@
+"""Multi-user server mode for the Splunk/MQ chatbot.
+
+One process starts the Splunk and MQ MCP servers once and shares those
+client sessions (and the LLM client's connection pool) across every chat.
+Each chat session gets its own SplunkChatbot: history, memory and stored
+tool results are never shared. A session runs one turn at a time, and at
+most CHAT_MAX_CONCURRENT_TURNS turns run at once across all sessions;
+the rest wait their turn.
+
+    python splunk_mcp/chat_server.py
+
+HTTP:
+    POST   /sessions                       -> {"session_id": ...}
+    POST   /sessions/{session_id}/messages {"message": "..."} -> {"response": ...}
+    DELETE /sessions/{session_id}
+    GET    /health
+WebSocket:
+    /ws[?session_id=...]  send text, receive {"session_id", "response", ...}
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+
+from splunk import MCPToolHub, SplunkChatbot, connect_mcp_servers
+
+CHAT_SERVER_HOST = os.getenv("CHAT_SERVER_HOST", "0.0.0.0")
+CHAT_SERVER_PORT = int(os.getenv("CHAT_SERVER_PORT", "8100"))
+CHAT_MAX_CONCURRENT_TURNS = int(os.getenv("CHAT_MAX_CONCURRENT_TURNS", "8"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "200"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "1800"))
+
+
+class ChatSession:
+    def __init__(self, bot):
+        self.bot = bot
+        # Turns of one conversation must not interleave
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.turns = 0
+        # Open websockets; a session with one never expires
+        self.sockets = 0
+
+
+class ChatSessions:
+    """Per-user chatbots on top of one shared MCPToolHub"""
+
+    def __init__(self, hub, max_concurrent_turns=CHAT_MAX_CONCURRENT_TURNS,
+                 max_sessions=CHAT_MAX_SESSIONS, ttl=CHAT_SESSION_TTL):
+        self.hub = hub
+        self.sessions = {}
+        # Sessions still starting up; they count against max_sessions
+        self.starting = 0
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_concurrent_turns = max_concurrent_turns
+        self.turn_slots = asyncio.Semaphore(max_concurrent_turns)
+        self.active_turns = 0
+        self.waiting_turns = 0
+
+    def expire(self):
+        """Drop sessions idle for longer than the TTL"""
+        now = time.monotonic()
+        for session_id in [
+            session_id for session_id, session in self.sessions.items()
+            if now - session.last_used > self.ttl and not session.lock.locked() and not session.sockets
+        ]:
+            del self.sessions[session_id]
+            print(f"[CHAT] Session {session_id} expired")
+
+    async def create(self):
+        self.expire()
+        if len(self.sessions) + self.starting >= self.max_sessions:
+            raise HTTPException(status_code=503, detail="Too many chat sessions, try again later")
+        # Reserve the slot before awaiting, so concurrent creates can't overshoot
+        self.starting += 1
+        try:
+            bot = SplunkChatbot(self.hub)
+            # Starting a Gemini chat sends the system prompt, so it takes a turn slot
+            async with self.turn_slots:
+                await bot.start_conversation()
+        finally:
+            self.starting -= 1
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = ChatSession(bot)
+        print(f"[CHAT] Session {session_id} started ({len(self.sessions)} open)")
+        return session_id
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Unknown chat session: {session_id}")
+        return session
+
+    async def attach(self, session_id=None):
+        """Session for a websocket, creating one if session_id is unknown"""
+        if session_id not in self.sessions:
+            session_id = await self.create()
+        session = self.sessions[session_id]
+        session.sockets += 1
+        return session_id, session
+
+    def detach(self, session):
+        if session is not None:
+            session.sockets -= 1
+            session.last_used = time.monotonic()
+
+    def close(self, session_id):
+        self.get(session_id)
+        del self.sessions[session_id]
+        print(f"[CHAT] Session {session_id} closed ({len(self.sessions)} open)")
+
+    async def turn(self, session_id, message):
+        """Run one user turn, waiting for a free slot if the server is busy"""
+        session = self.get(session_id)
+        async with session.lock:
+            requested = time.monotonic()
+            self.waiting_turns += 1
+            try:
+                await self.turn_slots.acquire()
+            finally:
+                self.waiting_turns -= 1
+            started = time.monotonic()
+            self.active_turns += 1
+            try:
+                response = await session.bot.send_message(message)
+            finally:
+                self.active_turns -= 1
+                self.turn_slots.release()
+            finished = time.monotonic()
+            session.last_used = finished
+            session.turns += 1
+        return {
+            "session_id": session_id,
+            "response": response,
+            "queued_seconds": round(started - requested, 3),
+            "elapsed_seconds": round(finished - started, 3),
+        }
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "starting_sessions": self.starting,
+            "active_turns": self.active_turns,
+            "waiting_turns": self.waiting_turns,
+            "max_concurrent_turns": self.max_concurrent_turns,
+            "max_sessions": self.max_sessions,
+        }
+
+
+chat_sessions = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the MCP servers once for the whole process"""
+    global chat_sessions
+    async with connect_mcp_servers() as sessions:
+        hub = MCPToolHub()
+        await hub.setup(sessions)
+        chat_sessions = ChatSessions(hub)
+        print(f"[CHAT] Ready: up to {CHAT_MAX_CONCURRENT_TURNS} concurrent turns")
+        yield
+        chat_sessions = None
+
+
+app = FastAPI(title="Splunk/MQ Chatbot", lifespan=lifespan)
+
+
+class MessageRequest(BaseModel):
+    message: str
+
+
+@app.post("/sessions")
+async def create_session():
+    return {"session_id": await chat_sessions.create()}
+
+
+@app.post("/sessions/{session_id}/messages")
+async def send_message(session_id: str, request: MessageRequest):
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Empty message")
+    return await chat_sessions.turn(session_id, request.message.strip())
+
+
+@app.delete("/sessions/{session_id}")
+async def close_session(session_id: str):
+    chat_sessions.close(session_id)
+    return {"session_id": session_id, "closed": True}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", **chat_sessions.stats()}
+
+
+@app.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, session_id: str = None):
+    await websocket.accept()
+    session = None
+    try:
+        session_id, session = await chat_sessions.attach(session_id)
+        await websocket.send_json({"session_id": session_id})
+        while True:
+            message = (await websocket.receive_text()).strip()
+            if not message:
+                continue
+            try:
+                try:
+                    response = await chat_sessions.turn(session_id, message)
+                except HTTPException as e:
+                    if e.status_code != 404:
+                        raise
+                    # Closed (DELETE) while the socket was open: carry on in a new session
+                    chat_sessions.detach(session)
+                    session = None
+                    session_id, session = await chat_sessions.attach()
+                    await websocket.send_json({"session_id": session_id, "notice": "Session was closed, started a new one"})
+                    response = await chat_sessions.turn(session_id, message)
+                await websocket.send_json(response)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({"session_id": session_id, "error": getattr(e, "detail", str(e))})
+    except WebSocketDisconnect:
+        # The session stays open for reconnects until it expires
+        pass
+    except HTTPException as e:
+        await websocket.close(code=1013, reason=e.detail)
+    finally:
+        chat_sessions.detach(session)
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=CHAT_SERVER_HOST, port=CHAT_SERVER_PORT)
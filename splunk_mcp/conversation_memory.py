@@ -0,0 +1,229 @@
+"""Bounded conversation memory for SplunkChatbot.
+
+Keeps each prompt under a token budget (estimated at ~4 characters per token):
+- Large tool results are stored out-of-band. The prompt gets a preview and a
+  reference the model can page through with the local fetch_tool_result tool.
+- When the history goes over budget, the turns before the most recent
+  MEMORY_KEEP_TURNS are summarized by the LLM (or evicted if summarizing is
+  off or fails), leaving the system prompt, one summary and the recent turns.
+
+The same logic serves the OpenAI message list and the Gemini chat history
+through small adapters that know how to read and build each history format.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from types import SimpleNamespace
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "24000"))
+MEMORY_KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", "4"))
+MEMORY_SUMMARIZE = os.getenv("MEMORY_SUMMARIZE", "true").lower() == "true"
+TOOL_RESULT_INLINE_CHARS = int(os.getenv("TOOL_RESULT_INLINE_CHARS", "4000"))
+TOOL_RESULT_STORE_SIZE = int(os.getenv("TOOL_RESULT_STORE_SIZE", "50"))
+
+SUMMARY_PROMPT = """Summarize this IBM MQ / Splunk troubleshooting conversation so it can replace
+the original messages. Keep queue manager, queue and channel names, error and reason codes,
+searches that were run, findings, and open questions. Be concise.
+
+"""
+
+FETCH_TOOL = SimpleNamespace(
+    name="fetch_tool_result",
+    description=(
+        "Read more of a large tool result that was stored by reference "
+        "(shown as [full result stored as ref=...]). Args: ref, offset (characters, default 0)."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "ref": {"type": "string", "description": "Reference from the stored tool result"},
+            "offset": {"type": "integer", "description": "Character offset to read from"},
+        },
+        "required": ["ref"],
+    },
+)
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+class ToolResultStore:
+    """Keeps full tool results outside the prompt, keyed by a short reference"""
+
+    def __init__(self, inline_chars=TOOL_RESULT_INLINE_CHARS, max_results=TOOL_RESULT_STORE_SIZE):
+        self.inline_chars = inline_chars
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.counter = 0
+
+    def put(self, tool_name, text, preview=None):
+        """Return what goes into the prompt: the text itself if small, otherwise
+        a preview plus a reference to the stored result.
+
+        preview: Condensed version of text to show instead of its first
+        inline_chars characters (e.g. a shaped result); the full text is
+        still stored so nothing is lost.
+        """
+        if len(text) <= self.inline_chars:
+            return text
+        if preview is None:
+            preview, offset = text[:self.inline_chars], self.inline_chars
+        else:
+            offset = 0
+        self.counter += 1
+        ref = f"{tool_name}-{self.counter}"
+        self.results[ref] = text
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+        return (
+            f"{preview}\n"
+            f"[full result stored as ref={ref}: {len(text)} characters, ~{estimate_tokens(text)} tokens; "
+            f"call fetch_tool_result with ref=\"{ref}\" and offset={offset} to read it]"
+        )
+
+    def fetch(self, ref, offset=0):
+        if ref not in self.results:
+            return f"Unknown or expired tool result reference: {ref}"
+        text = self.results[ref]
+        offset = max(0, int(offset))
+        chunk = text[offset:offset + self.inline_chars]
+        end = offset + len(chunk)
+        if end < len(text):
+            chunk += f"\n[{len(text) - end} more characters; next offset={end}]"
+        return chunk
+
+
+class OpenAIHistory:
+    """Adapter for the OpenAI chat message list"""
+
+    @staticmethod
+    def role(message):
+        return message["role"]
+
+    @staticmethod
+    def text(message):
+        text = message.get("content") or ""
+        if message.get("tool_calls"):
+            text += json.dumps(message["tool_calls"])
+        return text
+
+    @staticmethod
+    def is_turn_start(message):
+        return message["role"] == "user"
+
+    @staticmethod
+    def summary(text):
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{text}"}]
+
+
+class GeminiHistory:
+    """Adapter for google.generativeai ChatSession.history (Content objects or dicts)"""
+
+    @staticmethod
+    def _parts(content):
+        return content["parts"] if isinstance(content, dict) else content.parts
+
+    @staticmethod
+    def role(content):
+        return content["role"] if isinstance(content, dict) else content.role
+
+    @staticmethod
+    def text(content):
+        texts = []
+        for part in GeminiHistory._parts(content):
+            if isinstance(part, str):
+                texts.append(part)
+            elif isinstance(part, dict):
+                texts.append(part.get("text") or json.dumps(part, default=str))
+            else:
+                texts.append(part.text or json.dumps(type(part).to_dict(part), default=str))
+        return "".join(texts)
+
+    @staticmethod
+    def is_turn_start(content):
+        # User text, as opposed to function responses which also have role "user"
+        if GeminiHistory.role(content) != "user":
+            return False
+        for part in GeminiHistory._parts(content):
+            if isinstance(part, str) or (isinstance(part, dict) and "text" in part):
+                return True
+            if not isinstance(part, (str, dict)) and part.text:
+                return True
+        return False
+
+    @staticmethod
+    def summary(text):
+        # Gemini history has to alternate user and model turns
+        return [
+            {"role": "user", "parts": [{"text": f"Summary of the earlier conversation:\n{text}"}]},
+            {"role": "model", "parts": [{"text": "Noted."}]},
+        ]
+
+
+class ConversationMemory:
+    def __init__(self, adapter, summarizer=None, budget=MEMORY_TOKEN_BUDGET, keep_turns=MEMORY_KEEP_TURNS):
+        """
+        Args:
+            adapter: OpenAIHistory or GeminiHistory
+            summarizer: async callable(text) -> summary, or None to evict old turns
+            budget: Prompt token budget
+            keep_turns: Most recent user turns that are never summarized
+        """
+        self.adapter = adapter
+        self.summarizer = summarizer
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.turn = 0
+
+    def prompt_tokens(self, history):
+        return sum(estimate_tokens(self.adapter.text(item)) for item in history)
+
+    def transcript(self, history, max_chars_per_message=2000):
+        return "\n".join(
+            f"{self.adapter.role(item)}: {self.adapter.text(item)[:max_chars_per_message]}"
+            for item in history
+        )
+
+    async def compact(self, history, pinned=1):
+        """Return history within budget, summarizing or evicting old turns.
+
+        Args:
+            history: Full history, oldest first
+            pinned: Leading entries (the system prompt) that are always kept
+        """
+        history = list(history)
+        before = self.prompt_tokens(history)
+        if before <= self.budget:
+            return history
+
+        head, body = history[:pinned], history[pinned:]
+        starts = [i for i, item in enumerate(body) if self.adapter.is_turn_start(item)]
+        if len(starts) <= self.keep_turns:
+            return history
+        cut = starts[-self.keep_turns] if self.keep_turns else len(body)
+        old, recent = body[:cut], body[cut:]
+
+        summary = None
+        if self.summarizer:
+            try:
+                summary = await self.summarizer(SUMMARY_PROMPT + self.transcript(old))
+            except Exception as e:
+                print(f"[MEM] Summarization failed, evicting instead: {e}")
+
+        compacted = head + (self.adapter.summary(summary) if summary else []) + recent
+        print(
+            f"[MEM] {'Summarized' if summary else 'Evicted'} {len(old)} old messages: "
+            f"~{before} -> ~{self.prompt_tokens(compacted)} tokens"
+        )
+        return compacted
+
+    def report(self, history, actual_tokens=None):
+        self.turn += 1
+        estimate = self.prompt_tokens(history)
+        actual = f", {actual_tokens} reported by the LLM" if actual_tokens else ""
+        print(
+            f"[MEM] Turn {self.turn}: prompt ~{estimate} tokens{actual} "
+            f"(budget {self.budget}, {len(history)} messages)"
+        )
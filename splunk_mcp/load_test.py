@@ -0,0 +1,106 @@
+"""Load test for chat_server.py.
+
+N simulated users each open a session and send their questions one after
+another, all users at once. Reports turn latency percentiles, server-side
+queueing and throughput.
+
+    python splunk_mcp/load_test.py --users 20 --turns 3
+    python splunk_mcp/load_test.py --url http://chat-host:8100 --users 50 --message "dspmq"
+"""
+
+import argparse
+import asyncio
+import math
+import time
+
+import httpx
+
+DEFAULT_MESSAGES = [
+    "Show the status of all queue managers",
+    "Which queues have messages waiting?",
+    "Any MQ errors in Splunk in the last hour?",
+]
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+async def simulate_user(client, user, messages, turns, results):
+    try:
+        response = await client.post("/sessions")
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+    except Exception as e:
+        results["errors"].append(f"user {user}: could not open a session: {e}")
+        return
+
+    try:
+        for turn in range(turns):
+            message = messages[(user + turn) % len(messages)]
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"/sessions/{session_id}/messages", json={"message": message})
+                response.raise_for_status()
+            except Exception as e:
+                results["errors"].append(f"user {user} turn {turn + 1}: {e}")
+                continue
+            results["latencies"].append(time.perf_counter() - started)
+            results["queued"].append(response.json().get("queued_seconds", 0.0))
+    finally:
+        try:
+            await client.delete(f"/sessions/{session_id}")
+        except httpx.HTTPError:
+            pass
+
+
+async def run(url, users, turns, messages, timeout):
+    results = {"latencies": [], "queued": [], "errors": []}
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            simulate_user(client, user, messages, turns, results) for user in range(users)
+        ))
+        elapsed = time.perf_counter() - started
+        try:
+            health = (await client.get("/health")).json()
+        except Exception:
+            health = {}
+    return results, elapsed, health
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the multi-user chat server")
+    parser.add_argument("--url", default="http://localhost:8100")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent users")
+    parser.add_argument("--turns", type=int, default=3, help="Messages per user")
+    parser.add_argument("--message", action="append", help="Message to send (repeatable)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    results, elapsed, health = asyncio.run(
+        run(args.url, args.users, args.turns, args.message or DEFAULT_MESSAGES, args.timeout)
+    )
+
+    latencies, queued = results["latencies"], results["queued"]
+    print(f"{args.users} users x {args.turns} turns in {elapsed:.1f}s")
+    if latencies:
+        print(
+            f"Turn latency: p50 {percentile(latencies, 50):.2f}s  p95 {percentile(latencies, 95):.2f}s  "
+            f"max {max(latencies):.2f}s"
+        )
+        print(f"Queued at server: p50 {percentile(queued, 50):.2f}s  p95 {percentile(queued, 95):.2f}s")
+        print(f"Throughput: {len(latencies) / elapsed:.2f} turns/sec")
+    print(f"Completed turns: {len(latencies)}, errors: {len(results['errors'])}")
+    for error in results["errors"][:10]:
+        print(f"  {error}")
+    if health:
+        print(f"Server: {health}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Shape MCP tool results before they go into the LLM prompt.
+
+Splunk searches return up to max_results raw events, each carrying a dozen
+internal fields (_bkt, _cd, punct, date_*, ...) and mostly repeating the same
+few messages. Before the result reaches the model:
+- Internal Splunk fields are dropped (field projection); _raw and _time stay.
+- Events whose _raw differs only in volatile values (timestamps, PIDs, message
+  and correlation ids, long numbers) are merged into one row with an
+  occurrence count and first/last time.
+- Rows are ordered by count and only the top RESULT_TOP_N are kept.
+- The rendered text is capped at RESULT_MAX_TOKENS (~4 chars per token).
+Anything dropped is announced with an "N more ... omitted" marker.
+
+Text results (the MQ tools' MQSC output) get repeated lines collapsed and the
+same size cap.
+"""
+
+import json
+import os
+import re
+
+RESULT_SHAPING = os.getenv("RESULT_SHAPING", "true").lower() == "true"
+RESULT_MAX_TOKENS = int(os.getenv("RESULT_MAX_TOKENS", "1500"))
+RESULT_TOP_N = int(os.getenv("RESULT_TOP_N", "20"))
+
+KEEP_INTERNAL_FIELDS = {"_raw", "_time"}
+DROP_FIELDS = {
+    "punct", "linecount", "splunk_server", "splunk_server_group",
+    "timestartpos", "timeendpos", "eventtype", "tag", "tag::eventtype",
+}
+DROP_PREFIXES = ("date_",)
+
+VOLATILE_VALUES = [
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<TS>"),
+    (re.compile(r"\b[A-Z][a-z]{2} +\d{1,2} \d{2}:\d{2}:\d{2}\b"), "<TS>"),
+    (re.compile(r"(\w\[)\d+(\])"), r"\1<PID>\2"),
+    (re.compile(r"\b(PID|pid|MsgID|MsgId|CorrelationID|CorrelId)([=:] ?)[^\s,\"]+"), r"\1\2<ID>"),
+    (re.compile(r"\b[0-9a-fA-F]{16,}\b"), "<HEX>"),
+    (re.compile(r"\b\d{6,}\b"), "<N>"),
+]
+
+
+def raw_template(raw):
+    """Mask the values that change between repeats of the same event"""
+    for pattern, replacement in VOLATILE_VALUES:
+        raw = pattern.sub(replacement, raw)
+    return raw
+
+
+def keep_field(name):
+    if name.startswith("_"):
+        return name in KEEP_INTERNAL_FIELDS
+    return name not in DROP_FIELDS and not name.startswith(DROP_PREFIXES)
+
+
+def is_row(value):
+    """A flat Splunk result row: values are strings, numbers or lists of them"""
+    return isinstance(value, dict) and not any(
+        isinstance(v, dict) or (isinstance(v, list) and any(isinstance(i, (dict, list)) for i in v))
+        for v in value.values()
+    )
+
+
+def numeric(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def shape_rows(rows, top_n=RESULT_TOP_N):
+    """Project, dedup and rank result rows.
+
+    Returns (rows to show, summary line). Event rows (with _raw) are grouped
+    by raw_template; other rows (stats output) only merge exact duplicates
+    and are ranked by their own count field when they have one.
+    """
+    groups = {}
+    for row in rows:
+        projected = {k: v for k, v in row.items() if keep_field(k)}
+        if "_raw" in projected:
+            key = raw_template(str(projected["_raw"]))
+        else:
+            key = json.dumps(projected, sort_keys=True, default=str)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = {"row": projected, "occurrences": 1,
+                           "first_time": projected.get("_time"), "last_time": projected.get("_time")}
+            continue
+        group["occurrences"] += 1
+        time_ = projected.get("_time")
+        if time_:
+            if not group["first_time"] or time_ < group["first_time"]:
+                group["first_time"] = time_
+            if not group["last_time"] or time_ > group["last_time"]:
+                group["last_time"] = time_
+
+    def rank(group):
+        count = numeric(group["row"].get("count"))
+        return group["occurrences"] if count is None else max(count, group["occurrences"])
+
+    ranked = sorted(groups.values(), key=rank, reverse=True)
+    shown = []
+    for group in ranked[:top_n]:
+        row = dict(group["row"])
+        if group["occurrences"] > 1:
+            row.pop("_time", None)
+            row = {"occurrences": group["occurrences"], "first_time": group["first_time"],
+                   "last_time": group["last_time"], **row}
+        shown.append(row)
+
+    summary = f"{len(rows)} results -> {len(groups)} distinct"
+    if len(ranked) > top_n:
+        omitted = sum(group["occurrences"] for group in ranked[top_n:])
+        summary += f", top {top_n} shown ({len(ranked) - top_n} more distinct omitted, {omitted} results)"
+    return shown, summary
+
+
+def render(value, top_n=RESULT_TOP_N, indent=""):
+    """Render a parsed JSON result as lines, shaping every list of result rows"""
+    if isinstance(value, list) and value and all(is_row(item) for item in value):
+        rows, summary = shape_rows(value, top_n)
+        return [f"{indent}[{summary}]"] + [
+            indent + json.dumps(row, separators=(",", ":"), default=str) for row in rows
+        ]
+    if isinstance(value, list):
+        lines = []
+        for item in value:
+            lines.extend(render(item, top_n, indent) if isinstance(item, (dict, list))
+                         else [indent + json.dumps(item, default=str)])
+        return lines
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, (dict, list)) and item:
+                lines.append(f"{indent}{key}:")
+                lines.extend(render(item, top_n, indent + "  "))
+            else:
+                lines.append(f"{indent}{key}: {json.dumps(item, default=str)}")
+        return lines
+    return [indent + json.dumps(value, default=str)]
+
+
+def text_lines(text):
+    """Text output with blank lines dropped and consecutive repeats collapsed"""
+    lines = []
+    previous, repeats = None, 0
+    for line in text.splitlines() + [None]:
+        line = line.rstrip() if line is not None else None
+        if line == "":
+            continue
+        if line == previous:
+            repeats += 1
+            continue
+        if previous is not None:
+            lines.append(previous + (f"  (repeated {repeats + 1} times)" if repeats else ""))
+        previous, repeats = line, 0
+    return lines
+
+
+def cap_lines(lines, max_tokens=RESULT_MAX_TOKENS):
+    """Join lines up to max_tokens (~4 chars each), marking what was cut"""
+    max_chars = max_tokens * 4
+    kept, size = [], 0
+    for i, line in enumerate(lines):
+        size += len(line) + 1
+        if size > max_chars and kept:
+            rest = lines[i:]
+            chars = sum(len(other) + 1 for other in rest)
+            kept.append(f"[{len(rest)} more lines omitted, ~{chars // 4} tokens]")
+            break
+        kept.append(line if size <= max_chars else line[:max_chars] + " [line truncated]")
+    return "\n".join(kept)
+
+
+def parse_content(content):
+    """MCP content -> parsed JSON, or None when it is not JSON.
+
+    Depending on the MCP version a list result arrives as one JSON text item
+    or as one item per element; both come back as a list.
+    """
+    if isinstance(content, str):
+        content = [content]
+    texts = [getattr(item, "text", item if isinstance(item, str) else None) for item in content]
+    if not texts or any(text is None for text in texts):
+        return None
+    try:
+        values = [json.loads(text) for text in texts]
+    except ValueError:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def shape_content(content, max_tokens=RESULT_MAX_TOKENS, top_n=RESULT_TOP_N):
+    """Shaped text for a tool result's content (str or a list of MCP content items)"""
+    value = parse_content(content)
+    if value is not None and isinstance(value, (dict, list)):
+        lines = render(value, top_n)
+    else:
+        if isinstance(content, str):
+            text = content
+        else:
+            text = "\n".join(getattr(item, "text", str(item)) for item in content)
+        lines = text_lines(text)
+    return cap_lines(lines, max_tokens)
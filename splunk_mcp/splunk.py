@@ -1,20 +1,31 @@
 import os
 import asyncio
+import functools
 import sys
 import json
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
 import google.generativeai as genai
 try:
     from openai import AsyncOpenAI
 except ImportError:
     AsyncOpenAI = None
 from splunk_config import get_system_prompt
+from conversation_memory import (
+    FETCH_TOOL,
+    MEMORY_SUMMARIZE,
+    ConversationMemory,
+    GeminiHistory,
+    OpenAIHistory,
+    ToolResultStore,
+)
+from result_shaping import RESULT_SHAPING, shape_content
 
 
 script_dir = Path(__file__).resolve().parent
@@ -34,14 +45,172 @@ print(f"   GOOGLE_API_KEY: {'SET' if os.getenv('GOOGLE_API_KEY') else 'NOT SET'}
 print(f"   OPENAI_API_KEY: {'SET' if os.getenv('OPENAI_API_KEY') else 'NOT SET'}\n")
 print(f"   LLM_CONNECTION: {os.getenv('LLM_CONNECTION', 'gemini')}")
 
-class SplunkChatbot:
+# Gemini calls use the SDK's async API; this bounded pool is only the fallback
+# for blocking calls, so they never compete with input() for the default pool.
+LLM_EXECUTOR_WORKERS = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))
+LLM_NATIVE_ASYNC = os.getenv("LLM_NATIVE_ASYNC", "true").lower() == "true"
+llm_executor = ThreadPoolExecutor(max_workers=LLM_EXECUTOR_WORKERS, thread_name_prefix="llm")
+input_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="input")
+
+# "json": the model replies with a {"tool": ..., "args": ...} object (one tool per turn).
+# "native": Gemini/OpenAI function calling with the MCP tool schemas; several
+# calls per turn run concurrently and results go straight back to the model.
+TOOL_CALLING_MODE = os.getenv("TOOL_CALLING_MODE", "json").lower()
+MAX_TOOL_ROUNDS = int(os.getenv("MAX_TOOL_ROUNDS", "5"))
+
+GEMINI_MODEL = "gemini-2.5-flash"
+OPENAI_MODEL = "gpt-4o"
+
+# Gemini's equivalent of OpenAI's tool_choice="none"
+GEMINI_TEXT_ONLY = {"function_calling_config": {"mode": "NONE"}}
+
+def gemini_schema(schema):
+    """Convert an MCP (JSON Schema) input schema into the OpenAPI subset that
+    Gemini function declarations accept"""
+    schema = dict(schema or {})
+    nullable = False
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = schema.pop(key)
+            non_null = [o for o in options if o.get("type") != "null"]
+            nullable = nullable or len(non_null) < len(options)
+            if non_null:
+                schema = {**non_null[0], **schema}
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        nullable = nullable or "null" in schema_type
+        schema_type = next((t for t in schema_type if t != "null"), None)
+    schema_type = schema_type or ("object" if "properties" in schema else "string")
+
+    result = {}
+    if schema_type == "object":
+        properties = {k: gemini_schema(v) for k, v in schema.get("properties", {}).items()}
+        if properties:
+            result = {"type": "OBJECT", "properties": properties}
+            required = [k for k in schema.get("required", []) if k in properties]
+            if required:
+                result["required"] = required
+        else:
+            # Gemini rejects objects without properties; take them as JSON text
+            result = {"type": "STRING"}
+            schema["description"] = (schema.get("description", "") + " (JSON object)").strip()
+    elif schema_type == "array":
+        result = {"type": "ARRAY", "items": gemini_schema(schema.get("items") or {"type": "string"})}
+    else:
+        result = {"type": schema_type.upper()}
+        if "enum" in schema:
+            result = {"type": "STRING", "enum": [str(v) for v in schema["enum"]]}
+
+    description = schema.get("description")
+    if description:
+        result["description"] = description
+    if nullable:
+        result["nullable"] = True
+    return result
+
+def gemini_function_declarations(tools):
+    declarations = []
+    for tool in tools:
+        declaration = {"name": tool.name, "description": tool.description or ""}
+        parameters = gemini_schema(tool.inputSchema)
+        if parameters.get("type") == "OBJECT":
+            declaration["parameters"] = parameters
+        declarations.append(declaration)
+    return declarations
+
+def openai_tools(tools):
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description or "",
+                "parameters": tool.inputSchema or {"type": "object", "properties": {}},
+            },
+        }
+        for tool in tools
+    ]
+
+def content_text(content):
+    """Flatten MCP tool result content into text for the model"""
+    if isinstance(content, str):
+        return content
+    return "\n".join(getattr(item, "text", str(item)) for item in content)
+
+@lru_cache(maxsize=None)
+def shared_openai_client(api_key):
+    """One AsyncOpenAI client (and HTTP connection pool) per API key, shared by all conversations"""
+    return AsyncOpenAI(api_key=api_key)
+
+class MCPToolHub:
+    """MCP sessions and their tools. Set up once and shared by every
+    conversation; ClientSession handles concurrent requests itself."""
+
     def __init__(self):
+        self.sessions = {}
+        self.tool_map = {}
+        self.tools = []
+        self.system_prompt = ""
+
+    async def setup(self, sessions):
+        """Initialize the MCP sessions and gather their tools"""
+        self.sessions = sessions
+        self.tool_map = {}
+        self.tools = []
+
+        # Initialize all sessions and gather tools
+        for session_name, session in self.sessions.items():
+            print(f"[I] Initializing {session_name} session...")
+            await session.initialize()
+
+            tools_response = await session.list_tools()
+            for tool in tools_response.tools:
+                self.tool_map[tool.name] = session_name
+                self.tools.append(tool)
+
+        # Local tool for paging through results stored by reference
+        self.tool_map[FETCH_TOOL.name] = "local"
+        self.tools.append(FETCH_TOOL)
+
+        print(f"Tools: {[t.name for t in self.tools]}\n")
+        self.system_prompt = get_system_prompt(self.tools, native_tools=TOOL_CALLING_MODE == "native")
+
+    async def call_tool(self, tool_name, args):
+        print(f"\n{'='*60}")
+        print(f"[Executing Tool: {tool_name}]")
+        print(f"[Arguments:]")
+        for key, value in args.items():
+            print(f"  - {key}: {value}")
+        print(f"{'='*60}\n")
+
+        if tool_name not in self.tool_map or self.tool_map[tool_name] == "local":
+            raise ValueError(f"Unknown tool: {tool_name}")
+
+        session_name = self.tool_map[tool_name]
+        session = self.sessions[session_name]
+
+        result = await session.call_tool(tool_name, args)
+        return result.content
+
+class SplunkChatbot:
+    """One conversation: LLM history, memory and stored tool results. The MCP
+    tools come from a MCPToolHub that many conversations can share."""
+
+    def __init__(self, hub=None):
         self.llm_type = os.getenv("LLM_CONNECTION", "gemini").lower()
+        self.hub = hub or MCPToolHub()
         self.chat = None
         self.openai_client = None
         self.messages = []  # History for OpenAI
-        self.sessions = {}
-        self.tool_map = {}
+        self.openai_tools = []
+        # Large tool results live here; the prompt only carries a preview and a ref
+        self.tool_results = ToolResultStore()
+        self.last_prompt_tokens = None
+        self.memory = ConversationMemory(
+            OpenAIHistory if self.llm_type == "openai" else GeminiHistory,
+            summarizer=self.summarize if MEMORY_SUMMARIZE else None,
+        )
 
         if self.llm_type == "openai":
             api_key = os.getenv("OPENAI_API_KEY")
@@ -49,82 +218,197 @@ class SplunkChatbot:
                 raise ValueError("OPENAI_API_KEY not found in environment")
             if not AsyncOpenAI:
                  raise ImportError("openai package not installed. Run 'pip install openai'")
-            self.openai_client = AsyncOpenAI(api_key=api_key)
-            print("[I] Using OpenAI LLM")
+            self.openai_client = shared_openai_client(api_key)
         else:
             api_key = os.getenv("GOOGLE_API_KEY")
             if not api_key:
                 raise ValueError("GOOGLE_API_KEY not found in environment")
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel("gemini-2.5-flash")
-            print("[I] Using Gemini LLM")
+            self.model = genai.GenerativeModel(GEMINI_MODEL)
 
     # Initial Setup
     async def setup_bot(self, sessions):
         """Setup Chatbot with multiple MCP sessions"""
-        self.sessions = sessions
-        self.tool_map = {}
-        
-        all_tools = []
-        
-        # Initialize all sessions and gather tools
-        for session_name, session in self.sessions.items():
-            print(f"[I] Initializing {session_name} session...")
-            await session.initialize()
-            
-            tools_response = await session.list_tools()
-            for tool in tools_response.tools:
-                self.tool_map[tool.name] = session_name
-                all_tools.append(tool)
-                
-        print(f"Tools: {[t.name for t in all_tools]}\n")
+        print(f"[I] Using {'OpenAI' if self.llm_type == 'openai' else 'Gemini'} LLM")
+        await self.hub.setup(sessions)
+        await self.start_conversation()
 
-        # Start chat with system prompt from config
-        system_msg = get_system_prompt(all_tools)
+    async def start_conversation(self):
+        """Start this conversation's LLM history with the hub's tools"""
+        native = TOOL_CALLING_MODE == "native"
+        system_msg = self.hub.system_prompt
 
         if self.llm_type == "openai":
-             print("[I] System prompt generated. Initializing OpenAI history...")
              self.messages = [{"role": "system", "content": system_msg}]
+             if native:
+                 self.openai_tools = openai_tools(self.hub.tools)
         else:
-            print("[I] System prompt generated. Starting Gemini chat...")
+            if native:
+                self.model = genai.GenerativeModel(
+                    GEMINI_MODEL,
+                    tools=[{"function_declarations": gemini_function_declarations(self.hub.tools)}],
+                )
             # Initialize Gemini chat
-            loop = asyncio.get_event_loop()
             self.chat = self.model.start_chat(history=[])
-            await loop.run_in_executor(None, self.chat.send_message, system_msg)
+            await self.gemini_send(system_msg)
+
+    async def gemini_send(self, message, tool_config=None):
+        """Send to the Gemini chat without blocking the event loop"""
+        if LLM_NATIVE_ASYNC and hasattr(self.chat, "send_message_async"):
+            response = await self.chat.send_message_async(message, tool_config=tool_config)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                llm_executor, functools.partial(self.chat.send_message, message, tool_config=tool_config)
+            )
+        usage = getattr(response, "usage_metadata", None)
+        self.last_prompt_tokens = getattr(usage, "prompt_token_count", None)
+        return response
+
+    async def openai_complete(self, **kwargs):
+        """Chat completion over self.messages, recording the prompt size"""
+        response = await self.openai_client.chat.completions.create(
+            model=OPENAI_MODEL, messages=self.messages, **kwargs
+        )
+        usage = getattr(response, "usage", None)
+        self.last_prompt_tokens = getattr(usage, "prompt_tokens", None)
+        return response
+
+    # Memory
+    def history(self):
+        return self.messages if self.llm_type == "openai" else self.chat.history
+
+    async def summarize(self, prompt):
+        """Summarize old turns with a stateless call, outside the chat history"""
+        if self.llm_type == "openai":
+            response = await self.openai_client.chat.completions.create(
+                model=OPENAI_MODEL, messages=[{"role": "user", "content": prompt}]
+            )
+            return response.choices[0].message.content
+        response = await genai.GenerativeModel(GEMINI_MODEL).generate_content_async(prompt)
+        return response.text
+
+    async def compact_memory(self):
+        """Keep the history within MEMORY_TOKEN_BUDGET before the next turn"""
+        if self.llm_type == "openai":
+            # The system prompt is pinned
+            self.messages = await self.memory.compact(self.messages, pinned=1)
+        else:
+            # The system prompt and Gemini's reply to it are pinned
+            history = self.chat.history
+            compacted = await self.memory.compact(history, pinned=2)
+            if len(compacted) != len(history):
+                self.chat.history = compacted
+
+    def tool_result_text(self, tool_name, content):
+        """Tool result as it goes into the prompt: shaped (see result_shaping.py),
+        with the full result stored by reference when anything was cut"""
+        text = content_text(content)
+        if tool_name == FETCH_TOOL.name:
+            return text
+        if RESULT_SHAPING:
+            return self.tool_results.put(tool_name, text, preview=shape_content(content))
+        return self.tool_results.put(tool_name, text)
 
     # Tools Setup
     async def call_tool(self, tool_name, args):
-        print(f"\n{'='*60}")
-        print(f"[Executing Tool: {tool_name}]")
-        print(f"[Arguments:]")
-        for key, value in args.items():
-            print(f"  - {key}: {value}")
-        print(f"{'='*60}\n")
-        
-        if tool_name not in self.tool_map:
-            raise ValueError(f"Unknown tool: {tool_name}")
-            
-        session_name = self.tool_map[tool_name]
-        session = self.sessions[session_name]
-        
-        result = await session.call_tool(tool_name, args)
-        return result.content
+        if tool_name == FETCH_TOOL.name:
+            return self.tool_results.fetch(**args)
+        return await self.hub.call_tool(tool_name, args)
+
+    async def run_tool_call(self, tool_name, args):
+        """Run one model-requested tool call, returning errors as text for the model"""
+        try:
+            if isinstance(args, str):
+                args = json.loads(args or "{}")
+            return self.tool_result_text(tool_name, await self.call_tool(tool_name, args))
+        except Exception as e:
+            print(f"Tool execution error: {e}")
+            return f"Error: {e}"
+
+    async def send_message_native(self, message):
+        """One user turn with native function calling. All tool calls the model
+        makes in a round run concurrently; the loop ends when it answers in text."""
+        if self.llm_type == "openai":
+            self.messages.append({"role": "user", "content": message})
+            for round_number in range(MAX_TOOL_ROUNDS + 1):
+                response = await self.openai_complete(
+                    tools=self.openai_tools,
+                    # Out of rounds: make the model answer with what it has
+                    tool_choice="auto" if round_number < MAX_TOOL_ROUNDS else "none",
+                )
+                reply = response.choices[0].message
+                if not reply.tool_calls:
+                    self.messages.append({"role": "assistant", "content": reply.content})
+                    return reply.content
+
+                self.messages.append({
+                    "role": "assistant",
+                    "content": reply.content,
+                    "tool_calls": [
+                        {
+                            "id": call.id,
+                            "type": "function",
+                            "function": {"name": call.function.name, "arguments": call.function.arguments},
+                        }
+                        for call in reply.tool_calls
+                    ],
+                })
+                results = await asyncio.gather(*(
+                    self.run_tool_call(call.function.name, call.function.arguments)
+                    for call in reply.tool_calls
+                ))
+                for call, result in zip(reply.tool_calls, results):
+                    self.messages.append({"role": "tool", "tool_call_id": call.id, "content": result})
+            return ""
+
+        content = message
+        for round_number in range(MAX_TOOL_ROUNDS + 1):
+            response = await self.gemini_send(
+                content,
+                # Out of rounds: make the model answer with what it has. A function
+                # call left without a response would break every later turn
+                tool_config=None if round_number < MAX_TOOL_ROUNDS else GEMINI_TEXT_ONLY,
+            )
+            calls = [part.function_call for part in response.parts if part.function_call.name]
+            if not calls or round_number == MAX_TOOL_ROUNDS:
+                break
+            results = await asyncio.gather(*(
+                self.run_tool_call(call.name, type(call).to_dict(call).get("args", {}))
+                for call in calls
+            ))
+            content = [
+                genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                    name=call.name, response={"result": result}
+                ))
+                for call, result in zip(calls, results)
+            ]
+        try:
+            return response.text
+        except ValueError:
+            # Still asking for tools after MAX_TOOL_ROUNDS
+            return "Sorry, I could not finish that investigation. Please narrow the question."
 
     # Chat loop
     async def send_message(self, message):
-        loop = asyncio.get_event_loop()
+        await self.compact_memory()
+        if TOOL_CALLING_MODE == "native":
+            text = await self.send_message_native(message)
+        else:
+            text = await self.send_message_json(message)
+        self.memory.report(self.history(), self.last_prompt_tokens)
+        return text
+
+    async def send_message_json(self, message):
         text = ""
 
         if self.llm_type == "openai":
             self.messages.append({"role": "user", "content": message})
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4o",  # or gpt-3.5-turbo
-                messages=self.messages
-            )
+            response = await self.openai_complete()
             text = response.choices[0].message.content
             self.messages.append({"role": "assistant", "content": text})
         else:
-            response = await loop.run_in_executor(None, self.chat.send_message, message)
+            response = await self.gemini_send(message)
             text = response.text
 
         # Check if response has tool call (JSON)
@@ -135,24 +419,21 @@ class SplunkChatbot:
                 tool_data = json.loads(text[start:end])
 
                 # Execute tool
-                result = await self.call_tool(tool_data["tool"], tool_data["args"])
+                result = self.tool_result_text(
+                    tool_data["tool"], await self.call_tool(tool_data["tool"], tool_data["args"])
+                )
 
                 # Get final answer
                 if self.llm_type == "openai":
                     # For OpenAI, append tool result and ask for summary
                     self.messages.append({"role": "user", "content": f"Tool result: {result}\n\nSummarize for user:"})
-                    final = await self.openai_client.chat.completions.create(
-                         model="gpt-4o",
-                         messages=self.messages
-                    )
+                    final = await self.openai_complete()
                     final_text = final.choices[0].message.content
                     self.messages.append({"role": "assistant", "content": final_text})
                     return final_text
                 else:
-                    final = await loop.run_in_executor(
-                        None,
-                        self.chat.send_message,
-                        f"Tool result: {result}\n\nSummarize for user:",
+                    final = await self.gemini_send(
+                        f"Tool result: {result}\n\nSummarize for user:"
                     )
                     return final.text
             except Exception as e:
@@ -164,12 +445,12 @@ class SplunkChatbot:
     async def run_chat_loop(self):
         print("Type 'exit' to quit\n")
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         while True:
             try:
                 user_input = await loop.run_in_executor(
-                    None, lambda: input("You: ").strip()
+                    input_executor, lambda: input("You: ").strip()
                 )
 
                 if user_input.lower() in ["exit", "quit"]:
@@ -186,11 +467,10 @@ class SplunkChatbot:
                 print(f"Error: {e}")
 
 
-async def main():
-    print("=" * 50)
-    print("Splunk Chatbot")
-    print("=" * 50)
-
+@asynccontextmanager
+async def connect_mcp_servers():
+    """Start the Splunk and IBM MQ MCP servers over stdio and yield their
+    (not yet initialized) client sessions by name"""
     # Verify environment variables are loaded
     splunk_host = os.getenv("SPLUNK_HOST") or ""
     splunk_port = os.getenv("SPLUNK_PORT") or ""
@@ -209,45 +489,51 @@ async def main():
         }
     )
 
-
     # Start MCP server (Splunk)
     server_script = script_dir.parent / "server" / "splunk_mcp.py"
     if not server_script.exists():
-        print(f"[X] Server script not found at: {server_script}")
-        return
+        raise FileNotFoundError(f"Server script not found at: {server_script}")
 
     splunk_params = StdioServerParameters(
         command=sys.executable,
         args=[str(server_script), "stdio"],
         env=subprocess_env,
     )
-    
+
     # Start MCP server (IBM MQ)
     mq_script = script_dir.parent / "server" / "mqmcpserver.py"
     if not mq_script.exists():
-        print(f"[X] MQ Server script not found at: {mq_script}")
-        return
-        
+        raise FileNotFoundError(f"MQ Server script not found at: {mq_script}")
+
     mq_params = StdioServerParameters(
         command=sys.executable,
         args=[str(mq_script)],
         env=subprocess_env,
     )
 
+    # Connect to both servers
+    async with stdio_client(splunk_params) as (splunk_r, splunk_w), \
+               stdio_client(mq_params) as (mq_r, mq_w):
+
+        async with ClientSession(splunk_r, splunk_w) as splunk_session, \
+                   ClientSession(mq_r, mq_w) as mq_session:
+
+            yield {
+                "splunk": splunk_session,
+                "mq": mq_session
+            }
+
+
+async def main():
+    print("=" * 50)
+    print("Splunk Chatbot")
+    print("=" * 50)
+
     try:
-        # Connect to both servers
-        async with stdio_client(splunk_params) as (splunk_r, splunk_w), \
-                   stdio_client(mq_params) as (mq_r, mq_w):
-            
-            async with ClientSession(splunk_r, splunk_w) as splunk_session, \
-                       ClientSession(mq_r, mq_w) as mq_session:
-                
-                bot = SplunkChatbot()
-                await bot.setup_bot({
-                    "splunk": splunk_session,
-                    "mq": mq_session
-                })
-                await bot.run_chat_loop()
+        async with connect_mcp_servers() as sessions:
+            bot = SplunkChatbot()
+            await bot.setup_bot(sessions)
+            await bot.run_chat_loop()
 
     except Exception as e:
         print(f"[X] Connection failed: {e}")
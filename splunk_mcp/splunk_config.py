@@ -1,3 +1,5 @@
+import json
+
 SPLUNK_CONFIG = {
     # All MQ logs land here
     "default_index": "ibmmq",
@@ -67,8 +69,19 @@ SPLUNK_CONFIG = {
     ]
 }
 
-def get_system_prompt(tools):
-    """Generate MQ-focused system prompt for Splunk + MQ MCP"""
+def format_tool_call(name, args, native_tools=False):
+    """Example tool call as the model should produce it"""
+    if native_tools:
+        arg_str = ", ".join(f"{key}={json.dumps(value)}" for key, value in args.items())
+        return f"(function call) {name}({arg_str})"
+    return json.dumps({"tool": name, "args": args})
+
+def get_system_prompt(tools, native_tools=False):
+    """Generate MQ-focused system prompt for Splunk + MQ MCP.
+
+    native_tools: the model calls tools through the LLM's function-calling API
+    instead of replying with a JSON object.
+    """
 
     sourcetypes_str = ", ".join(SPLUNK_CONFIG["common_sourcetypes"])
     sources_str = ", ".join(SPLUNK_CONFIG["common_sources"])
@@ -81,6 +94,30 @@ def get_system_prompt(tools):
 
     tools_str = "\n".join(f"- {t.name}: {t.description}" for t in tools)
 
+    if native_tools:
+        tool_call_rule = """7. Call tools through function calling. When several checks are independent
+   (e.g. dspmq and a Splunk search), request them together in the same turn;
+   they run in parallel and all results come back at once"""
+    else:
+        tool_call_rule = """7. When calling ANY tool, respond with ONLY JSON:
+   {
+     "tool": "tool_name",
+     "args": { "param": "value" }
+   }
+   ❌ No explanations outside JSON"""
+
+    errors_call = format_tool_call(
+        "search_splunk",
+        {"search_query": f'index="{SPLUNK_CONFIG["default_index"]}" source="*amqerr*.log" earliest=-1d@d'},
+        native_tools,
+    )
+    dspmq_call = format_tool_call("dspmq", {}, native_tools)
+    runmqsc_call = format_tool_call(
+        "runmqsc",
+        {"qmgr_name": "QM1", "mqsc_command": "DISPLAY CHSTATUS(*) WHERE(STATUS EQ RETRYING)"},
+        native_tools,
+    )
+
     return f"""
 You are an **IBM MQ Operations Assistant** backed by **Splunk logs and live MQ commands**.
 
@@ -137,12 +174,10 @@ DO NOT generate Splunk queries for non-MQ data.
 4. Infer time range if user implies one
 5. Prefer *amqerr*.log for errors and incidents
 6. Translate natural language into accurate MQ-focused SPL
-7. When calling ANY tool, respond with ONLY JSON:
-   {{
-     "tool": "tool_name",
-     "args": {{ "param": "value" }}
-   }}
-   ❌ No explanations outside JSON
+{tool_call_rule}
+8. When an investigation needs several searches (e.g. errors, channel retries,
+   queue full and DLQ), run them in ONE search_splunk_batch call; template
+   names such as "mq errors" or "dlq issues" can be passed directly as queries
 
 --------------------------------------------------
 🔁 FALLBACK STRATEGY (MANDATORY)
@@ -155,6 +190,9 @@ Then you MUST:
 1. Check MQ status using MQ tools
    - dspmq → Queue manager status
    - runmqsc → Queue depth / channel status
+   - runmqsc_batch → Same checks across many queue managers in one call
+   - queue_depths / channel_status → Deepest queues and channels by status,
+     already filtered and sorted (prefer these over raw DISPLAY output)
 2. Correlate MQ command output with Splunk findings
 3. Present a combined operational insight
 
@@ -173,15 +211,15 @@ Example: 'Are there any MQ errors in the last 24 hours?'"
 
 User: "Any MQ errors today?"
 You:
-{{"tool": "search_splunk", "args": {{"query": "index=\\"{SPLUNK_CONFIG["default_index"]}\\" source=\\"*amqerr*.log\\" earliest=-1d@d"}}}}
+{errors_call}
 
 User: "Is QM1 running?"
 You:
-{{"tool": "dspmq", "args": {{}}}}
+{dspmq_call}
 
 User: "Show channels retrying on QM1"
 You:
-{{"tool": "runmqsc", "args": {{"qmgr_name": "QM1", "mqsc_command": "DISPLAY CHSTATUS(*) WHERE(STATUS EQ RETRYING)"}}}}
+{runmqsc_call}
 
 User: "What is Python?"
 You:
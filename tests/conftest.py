@@ -0,0 +1,28 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The notebooks, the MCP servers and the chatbot are run as scripts from their
+# own directories and import their neighbours as top-level modules
+for directory in ("notebooks", "server", "splunk_mcp"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def splunk_mcp(tmp_path_factory):
+    """server/splunk_mcp.py, imported without touching the working directory"""
+    for module in ("splunklib", "decouple", "mcp.server.fastmcp", "fastapi"):
+        pytest.importorskip(module)
+    # The server logs to splunk_mcp.log in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("splunk_mcp"))
+    try:
+        return importlib.import_module("splunk_mcp")
+    finally:
+        os.chdir(cwd)
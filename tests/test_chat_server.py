@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+for module in ("dotenv", "mcp", "google.generativeai", "fastapi", "uvicorn"):
+    pytest.importorskip(module)
+
+from fastapi import HTTPException
+
+import chat_server
+from chat_server import ChatSessions
+
+
+class FakeBot:
+    """Stands in for SplunkChatbot; start_conversation waits on the class gate"""
+
+    gate = None
+    fail = False
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    async def start_conversation(self):
+        if FakeBot.gate is not None:
+            await FakeBot.gate.wait()
+        if FakeBot.fail:
+            raise RuntimeError("LLM unavailable")
+
+    async def send_message(self, message):
+        return f"echo: {message}"
+
+
+@pytest.fixture(autouse=True)
+def fake_bot(monkeypatch):
+    monkeypatch.setattr(chat_server, "SplunkChatbot", FakeBot)
+    FakeBot.gate = None
+    FakeBot.fail = False
+
+
+async def test_create_rejects_sessions_over_the_limit():
+    sessions = ChatSessions(hub=None, max_concurrent_turns=2, max_sessions=1, ttl=60)
+    await sessions.create()
+
+    with pytest.raises(HTTPException) as error:
+        await sessions.create()
+
+    assert error.value.status_code == 503
+    assert len(sessions.sessions) == 1
+
+
+async def test_concurrent_creates_reserve_their_slot():
+    sessions = ChatSessions(hub=None, max_concurrent_turns=4, max_sessions=2, ttl=60)
+    FakeBot.gate = asyncio.Event()
+
+    pending = [asyncio.create_task(sessions.create()) for _ in range(3)]
+    await asyncio.sleep(0)
+    FakeBot.gate.set()
+    results = await asyncio.gather(*pending, return_exceptions=True)
+
+    assert sum(isinstance(r, str) for r in results) == 2
+    assert [r.status_code for r in results if isinstance(r, HTTPException)] == [503]
+    assert len(sessions.sessions) == 2
+    assert sessions.starting == 0
+
+
+async def test_failed_startup_releases_its_slot():
+    sessions = ChatSessions(hub=None, max_concurrent_turns=1, max_sessions=1, ttl=60)
+    FakeBot.fail = True
+    with pytest.raises(RuntimeError):
+        await sessions.create()
+
+    FakeBot.fail = False
+    assert await sessions.create() in sessions.sessions
+    assert sessions.starting == 0
+
+
+async def test_expire_keeps_sessions_with_open_sockets():
+    sessions = ChatSessions(hub=None, max_concurrent_turns=1, max_sessions=5, ttl=-1)
+    attached_id, attached = await sessions.attach()
+    idle_id = await sessions.create()
+
+    sessions.expire()
+
+    assert attached_id in sessions.sessions
+    assert idle_id not in sessions.sessions
+
+    sessions.detach(attached)
+    sessions.expire()
+    assert attached_id not in sessions.sessions
+
+
+async def test_turn_runs_the_message_and_counts_it():
+    sessions = ChatSessions(hub=None, max_concurrent_turns=1, max_sessions=5, ttl=60)
+    session_id = await sessions.create()
+
+    result = await sessions.turn(session_id, "hello")
+
+    assert result["session_id"] == session_id
+    assert result["response"] == "echo: hello"
+    assert sessions.sessions[session_id].turns == 1
+    assert sessions.stats()["active_turns"] == 0
+
+
+async def test_turn_on_unknown_session_is_404():
+    sessions = ChatSessions(hub=None, max_concurrent_turns=1, max_sessions=5, ttl=60)
+
+    with pytest.raises(HTTPException) as error:
+        await sessions.turn("missing", "hello")
+
+    assert error.value.status_code == 404
@@ -0,0 +1,83 @@
+from conversation_memory import ConversationMemory, GeminiHistory, OpenAIHistory, ToolResultStore
+
+
+def openai_history(turns, size=400):
+    history = [{"role": "system", "content": "system prompt"}]
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"question {turn}"})
+        history.append({"role": "assistant", "content": f"answer {turn} " + "x" * size})
+    return history
+
+
+async def test_history_within_budget_is_unchanged():
+    memory = ConversationMemory(OpenAIHistory, budget=10000, keep_turns=2)
+    history = openai_history(3)
+
+    assert await memory.compact(history) == history
+
+
+async def test_old_turns_are_replaced_by_a_summary():
+    transcripts = []
+
+    async def summarizer(text):
+        transcripts.append(text)
+        return "QM1 was down"
+
+    memory = ConversationMemory(OpenAIHistory, summarizer, budget=300, keep_turns=2)
+    history = openai_history(5)
+
+    compacted = await memory.compact(history)
+
+    assert compacted[0] == history[0]
+    assert compacted[1] == {"role": "system", "content": "Summary of the earlier conversation:\nQM1 was down"}
+    assert compacted[2:] == history[-4:]
+    assert "question 0" in transcripts[0] and "question 2" in transcripts[0]
+    assert "question 3" not in transcripts[0]
+
+
+async def test_old_turns_are_evicted_when_summarizing_fails():
+    async def summarizer(text):
+        raise RuntimeError("LLM unavailable")
+
+    memory = ConversationMemory(OpenAIHistory, summarizer, budget=300, keep_turns=1)
+    history = openai_history(4)
+
+    assert await memory.compact(history) == history[:1] + history[-2:]
+
+
+async def test_recent_turns_are_kept_even_over_budget():
+    memory = ConversationMemory(OpenAIHistory, budget=10, keep_turns=3)
+    history = openai_history(3)
+
+    assert await memory.compact(history) == history
+
+
+async def test_gemini_summary_keeps_turns_alternating():
+    history = [{"role": "user", "parts": [{"text": "system prompt"}]}, {"role": "model", "parts": [{"text": "ok"}]}]
+    for turn in range(3):
+        history.append({"role": "user", "parts": [{"text": f"question {turn}"}]})
+        history.append({"role": "model", "parts": [{"text": "y" * 400}]})
+
+    async def summarizer(text):
+        return "summary"
+
+    memory = ConversationMemory(GeminiHistory, summarizer, budget=200, keep_turns=1)
+
+    compacted = await memory.compact(history, pinned=2)
+
+    assert [GeminiHistory.role(item) for item in compacted] == ["user", "model"] * 3
+    assert compacted[-2:] == history[-2:]
+
+
+def test_large_tool_results_are_stored_by_reference():
+    store = ToolResultStore(inline_chars=10, max_results=2)
+
+    assert store.put("dspmq", "short") == "short"
+    shown = store.put("dspmq", "0123456789abcdef")
+    assert shown.startswith("0123456789\n[full result stored as ref=dspmq-1")
+    assert store.fetch("dspmq-1", offset=10) == "abcdef"
+    assert store.fetch("dspmq-1") == "0123456789\n[6 more characters; next offset=10]"
+
+    store.put("dspmq", "x" * 20)
+    store.put("dspmq", "y" * 20)
+    assert store.fetch("dspmq-1").startswith("Unknown or expired")
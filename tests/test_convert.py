@@ -0,0 +1,48 @@
+import time
+from multiprocessing.pool import ThreadPool
+
+from convert import bounded_imap, convert
+
+SYSLOG = (
+    "Nov 28 14:00:02 ace-host IntegrationNode[12025]: ACE0901W: Flow 'InvoiceFlow' reported a recoverable condition.\n"
+    "Nov 28 14:00:04 ace-host Trace[12089]: ACE0806E: Resource 'JDBCProvider' unavailable. PID=12089\n"
+    "Nov 28 14:00:05 ace-host ExecutionGroup[12517]: ACE0001I: Integration node 'INODE01' started.\n"
+)
+
+
+def slow_square(n):
+    # Early tasks finish last, so results arrive out of order
+    time.sleep(0.01 * (5 - n % 5))
+    return n * n
+
+
+def test_bounded_imap_keeps_input_order():
+    with ThreadPool(4) as pool:
+        assert list(bounded_imap(pool, slow_square, range(12), window=4)) == [n * n for n in range(12)]
+
+
+def test_bounded_imap_reads_at_most_window_tasks_ahead():
+    read = []
+
+    def tasks():
+        for n in range(20):
+            read.append(n)
+            yield n
+
+    with ThreadPool(2) as pool:
+        results = bounded_imap(pool, slow_square, tasks(), window=3)
+        assert next(results) == 0
+        assert len(read) == 3
+        assert next(results) == 1
+        assert len(read) == 4
+        assert list(results) == [n * n for n in range(2, 20)]
+
+
+def test_parallel_conversion_matches_a_single_worker(tmp_path):
+    source = tmp_path / "ace.log"
+    source.write_text(SYSLOG * 50)
+    single, parallel = tmp_path / "single.jsonl", tmp_path / "parallel.jsonl"
+
+    assert convert(str(source), str(single), year=2025, workers=1, chunk_bytes=256) == 150
+    assert convert(str(source), str(parallel), year=2025, workers=3, chunk_bytes=256) == 150
+    assert parallel.read_text() == single.read_text()
@@ -0,0 +1,112 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from embedding import BatchEmbedder, HashEmbeddings, TemplateCachedEmbeddings, is_rate_limited
+
+
+class RateLimitError(Exception):
+    code = 429
+
+
+class RecordingEmbeddings(HashEmbeddings):
+    """HashEmbeddings that records each call and can fail the first few"""
+
+    def __init__(self, failures=0, error=RateLimitError("429 RESOURCE_EXHAUSTED")):
+        super().__init__(dimensions=16)
+        self.calls = []
+        self.failures = failures
+        self.error = error
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        return super().embed_documents(texts)
+
+
+def test_hash_embeddings_are_deterministic_and_normalized():
+    embeddings = HashEmbeddings(dimensions=32)
+    vector = embeddings.embed_query("queue QM1 is full")
+    assert vector == embeddings.embed_documents(["queue QM1 is full"])[0]
+    assert len(vector) == 32
+    assert sum(v * v for v in vector) == pytest.approx(1.0)
+
+
+def test_batch_embedder_splits_into_batches_and_keeps_order():
+    inner = RecordingEmbeddings()
+    embedder = BatchEmbedder(inner, batch_size=3, max_concurrency=2)
+    texts = [f"line {i}" for i in range(8)]
+
+    vectors = embedder.embed_documents(texts)
+
+    assert sorted(len(batch) for batch in inner.calls) == [2, 3, 3]
+    assert vectors == HashEmbeddings(dimensions=16).embed_documents(texts)
+    assert embedder.embedded == 8
+
+
+def test_batch_embedder_retries_rate_limited_batches():
+    inner = RecordingEmbeddings(failures=2)
+    embedder = BatchEmbedder(inner, batch_size=10, backoff_base=0.0)
+
+    vectors = embedder.embed_documents(["a", "b"])
+
+    assert len(vectors) == 2
+    assert len(inner.calls) == 3
+    assert embedder.retries == 2
+
+
+def test_batch_embedder_gives_up_after_max_retries():
+    embedder = BatchEmbedder(RecordingEmbeddings(failures=5), max_retries=2, backoff_base=0.0)
+    with pytest.raises(RateLimitError):
+        embedder.embed_documents(["a"])
+    assert embedder.retries == 2
+
+
+def test_batch_embedder_does_not_retry_other_errors():
+    inner = RecordingEmbeddings(failures=1, error=ValueError("bad input"))
+    embedder = BatchEmbedder(inner, backoff_base=0.0)
+    with pytest.raises(ValueError):
+        embedder.embed_documents(["a"])
+    assert len(inner.calls) == 1
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(RateLimitError())
+    assert is_rate_limited(Exception("429 Too Many Requests"))
+    assert is_rate_limited(Exception("Rate limit exceeded"))
+    assert not is_rate_limited(Exception("500 Internal Server Error"))
+
+
+def test_template_cache_embeds_each_template_once(tmp_path):
+    inner = RecordingEmbeddings()
+    cache = TemplateCachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite3"))
+    texts = [
+        "Nov 28 14:00:02 ace-host Trace[12089]: ACE0806E: Resource unavailable PID=12089",
+        "Nov 28 14:05:09 ace-host Trace[12090]: ACE0806E: Resource unavailable PID=12090",
+        "Nov 28 14:05:10 ace-host Trace[12090]: ACE0001I: Integration node started",
+    ]
+
+    vectors = cache.embed_documents(texts)
+
+    assert inner.calls == [[
+        "<TS> ace-host Trace[<PID>]: ACE0806E: Resource unavailable PID=<PID>",
+        "<TS> ace-host Trace[<PID>]: ACE0001I: Integration node started",
+    ]]
+    assert vectors[0] == pytest.approx(vectors[1])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_template_cache_persists_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    text = "Nov 28 14:00:02 ace-host Trace[1]: ACE0806E: Resource unavailable"
+    [expected] = TemplateCachedEmbeddings(RecordingEmbeddings(), path=path).embed_documents([text])
+
+    inner = RecordingEmbeddings()
+    cache = TemplateCachedEmbeddings(inner, path=path)
+
+    [vector] = cache.embed_documents([text.replace("Trace[1]", "Trace[2]")])
+    assert vector == pytest.approx(expected)
+    assert inner.calls == []
+    assert cache.model == "hash-16:template"
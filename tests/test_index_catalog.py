@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+ROWS = [
+    {"index": "mq", "sourcetype": "mq:errors", "count": "40"},
+    {"index": "mq", "sourcetype": "mq:stats", "count": "7"},
+    {"index": "ace", "sourcetype": "ace:syslog", "count": "12"},
+]
+
+
+class FakePool:
+    def __init__(self, indexes):
+        self.service = SimpleNamespace(indexes=[SimpleNamespace(name=name) for name in indexes])
+
+    @contextmanager
+    def connection(self):
+        yield self.service
+
+
+@pytest.fixture
+def searches(splunk_mcp, monkeypatch):
+    """SPL run by the catalog, answered from ROWS"""
+    searches = []
+
+    def run_search_to_completion(search_query, earliest_time, latest_time):
+        searches.append(search_query)
+        if 'index="ace"' in search_query:
+            return [row for row in ROWS if row["index"] == "ace"]
+        return ROWS
+
+    monkeypatch.setattr(splunk_mcp, "splunk_pool", FakePool(["mq", "ace", "main"]))
+    monkeypatch.setattr(splunk_mcp, "run_search_to_completion", run_search_to_completion)
+    monkeypatch.setattr(splunk_mcp, "fetch_index_info", lambda name: {"name": name, "total_event_count": "12"})
+    return searches
+
+
+def test_refresh_builds_the_snapshot(splunk_mcp, searches):
+    catalog = splunk_mcp.IndexCatalog(refresh_interval=60, time_range="-24h")
+    catalog.refresh()
+
+    snapshot = catalog.snapshot()
+    assert snapshot["indexes"] == ["mq", "ace", "main"]
+    assert snapshot["sourcetypes"] == {
+        "mq": [{"sourcetype": "mq:errors", "count": "40"}, {"sourcetype": "mq:stats", "count": "7"}],
+        "ace": [{"sourcetype": "ace:syslog", "count": "12"}],
+    }
+    assert snapshot["metadata"]["total_sourcetypes"] == 3
+    assert snapshot["metadata"]["search_time_range"] == "-24h to now"
+    assert snapshot["metadata"]["snapshot_age_seconds"] is not None
+
+
+def test_recent_snapshots_are_not_rebuilt(splunk_mcp, searches):
+    catalog = splunk_mcp.IndexCatalog(refresh_interval=60)
+    catalog.refresh()
+    catalog.refresh(max_age=60)
+    assert len(searches) == 1
+
+    catalog.refresh(max_age=0)
+    assert len(searches) == 2
+
+
+def test_refresh_index_merges_one_index(splunk_mcp, searches):
+    catalog = splunk_mcp.IndexCatalog(refresh_interval=60)
+
+    info = catalog.refresh_index("ace", include_sourcetypes=True)
+
+    assert info == {"name": "ace", "total_event_count": "12",
+                    "sourcetypes": [{"sourcetype": "ace:syslog", "count": "12"}]}
+    snapshot = catalog.snapshot()
+    assert snapshot["indexes"] == ["ace"]
+    assert snapshot["metadata"]["refreshed_at"] is None
+
+    catalog.refresh_index("ace")
+    assert catalog.snapshot()["indexes"] == ["ace"]
+    assert len(searches) == 1
@@ -0,0 +1,136 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_community")
+
+from ingest_tail import Checkpoint, TailIngester
+
+INDEX = {"schema_version": 2, "embedding_model": "hash-8", "collection_name": "logs", "index_id": "a"}
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.docs = {}
+        self.added = 0
+
+    def get(self, ids=None, include=None):
+        return {"ids": [i for i in self.docs if ids is None or i in ids]}
+
+    def add_documents(self, docs, ids):
+        self.added += len(docs)
+        self.docs.update(zip(ids, docs))
+
+
+def record(i):
+    return json.dumps({"text": f"Nov 28 14:00:0{i} ace-host Trace[{i}]: ACE0806E: event {i}",
+                       "timestamp": f"2025-11-28 14:00:0{i}", "severity": "E"}) + "\n"
+
+
+@pytest.fixture
+def tail(tmp_path):
+    """A log file and a function making an ingester over it with a saved checkpoint"""
+    logs = tmp_path / "ace.log"
+    logs.write_text("")
+    vectorstore = FakeVectorStore()
+
+    def make(index=INDEX):
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), index=index)
+        ingester = TailIngester(str(logs), vectorstore, checkpoint, batch_size=100)
+        assert ingester.open()
+        return ingester
+
+    make.logs = logs
+    make.vectorstore = vectorstore
+    return make
+
+
+def test_partial_lines_wait_for_their_newline(tail):
+    ingester = tail()
+    tail.logs.write_text(record(1) + record(2).rstrip("\n"))
+
+    assert ingester.read_lines() == 1
+    assert ingester.offset == len(record(1))
+
+    with tail.logs.open("a") as f:
+        f.write("\n")
+    assert ingester.read_lines() == 1
+    ingester.flush()
+    assert tail.vectorstore.added == 2
+
+
+def test_restart_resumes_from_the_checkpoint(tail):
+    ingester = tail()
+    tail.logs.write_text(record(1) + record(2))
+    ingester.read_lines()
+    ingester.flush()
+    ingester.file.close()
+
+    with tail.logs.open("a") as f:
+        f.write(record(3))
+    restarted = tail()
+
+    assert restarted.offset == 2 * len(record(1))
+    assert restarted.read_lines() == 1
+    restarted.flush()
+    assert tail.vectorstore.added == 3
+
+
+def test_records_already_in_the_store_are_not_added_again(tail):
+    tail.logs.write_text(record(1) + record(2))
+    ingester = tail()
+    ingester.read_lines()
+    ingester.flush()
+
+    # A crash before the checkpoint was written: the same lines are read again
+    ingester.offset = 0
+    ingester.file.seek(0)
+    ingester.read_lines()
+    ingester.flush()
+
+    assert tail.vectorstore.added == 2
+
+
+def test_rotation_and_truncation_are_detected(tail):
+    tail.logs.write_text(record(1) + record(2))
+    ingester = tail()
+    ingester.read_lines()
+    assert not ingester.rotated()
+
+    tail.logs.write_text(record(3))
+    assert ingester.rotated()
+
+    rotated = tail.logs.with_suffix(".new")
+    rotated.write_text(record(4) * 3)
+    os.replace(rotated, tail.logs)
+    assert ingester.rotated()
+
+    ingester.file.close()
+    ingester.checkpoint.set(ingester.source, ingester.inode, ingester.offset)
+    assert tail().offset == 0
+
+
+def test_bad_lines_are_skipped_and_counted(tail):
+    ingester = tail()
+    tail.logs.write_text(record(1) + "{broken\n" + "{\"text\": 1} trailing\n" + record(2))
+
+    assert ingester.read_lines() == 4
+    ingester.flush()
+
+    assert ingester.skipped == 2
+    assert tail.vectorstore.added == 2
+    assert ingester.offset == tail.logs.stat().st_size
+
+
+def test_checkpoint_is_discarded_after_a_rebuild(tail, tmp_path):
+    tail.logs.write_text(record(1))
+    ingester = tail()
+    ingester.read_lines()
+    ingester.flush()
+    assert Checkpoint(str(tmp_path / "checkpoint.json"), index=INDEX).files
+
+    rebuilt = {**INDEX, "index_id": "b"}
+    assert Checkpoint(str(tmp_path / "checkpoint.json"), index=rebuilt).files == {}
+    assert tail(index=rebuilt).offset == 0
@@ -0,0 +1,172 @@
+import json
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_community")
+
+import log_index
+from embedding import HashEmbeddings
+from retrieval import matches
+
+STORES = {}
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def count(self):
+        return len(self.docs)
+
+
+class FakeChroma:
+    """In-memory stand-in for the persisted Chroma collection"""
+
+    def __init__(self, collection_name, embedding_function=None, persist_directory=None):
+        self.key = (persist_directory, collection_name)
+        self.docs = STORES.setdefault(self.key, {})
+        self._collection = FakeCollection(self.docs)
+        self.embeddings = embedding_function
+
+    def get(self, ids=None, where=None, include=None):
+        return {"ids": [i for i, doc in self.docs.items()
+                        if (ids is None or i in ids) and (not where or matches(doc.metadata, where))]}
+
+    def add_documents(self, docs, ids):
+        self.embeddings.embed_documents([doc.page_content for doc in docs])
+        self.docs.update(zip(ids, docs))
+
+    def delete(self, ids):
+        for i in ids:
+            del self.docs[i]
+
+    def delete_collection(self):
+        self.docs.clear()
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__(dimensions=8)
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def record(i, severity="E"):
+    return json.dumps({"text": f"Nov 28 14:00:00 ace-host Trace[{i}]: ACE0806E: event {i}",
+                       "timestamp": "2025-11-28 14:00:00", "severity": severity}) + "\n"
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    """open_index against a fake collection; returns (logs path, open)"""
+    monkeypatch.setattr(log_index, "Chroma", FakeChroma)
+    monkeypatch.setattr(log_index, "ADD_BATCH_SIZE", 3)
+    STORES.clear()
+    logs = tmp_path / "logs.jsonl"
+    embeddings = CountingEmbeddings()
+
+    def open_(**kwargs):
+        return log_index.open_index(str(logs), embeddings, str(tmp_path / "db"), **kwargs)
+
+    open_.embeddings = embeddings
+    return logs, open_
+
+
+def test_first_open_indexes_every_record(index):
+    logs, open_ = index
+    logs.write_text("".join(record(i) for i in range(7)))
+
+    vectorstore = open_()
+
+    assert vectorstore._collection.count() == 7
+    assert open_.embeddings.embedded == 7
+    manifest = log_index.read_manifest(str(logs.parent / "db"))
+    assert manifest["sources"][str(logs)] == {
+        "offset": logs.stat().st_size,
+        "sha256": log_index.prefix_sha256(str(logs), logs.stat().st_size).hexdigest(),
+    }
+
+
+def test_unchanged_file_is_not_read_again(index, monkeypatch):
+    logs, open_ = index
+    logs.write_text("".join(record(i) for i in range(3)))
+    open_()
+    monkeypatch.setattr(log_index, "iter_document_batches", None)
+
+    assert open_()._collection.count() == 3
+
+
+def test_appended_lines_are_read_from_the_indexed_offset(index, monkeypatch):
+    logs, open_ = index
+    logs.write_text("".join(record(i) for i in range(3)))
+    open_()
+    offsets = []
+    iter_batches = log_index.iter_document_batches
+    monkeypatch.setattr(log_index, "iter_document_batches",
+                        lambda path, offset, digest: offsets.append(offset) or iter_batches(path, offset, digest))
+
+    indexed = logs.stat().st_size
+    with logs.open("a") as f:
+        f.write(record(3) + record(4))
+    vectorstore = open_()
+
+    assert offsets == [indexed]
+    assert vectorstore._collection.count() == 5
+    assert open_.embeddings.embedded == 5
+
+
+def test_rewritten_file_is_resynced_and_stale_records_deleted(index):
+    logs, open_ = index
+    logs.write_text("".join(record(i) for i in range(5)))
+    open_()
+
+    logs.write_text("".join(record(i) for i in (1, 2, 8)))
+    vectorstore = open_()
+
+    assert sorted(json.loads(doc.page_content)["text"].rsplit(": ", 1)[1] for doc in vectorstore.docs.values()) == [
+        "event 1", "event 2", "event 8"]
+    assert open_.embeddings.embedded == 6
+
+
+def test_unterminated_last_line_is_read_again(index):
+    logs, open_ = index
+    logs.write_text(record(0) + record(1).rstrip("\n"))
+    vectorstore = open_()
+    assert vectorstore._collection.count() == 2
+
+    with logs.open("a") as f:
+        f.write("\n" + record(2))
+    vectorstore = open_()
+
+    assert vectorstore._collection.count() == 3
+    assert open_.embeddings.embedded == 3
+
+
+def test_rebuild_drops_the_collection(index):
+    logs, open_ = index
+    logs.write_text("".join(record(i) for i in range(2)))
+    open_()
+
+    open_(rebuild=True)
+
+    assert open_.embeddings.embedded == 4
+
+
+def test_bad_lines_are_skipped_and_the_offset_still_advances(index, capsys):
+    logs, open_ = index
+    logs.write_text(record(0) + "{not json\n" + "[1, 2]\n" + record(1))
+
+    vectorstore = open_()
+
+    assert vectorstore._collection.count() == 2
+    assert "Skipping bad line at byte" in capsys.readouterr().out
+    manifest = log_index.read_manifest(str(logs.parent / "db"))
+    assert manifest["sources"][str(logs)]["offset"] == logs.stat().st_size
+
+    with logs.open("a") as f:
+        f.write(record(2))
+    assert open_()._collection.count() == 3
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from log_store import code_counts, ingest, open_dataset, query, time_filter
+
+TIMES = [
+    ("Nov 28 22:59:59", "ACE0806E"),
+    ("Nov 28 23:00:00", "ACE0806E"),
+    ("Nov 28 23:30:00", "ACE0901W"),
+    ("Nov 29 00:00:00", "ACE0806E"),
+    ("Nov 29 00:59:59", "ACE0001I"),
+    ("Nov 29 01:00:00", "ACE0806E"),
+]
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    root = tmp_path_factory.mktemp("store")
+    source = root / "ace.log"
+    source.write_text("".join(
+        f"{time} ace-host Trace[1]: {code}: event at {time}\n" for time, code in TIMES
+    ))
+    assert ingest(str(source), str(root / "data"), year=2025, workers=2, rows_per_write=3) == len(TIMES)
+    return str(root / "data")
+
+
+def timestamps(table):
+    return [t.strftime("%d %H:%M:%S") for t in table.column("timestamp").to_pylist()]
+
+
+def test_range_is_start_inclusive_and_end_exclusive(store):
+    table = query(datetime(2025, 11, 28, 23, 0), datetime(2025, 11, 29, 1, 0), root=store)
+
+    assert timestamps(table) == ["28 23:00:00", "28 23:30:00", "29 00:00:00", "29 00:59:59"]
+
+
+def test_open_ended_ranges(store):
+    assert timestamps(query(start=datetime(2025, 11, 29, 0, 59, 59), root=store)) == ["29 00:59:59", "29 01:00:00"]
+    assert timestamps(query(end=datetime(2025, 11, 28, 23, 0), root=store)) == ["28 22:59:59"]
+    assert time_filter() is None
+
+
+def test_partition_filter_prunes_other_hours(store):
+    dataset = open_dataset(store)
+    expression = time_filter(datetime(2025, 11, 28, 23, 15), datetime(2025, 11, 28, 23, 45))
+
+    paths = {fragment.path.split(store)[1].rsplit("/", 1)[0] for fragment in dataset.get_fragments(filter=expression)}
+
+    assert paths == {"/date=2025-11-28/hour=23"}
+
+
+def test_code_counts(store):
+    counts = code_counts(severities=["E", "W"], root=store).to_pylist()
+
+    assert counts == [
+        {"code": "ACE0806E", "severity": "E", "count_all": 4},
+        {"code": "ACE0901W", "severity": "W", "count_all": 1},
+    ]
@@ -0,0 +1,70 @@
+import json
+
+from log_templates import TemplateMiner, format_clusters, template_of
+
+
+def line(second, flow, pid=12025):
+    return (
+        f"Nov 28 14:00:{second:02d} ace-host IntegrationNode[{pid}]: ACE0901W: Flow '{flow}' "
+        f"reported a recoverable condition. MsgID={1000 + second}"
+    )
+
+
+class Doc:
+    def __init__(self, record):
+        self.page_content = json.dumps(record)
+
+
+def test_template_of_masks_volatile_fields():
+    assert template_of(line(2, "InvoiceFlow")) == (
+        "<TS> ace-host IntegrationNode[<PID>]: ACE0901W: Flow 'InvoiceFlow' "
+        "reported a recoverable condition. MsgID=<MSGID>"
+    )
+    assert template_of(line(2, "InvoiceFlow")) == template_of(line(9, "InvoiceFlow", pid=1))
+
+
+def test_miner_turns_differing_positions_into_wildcards():
+    miner = TemplateMiner()
+    for second, flow in enumerate(["InvoiceFlow", "OrderFlow", "InvoiceFlow"]):
+        miner.add(line(second, flow), timestamp=f"2025-11-28 14:00:0{second}")
+
+    [cluster] = miner.clusters
+    assert cluster.template == "ACE0901W: Flow <*> reported a recoverable condition. MsgID=<MSGID>"
+    assert cluster.count == 3
+    assert (cluster.first_seen, cluster.last_seen) == ("2025-11-28 14:00:00", "2025-11-28 14:00:02")
+    assert cluster.components == {"IntegrationNode": 3}
+    assert cluster.to_dict()["variables"] == [{"'InvoiceFlow'": 2, "'OrderFlow'": 1}]
+
+
+def test_miner_keeps_different_messages_apart():
+    miner = TemplateMiner()
+    miner.add(line(1, "InvoiceFlow"))
+    miner.add("Nov 28 14:00:04 ace-host ExecutionGroup[12517]: ACE0001I: Integration node 'INODE01' started.")
+
+    assert len(miner.clusters) == 2
+
+
+def test_match_does_not_add():
+    miner = TemplateMiner()
+    cluster = miner.add(line(1, "InvoiceFlow"))
+
+    assert miner.match(line(5, "OrderFlow")) is cluster
+    assert miner.match("Nov 28 14:00:04 ace-host Trace[1]: ACE0806E: Resource unavailable") is None
+    assert cluster.count == 1
+
+
+def test_format_clusters_leaves_the_shared_miner_unchanged():
+    miner = TemplateMiner()
+    for second in range(3):
+        miner.add_record({"text": line(second, "InvoiceFlow"), "timestamp": f"2025-11-28 14:00:0{second}"})
+    unseen = {"text": "Nov 28 15:00:00 ace-host Trace[1]: ACE0806E: Resource 'JDBCProvider' unavailable",
+              "timestamp": "2025-11-28 15:00:00"}
+    docs = [Doc({"text": line(9, "OrderFlow")}), Doc(unseen), Doc(unseen)]
+
+    text = format_clusters(docs, miner)
+
+    assert "Template 1: ACE0901W: Flow 'InvoiceFlow' reported" in text
+    assert "| 3 occurrences" in text
+    assert "Template 2: ACE0806E: Resource 'JDBCProvider' unavailable | 1 occurrences" in text
+    assert len(miner.clusters) == 1
+    assert miner.clusters[0].count == 3
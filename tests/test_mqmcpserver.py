@@ -0,0 +1,168 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("mcp.server.fastmcp")
+
+import mqmcpserver
+from mqmcpserver import MQSnapshot, diff_snapshots, mq_changes_since, parse_mqsc_text
+
+QUEUE_TEXT = (
+    "AMQ8409I: Display Queue details.\n"
+    "   QUEUE(0001)                             TYPE(QLOCAL)\n"
+    "   CURDEPTH(42)                            MAXDEPTH(5000)\n"
+    "   DESCR('Payments ''in'' queue')          CLUSTER( )\n"
+)
+
+
+def test_parse_mqsc_text():
+    assert parse_mqsc_text(QUEUE_TEXT) == {
+        "message": "AMQ8409I: Display Queue details.",
+        "QUEUE": "0001",
+        "TYPE": "QLOCAL",
+        "CURDEPTH": 42,
+        "MAXDEPTH": 5000,
+        "DESCR": "Payments 'in' queue",
+        "CLUSTER": "",
+    }
+
+
+def test_parse_mqsc_text_keeps_non_numeric_counts_as_text():
+    record = parse_mqsc_text(
+        "AMQ8417I: Display Channel Status details.\n"
+        "   CHANNEL(TO.QM2)   CHLTYPE(SDR)   CONNAME(10.0.0.2(1414))   STATUS(RETRYING)   MSGS( )\n"
+    )
+
+    assert record["CHANNEL"] == "TO.QM2"
+    assert record["CONNAME"] == "10.0.0.2(1414)"
+    assert record["STATUS"] == "RETRYING"
+    assert record["MSGS"] == ""
+
+
+def test_diff_snapshots():
+    old = {
+        "QM1": {"state": "running",
+                "queues": {"APP.IN": {"curdepth": 0}, "APP.OLD": {"curdepth": 3}},
+                "channels": {"TO.QM2": {"status": "RUNNING"}}},
+        "QM2": {"state": "running"},
+    }
+    new = {
+        "QM1": {"state": "running",
+                "queues": {"APP.IN": {"curdepth": 12}, "APP.NEW": {"curdepth": 0}},
+                "channels": {"TO.QM2": {"status": "RETRYING"}}},
+        "QM2": {"state": "ended immediately"},
+    }
+
+    assert diff_snapshots(old, new) == [
+        {"qmgr": "QM1", "kind": "queue", "name": "APP.IN", "field": "curdepth", "old": 0, "new": 12},
+        {"qmgr": "QM1", "kind": "queue", "name": "APP.NEW", "field": "curdepth", "old": None, "new": 0},
+        {"qmgr": "QM1", "kind": "queue", "name": "APP.OLD", "field": "curdepth", "old": 3, "new": None},
+        {"qmgr": "QM1", "kind": "channel", "name": "TO.QM2", "field": "status", "old": "RUNNING", "new": "RETRYING"},
+        {"qmgr": "QM2", "kind": "qmgr", "name": "QM2", "field": "state", "old": "running", "new": "ended immediately"},
+    ]
+
+
+def test_diff_snapshots_without_changes():
+    snapshot = {"QM1": {"state": "running", "queues": {"APP.IN": {"curdepth": 1}}}}
+    assert diff_snapshots(snapshot, snapshot) == []
+
+
+@pytest.fixture
+def mq(monkeypatch):
+    """Queue manager state served to MQSnapshot.poll in place of mqweb"""
+    state = {"QM1": {"state": "running", "queues": {"APP.IN": 0, "APP.OUT": 0}}}
+
+    async def mq_request(method, path):
+        qmgrs = [{"name": name, "state": qmgr["state"]} for name, qmgr in state.items()]
+        return SimpleNamespace(content=json.dumps({"qmgr": qmgrs}).encode("utf-8"))
+
+    async def fetch_queues(name):
+        return [{"queue": queue, "curdepth": depth} for queue, depth in state[name]["queues"].items()]
+
+    async def fetch_channels(name):
+        return []
+
+    monkeypatch.setattr(mqmcpserver, "mq_request", mq_request)
+    monkeypatch.setattr(mqmcpserver, "fetch_queues", fetch_queues)
+    monkeypatch.setattr(mqmcpserver, "fetch_channels", fetch_channels)
+    return state
+
+
+async def test_first_poll_is_a_baseline(mq, monkeypatch):
+    snapshot = MQSnapshot(interval=0, history=10)
+    monkeypatch.setattr(mqmcpserver, "mq_snapshot", snapshot)
+
+    await snapshot.poll()
+
+    assert (snapshot.version, list(snapshot.changes)) == (1, [])
+    assert (await mq_changes_since(0))["truncated"] is True
+    result = await mq_changes_since(1)
+    assert (result["version"], result["truncated"], result["changes"]) == (1, False, [])
+
+
+async def test_changes_since_a_version(mq, monkeypatch):
+    snapshot = MQSnapshot(interval=0, history=10)
+    monkeypatch.setattr(mqmcpserver, "mq_snapshot", snapshot)
+    await snapshot.poll()
+
+    mq["QM1"]["queues"]["APP.IN"] = 5
+    await snapshot.poll()
+    await snapshot.poll()
+
+    result = await mq_changes_since(1)
+    assert result["version"] == 2
+    assert result["truncated"] is False
+    assert result["changes"] == [{"qmgr": "QM1", "kind": "queue", "name": "APP.IN", "field": "curdepth",
+                                  "old": 0, "new": 5, "version": 2}]
+    assert (await mq_changes_since(2))["changes"] == []
+
+
+async def test_truncated_only_when_an_unseen_change_was_dropped(mq, monkeypatch):
+    snapshot = MQSnapshot(interval=0, history=2)
+    monkeypatch.setattr(mqmcpserver, "mq_snapshot", snapshot)
+    await snapshot.poll()
+
+    mq["QM1"]["queues"].update({"APP.IN": 1, "APP.OUT": 1})
+    await snapshot.poll()
+    assert (await mq_changes_since(1))["truncated"] is False
+
+    mq["QM1"]["queues"]["APP.IN"] = 2
+    await snapshot.poll()
+    # Version 2 had two changes and one of them was evicted
+    assert snapshot.dropped_version == 2
+    assert (await mq_changes_since(1))["truncated"] is True
+    assert (await mq_changes_since(2))["truncated"] is False
+
+
+async def test_no_history_truncates_every_change(mq, monkeypatch):
+    snapshot = MQSnapshot(interval=0, history=0)
+    monkeypatch.setattr(mqmcpserver, "mq_snapshot", snapshot)
+    await snapshot.poll()
+
+    mq["QM1"]["state"] = "ended immediately"
+    await snapshot.poll()
+
+    assert (await mq_changes_since(1))["truncated"] is True
+    assert (await mq_changes_since(2))["truncated"] is False
+
+
+async def test_snapshot_is_fresh_only_while_the_poller_keeps_it_current(mq):
+    polled = MQSnapshot(interval=0, max_age=60)
+    await polled.poll()
+    # A one-off poll without the background task is never refreshed
+    assert not polled.fresh()
+
+    snapshot = MQSnapshot(interval=0.01, max_age=60)
+    snapshot.start()
+    await asyncio.sleep(0.05)
+    assert snapshot.fresh()
+
+    snapshot.max_age = 0
+    assert not snapshot.fresh()
+
+    await snapshot.stop()
+    snapshot.max_age = 60
+    assert not snapshot.fresh()
@@ -0,0 +1,59 @@
+import json
+
+from result_shaping import cap_lines, shape_content, shape_rows, text_lines
+
+
+def event(second, pid, message="ACE0806E: Resource 'JDBCProvider' unavailable"):
+    return {
+        "_raw": f"2025-11-28 14:00:{second:02d} ace-host Trace[{pid}]: {message}",
+        "_time": f"2025-11-28T14:00:{second:02d}",
+        "_bkt": "main~1", "_cd": "1:2", "punct": "--_::_-_[]:_:", "date_hour": "14",
+        "host": "ace-host",
+    }
+
+
+def test_repeated_events_are_merged_and_internal_fields_dropped():
+    rows = [event(5, 1), event(1, 2), event(3, 3), event(2, 4, "ACE0001I: Integration node started")]
+
+    shown, summary = shape_rows(rows)
+
+    assert summary == "4 results -> 2 distinct"
+    assert shown[0] == {
+        "occurrences": 3,
+        "first_time": "2025-11-28T14:00:01",
+        "last_time": "2025-11-28T14:00:05",
+        "_raw": "2025-11-28 14:00:05 ace-host Trace[1]: ACE0806E: Resource 'JDBCProvider' unavailable",
+        "host": "ace-host",
+    }
+    assert shown[1] == {
+        "_raw": "2025-11-28 14:00:02 ace-host Trace[4]: ACE0001I: Integration node started",
+        "_time": "2025-11-28T14:00:02",
+        "host": "ace-host",
+    }
+
+
+def test_stats_rows_are_ranked_by_count_and_cut_to_top_n():
+    rows = [{"queue": f"Q{i}", "count": str(i)} for i in range(1, 6)]
+
+    shown, summary = shape_rows(rows, top_n=2)
+
+    assert [row["queue"] for row in shown] == ["Q5", "Q4"]
+    assert summary == "5 results -> 5 distinct, top 2 shown (3 more distinct omitted, 3 results)"
+
+
+def test_shape_content_renders_nested_results():
+    content = json.dumps({"sid": "123", "results": [event(1, 1), event(2, 2)]})
+
+    assert shape_content(content).splitlines() == [
+        'sid: "123"',
+        "results:",
+        "  [2 results -> 1 distinct]",
+        '  {"occurrences":2,"first_time":"2025-11-28T14:00:01","last_time":"2025-11-28T14:00:02",'
+        '"_raw":"2025-11-28 14:00:01 ace-host Trace[1]: ACE0806E: Resource \'JDBCProvider\' unavailable",'
+        '"host":"ace-host"}',
+    ]
+
+
+def test_text_results_collapse_repeats_and_are_capped():
+    assert text_lines("a\na\n\nb\na\n") == ["a  (repeated 2 times)", "b", "a"]
+    assert cap_lines(["x" * 10] * 10, max_tokens=6) == "x" * 10 + "\n" + "x" * 10 + "\n[8 more lines omitted, ~22 tokens]"
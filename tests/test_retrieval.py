@@ -0,0 +1,156 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_community")
+
+from embedding import HashEmbeddings
+from log_index import record_id, record_to_document
+from retrieval import HybridRetriever, KeywordIndex, matches, severity_filter
+
+LINES = [
+    ("E", "Nov 28 14:00:04 ace-host Trace[1]: ACE0806E: Resource 'JDBCProvider' unavailable for application 'OrderProcessing'."),
+    ("W", "Nov 28 14:00:05 ace-host IntegrationNode[2]: ACE0901W: Flow 'InvoiceFlow' node 'DBLookup' in application 'Payment' reported a recoverable condition."),
+    ("E", "Nov 28 14:00:06 ace-host Trace[3]: ACE0805E: Unexpected exception in flow 'InvoiceFlow' while calling the database."),
+    ("I", "Nov 28 14:00:07 ace-host ExecutionGroup[4]: ACE0001I: Integration node 'INODE01' started."),
+    ("E", "Nov 28 14:00:08 ace-host Trace[5]: ACE0807E: Queue manager QM1 connection lost for application 'Payment'."),
+]
+
+
+def documents(lines=LINES):
+    return [record_to_document({"text": text, "severity": severity}, "test.jsonl") for severity, text in lines]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def count(self):
+        return len(self.docs)
+
+
+class FakeVectorStore:
+    """The slice of the Chroma API the retrievers use, over a dict of documents.
+    Vector search returns vector_ranking (filtered), or everything in insertion order."""
+
+    def __init__(self, docs):
+        self.docs = {record_id(doc.page_content): doc for doc in docs}
+        self._collection = FakeCollection(self.docs)
+        self.embeddings = HashEmbeddings(dimensions=32)
+        self.vector_ranking = None
+        self.vector_calls = []
+
+    def get(self, ids=None, include=None, limit=None, offset=0):
+        selected = [i for i in self.docs if ids is None or i in ids]
+        selected = selected[offset:] if limit is None else selected[offset:offset + limit]
+        return {
+            "ids": selected,
+            "documents": [self.docs[i].page_content for i in selected],
+            "metadatas": [self.docs[i].metadata for i in selected],
+        }
+
+    def similarity_search_by_vector(self, vector, k, filter=None):
+        self.vector_calls.append(k)
+        ranking = self.vector_ranking if self.vector_ranking is not None else list(self.docs.values())
+        return [doc for doc in ranking if not filter or matches(doc.metadata, filter)][:k]
+
+
+def test_bm25_ranks_the_best_matching_document_first():
+    index = KeywordIndex()
+    index.add(documents())
+
+    hits = index.search("database exception InvoiceFlow", k=2)
+
+    assert [hit.metadata["code"] for hit in hits] == ["ACE0805E", "ACE0901W"]
+
+
+def test_bm25_filters_by_code_and_metadata():
+    index = KeywordIndex()
+    index.add(documents())
+
+    assert [hit.metadata["code"] for hit in index.search("application", codes={"ACE0807E"})] == ["ACE0807E"]
+    assert index.search("INODE01 started", where=severity_filter()) == []
+
+
+def test_keyword_index_skips_documents_it_already_has():
+    index = KeywordIndex()
+    index.add(documents())
+    index.add(documents())
+
+    assert len(index.docs) == len(LINES)
+
+
+def test_hybrid_fuses_rankings_with_rrf():
+    docs = documents()
+    vectorstore = FakeVectorStore(docs)
+    # The vector search prefers QM1; BM25 only matches the InvoiceFlow lines
+    vectorstore.vector_ranking = [docs[4], docs[2], docs[1]]
+    retriever = HybridRetriever(vectorstore)
+
+    hits = retriever.search_critical("InvoiceFlow database exception", k=3)
+
+    # Being ranked by both beats being first in only one
+    assert hits == [docs[2], docs[1], docs[4]]
+    assert vectorstore.vector_calls == [50]
+
+
+def test_hybrid_answers_ace_codes_from_the_keyword_index():
+    vectorstore = FakeVectorStore(documents())
+    retriever = HybridRetriever(vectorstore)
+
+    hits = retriever.search_critical("what does ACE0806E mean?", k=3)
+
+    assert [hit.metadata["code"] for hit in hits] == ["ACE0806E"]
+    assert vectorstore.vector_calls == []
+
+
+def test_hybrid_picks_up_documents_added_after_it_was_built():
+    vectorstore = FakeVectorStore(documents())
+    retriever = HybridRetriever(vectorstore)
+    [new_doc] = documents([("E", "Nov 28 15:00:00 ace-host Trace[6]: ACE2153E: Broker archive deploy failed.")])
+    vectorstore.docs[record_id(new_doc.page_content)] = new_doc
+
+    assert retriever.search_critical("ACE2153E", k=1) == [new_doc]
+    assert len(retriever.keyword_index.docs) == len(LINES) + 1
+
+
+def test_hybrid_fetches_more_when_one_template_fills_the_candidates():
+    noisy = documents([("E", f"Nov 28 14:01:00 ace-host Trace[{pid}]: ACE0807E: Queue manager QM1 connection lost.")
+                       for pid in range(60)])
+    docs = documents()
+    vectorstore = FakeVectorStore(noisy + docs)
+    vectorstore.vector_ranking = noisy + docs
+    retriever = HybridRetriever(vectorstore)
+
+    hits = retriever.search_critical("zzz", k=3)
+
+    assert len(hits) == 3
+    assert vectorstore.vector_calls == [50, 100]
+
+
+def test_documents_deleted_from_the_collection_leave_the_keyword_index():
+    docs = documents()
+    vectorstore = FakeVectorStore(docs)
+    retriever = HybridRetriever(vectorstore)
+    assert retriever.search_critical("ACE0806E", k=1) == [docs[0]]
+
+    # A resync replaces one record with another: the count stays the same
+    del vectorstore.docs[record_id(docs[0].page_content)]
+    [replacement] = documents([("E", "Nov 28 15:00:00 ace-host Trace[6]: ACE2153E: Broker archive deploy failed.")])
+    vectorstore.docs[record_id(replacement.page_content)] = replacement
+
+    assert docs[0] not in retriever.search_critical("ACE0806E", k=5)
+    assert retriever.search_critical("ACE2153E", k=1) == [replacement]
+    assert retriever.keyword_index.search("JDBCProvider unavailable") == []
+
+
+def test_removing_documents_keeps_bm25_statistics_consistent():
+    docs = documents()
+    index = KeywordIndex()
+    index.add(docs)
+    index.remove([record_id(docs[3].page_content)])
+
+    fresh = KeywordIndex()
+    fresh.add(docs[:3] + docs[4:])
+
+    assert index.total_length == fresh.total_length
+    assert index.search("application flow", k=5) == fresh.search("application flow", k=5)
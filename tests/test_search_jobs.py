@@ -0,0 +1,103 @@
+import io
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("splunklib")
+
+from splunklib.binding import HTTPError
+
+
+class FakeJob:
+    def __init__(self, sid, gone=False):
+        self.sid = sid
+        self.gone = gone
+        self.cancelled = False
+
+    def is_done(self):
+        if self.gone:
+            raise HTTPError(SimpleNamespace(status=404, reason="Not Found", headers=[], body=io.BytesIO(b"")))
+        return True
+
+    def __getitem__(self, key):
+        return "0"
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def test_registry_finds_jobs_by_sid_and_key(splunk_mcp):
+    registry = splunk_mcp.SearchJobRegistry(ttl=60, max_jobs=5)
+    job = FakeJob("sid-1")
+    registry.register(("index=mq", 1, 2), job, "index=mq", "-1h", "now")
+
+    assert registry.get("sid-1") is job
+    assert registry.find(("index=mq", 1, 2)) is job
+    assert registry.find(("index=mq", 1, 3)) is None
+    assert [entry["sid"] for entry in registry.list()] == ["sid-1"]
+
+    assert registry.remove("sid-1") is job
+    assert registry.find(("index=mq", 1, 2)) is None
+
+
+def test_registry_evicts_the_least_recently_used_job(splunk_mcp):
+    registry = splunk_mcp.SearchJobRegistry(ttl=60, max_jobs=2)
+    jobs = [FakeJob(f"sid-{i}") for i in range(3)]
+    registry.register(("a",), jobs[0], "a", "-1h", "now")
+    registry.register(("b",), jobs[1], "b", "-1h", "now")
+    registry.get("sid-0")
+
+    assert registry.register(("c",), jobs[2], "c", "-1h", "now") == [jobs[1]]
+    assert registry.find(("b",)) is None
+    assert registry.find(("a",)) is jobs[0]
+
+
+def test_registry_sweeps_idle_jobs(splunk_mcp):
+    registry = splunk_mcp.SearchJobRegistry(ttl=0.01, max_jobs=5)
+    job = FakeJob("sid-1")
+    registry.register(("a",), job, "a", "-1h", "now")
+    time.sleep(0.02)
+
+    assert registry.sweep() == [job]
+    assert registry.get("sid-1") is None
+
+
+@pytest.fixture
+def dispatched(splunk_mcp, monkeypatch):
+    """Jobs dispatched through a fresh registry, without a Splunk server"""
+    jobs = []
+
+    def dispatch_search(search_query, **kwargs):
+        jobs.append(FakeJob(f"sid-{len(jobs)}"))
+        return jobs[-1]
+
+    monkeypatch.setattr(splunk_mcp, "job_registry", splunk_mcp.SearchJobRegistry(ttl=60, max_jobs=5))
+    monkeypatch.setattr(splunk_mcp, "dispatch_search", dispatch_search)
+    return jobs
+
+
+async def test_follow_up_searches_reuse_the_job(splunk_mcp, dispatched):
+    first = await splunk_mcp.start_search_job("index=mq  error", "-24h", "now", timeout=5)
+    second = await splunk_mcp.start_search_job("index=mq error", "-24h", "now", timeout=5)
+
+    assert second is first
+    assert len(dispatched) == 1
+
+
+async def test_reuse_can_be_turned_off(splunk_mcp, dispatched):
+    await splunk_mcp.start_search_job("index=mq", "-24h", "now", timeout=5)
+    await splunk_mcp.start_search_job("index=mq", "-24h", "now", timeout=5, reuse_job=False)
+
+    assert len(dispatched) == 2
+
+
+async def test_jobs_deleted_by_splunk_are_dispatched_again(splunk_mcp, dispatched):
+    first = await splunk_mcp.start_search_job("index=mq", "-24h", "now", timeout=5)
+    first.gone = True
+
+    second = await splunk_mcp.start_search_job("index=mq", "-24h", "now", timeout=5)
+
+    assert second is not first
+    assert splunk_mcp.job_registry.get(first.sid) is None
+    assert splunk_mcp.job_registry.get(second.sid) is second
@@ -0,0 +1,164 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("mcp")
+genai = pytest.importorskip("google.generativeai")
+
+import splunk
+from splunk import SplunkChatbot, gemini_function_declarations, gemini_schema
+
+
+def test_gemini_schema_object_with_required_properties():
+    schema = {
+        "type": "object",
+        "properties": {
+            "search_query": {"type": "string", "description": "SPL query"},
+            "max_results": {"type": "integer"},
+        },
+        "required": ["search_query", "not_a_property"],
+    }
+
+    assert gemini_schema(schema) == {
+        "type": "OBJECT",
+        "properties": {
+            "search_query": {"type": "STRING", "description": "SPL query"},
+            "max_results": {"type": "INTEGER"},
+        },
+        "required": ["search_query"],
+    }
+
+
+def test_gemini_schema_optional_values_become_nullable():
+    assert gemini_schema({"anyOf": [{"type": "integer"}, {"type": "null"}], "default": None}) == {
+        "type": "INTEGER",
+        "nullable": True,
+    }
+    assert gemini_schema({"type": ["string", "null"], "description": "Index"}) == {
+        "type": "STRING",
+        "description": "Index",
+        "nullable": True,
+    }
+
+
+def test_gemini_schema_object_without_properties_is_json_text():
+    assert gemini_schema({"type": "object", "description": "Extra fields"}) == {
+        "type": "STRING",
+        "description": "Extra fields (JSON object)",
+    }
+
+
+def test_gemini_schema_arrays_and_enums():
+    assert gemini_schema({"type": "array", "items": {"type": "integer"}}) == {
+        "type": "ARRAY",
+        "items": {"type": "INTEGER"},
+    }
+    assert gemini_schema({"type": "array"}) == {"type": "ARRAY", "items": {"type": "STRING"}}
+    assert gemini_schema({"type": "integer", "enum": [1, 2]}) == {"type": "STRING", "enum": ["1", "2"]}
+
+
+def test_gemini_function_declarations_omit_empty_parameters():
+    tools = [
+        SimpleNamespace(
+            name="search_splunk",
+            description="Run a search",
+            inputSchema={"type": "object", "properties": {"search_query": {"type": "string"}}},
+        ),
+        SimpleNamespace(name="list_indexes", description="List indexes", inputSchema={"type": "object"}),
+    ]
+
+    declarations = gemini_function_declarations(tools)
+
+    assert declarations[0]["name"] == "search_splunk"
+    assert declarations[0]["parameters"] == {
+        "type": "OBJECT",
+        "properties": {"search_query": {"type": "STRING"}},
+    }
+    assert declarations[1] == {"name": "list_indexes", "description": "List indexes"}
+
+
+def function_call(name, **args):
+    return genai.protos.Part(function_call=genai.protos.FunctionCall(name=name, args=args))
+
+
+class FakeResponse:
+    def __init__(self, parts=(), text=None):
+        self.parts = list(parts)
+        self._text = text
+        self.usage_metadata = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("response has no text")
+        return self._text
+
+
+class FakeChat:
+    """Answers with the given responses in turn, recording what was sent"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    async def send_message_async(self, content, tool_config=None):
+        self.sent.append((content, tool_config))
+        return self.responses.pop(0)
+
+
+class FakeHub:
+    """Tool calls that only finish once all of the round's calls have started"""
+
+    def __init__(self, expected_calls):
+        self.expected_calls = expected_calls
+        self.started = []
+        self.all_started = asyncio.Event()
+
+    async def call_tool(self, tool_name, args):
+        self.started.append((tool_name, args))
+        if len(self.started) == self.expected_calls:
+            self.all_started.set()
+        await asyncio.wait_for(self.all_started.wait(), timeout=1)
+        return [SimpleNamespace(type="text", text=f"{tool_name} done")]
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    monkeypatch.setenv("LLM_CONNECTION", "gemini")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(splunk, "LLM_NATIVE_ASYNC", True)
+    return SplunkChatbot(hub=FakeHub(expected_calls=2))
+
+
+async def test_native_round_runs_function_calls_concurrently(bot, monkeypatch):
+    monkeypatch.setattr(splunk, "MAX_TOOL_ROUNDS", 5)
+    bot.chat = FakeChat(
+        FakeResponse([function_call("search_splunk", search_query="error"), function_call("list_indexes")]),
+        FakeResponse(text="Two errors in main."),
+    )
+
+    assert await bot.send_message_native("What failed?") == "Two errors in main."
+
+    assert sorted(name for name, _ in bot.hub.started) == ["list_indexes", "search_splunk"]
+    assert ("search_splunk", {"search_query": "error"}) in bot.hub.started
+    content, tool_config = bot.chat.sent[1]
+    assert tool_config is None
+    assert [part.function_response.name for part in content] == ["search_splunk", "list_indexes"]
+    assert content[0].function_response.response["result"] == "search_splunk done"
+
+
+async def test_native_last_round_disables_function_calling(bot, monkeypatch):
+    monkeypatch.setattr(splunk, "MAX_TOOL_ROUNDS", 1)
+    bot.chat = FakeChat(
+        FakeResponse([function_call("search_splunk", search_query="error"), function_call("list_indexes")]),
+        FakeResponse(text="Here is what I found so far."),
+    )
+
+    assert await bot.send_message_native("What failed?") == "Here is what I found so far."
+
+    # The function calls are answered, and the model is told to reply in text
+    assert [config for _, config in bot.chat.sent] == [None, splunk.GEMINI_TEXT_ONLY]
+    assert len(bot.chat.sent[1][0]) == 2
+    assert not bot.chat.responses
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+
+class FakeResponse:
+    class body:
+        @staticmethod
+        def read():
+            return b"{}"
+
+
+class FakeService:
+    created = 0
+
+    def __init__(self, fail_keepalive=False):
+        FakeService.created += 1
+        self.token = f"token-{FakeService.created}"
+        self.logins = 0
+        self.pings = 0
+        self.fail_keepalive = fail_keepalive
+
+    def login(self):
+        self.logins += 1
+        self.token = f"{self.token}-renewed"
+
+    def get(self, path, **kwargs):
+        self.pings += 1
+        if self.fail_keepalive:
+            raise ConnectionError("connection reset")
+        return FakeResponse()
+
+
+@pytest.fixture
+def make_pool(splunk_mcp):
+    def make_pool(factory=FakeService, **kwargs):
+        kwargs = {"max_size": 2, "acquire_timeout": 1.0, "keepalive_interval": 300, "session_ttl": 3000, **kwargs}
+        return splunk_mcp.SplunkConnectionPool(factory, **kwargs)
+    return make_pool
+
+
+def test_idle_sessions_are_reused(make_pool):
+    services = []
+    pool = make_pool(lambda: services.append(FakeService()) or services[-1])
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(services) == 1
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["size"], stats["idle"]) == (1, 1, 1, 1)
+
+
+def test_borrowers_wait_for_a_free_session(make_pool):
+    pool = make_pool(max_size=1)
+    borrowed = []
+
+    with pool.connection() as service:
+        thread = threading.Thread(target=lambda: borrowed.append(pool.connection().__enter__()))
+        thread.start()
+        time.sleep(0.05)
+        assert borrowed == []
+    thread.join(1)
+
+    assert borrowed == [service]
+    assert pool.stats()["waits"] >= 1
+
+
+def test_acquire_times_out_when_the_pool_is_exhausted(make_pool):
+    pool = make_pool(max_size=1, acquire_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+
+
+def test_connection_errors_drop_the_session(make_pool):
+    pool = make_pool()
+
+    with pytest.raises(ConnectionError):
+        with pool.connection() as broken:
+            raise ConnectionError("reset by peer")
+    with pool.connection() as service:
+        assert service is not broken
+
+    stats = pool.stats()
+    assert (stats["discarded"], stats["size"]) == (1, 1)
+
+
+def test_other_errors_return_the_session(make_pool):
+    pool = make_pool()
+
+    with pytest.raises(ValueError):
+        with pool.connection() as first:
+            raise ValueError("bad search")
+    with pool.connection() as second:
+        assert second is first
+
+
+def test_sessions_past_their_ttl_log_in_again(make_pool):
+    pool = make_pool(session_ttl=0)
+
+    with pool.connection():
+        pass
+    with pool.connection() as service:
+        pass
+
+    assert service.logins == 1
+    assert pool.stats()["relogins"] == 1
+
+
+def test_idle_sessions_are_pinged_and_replaced_when_dead(make_pool):
+    services = [FakeService(fail_keepalive=True), FakeService()]
+    pool = make_pool(lambda: services.pop(0), keepalive_interval=0)
+
+    with pool.connection() as dead:
+        pass
+    with pool.connection() as service:
+        pass
+
+    assert dead.pings == 1
+    assert service is not dead
+    stats = pool.stats()
+    assert (stats["keepalive_checks"], stats["discarded"], stats["size"]) == (1, 1, 1)
+
+
+def test_tokens_renewed_by_autologin_are_counted(make_pool):
+    pool = make_pool()
+
+    with pool.connection() as service:
+        service.token = "renewed-by-autologin"
+
+    assert pool.stats()["relogins"] == 1
@@ -0,0 +1,92 @@
+import time
+from datetime import datetime
+
+import pytest
+
+
+# Thursday, 14 Nov 2024 10:37:25.5 local time
+NOW = datetime(2024, 11, 14, 10, 37, 25, 500000).timestamp()
+
+
+def local(*args):
+    return datetime(*args).timestamp()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("now", NOW),
+    ("", NOW),
+    ("-24h", NOW - 86400),
+    ("-15m", NOW - 900),
+    ("-1d@d", local(2024, 11, 13)),
+    ("@h", local(2024, 11, 14, 10)),
+    ("-1h@h", local(2024, 11, 14, 9)),
+    ("@w0", local(2024, 11, 10)),
+    ("@w1", local(2024, 11, 11)),
+    ("-1mon@mon", local(2024, 10, 1)),
+    ("@q", local(2024, 10, 1)),
+    ("@y", local(2024, 1, 1)),
+    ("-7d@d+8h", local(2024, 11, 7, 8)),
+    ("1700000000", 1700000000.0),
+    ("2024-11-01T00:00:00", local(2024, 11, 1)),
+])
+def test_resolve_time_modifier(splunk_mcp, value, expected):
+    assert splunk_mcp.resolve_time_modifier(value, NOW) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", ["-3fortnights", "yesterday", "@x"])
+def test_resolve_time_modifier_rejects_unknown_modifiers(splunk_mcp, value):
+    assert splunk_mcp.resolve_time_modifier(value, NOW) is None
+
+
+def test_month_offsets_clamp_to_the_end_of_the_month(splunk_mcp):
+    assert splunk_mcp.resolve_time_modifier("-1mon", local(2024, 3, 31, 12)) == local(2024, 2, 29, 12)
+
+
+def test_cache_returns_hits_and_counts_misses(splunk_mcp):
+    cache = splunk_mcp.SearchResultCache(max_bytes=1000, ttl=60)
+    cache.put("a", [{"host": "qm1"}])
+
+    assert cache.get("a") == [{"host": "qm1"}]
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_cache_evicts_least_recently_used_entries_by_size(splunk_mcp):
+    # Each value is 10 bytes of JSON
+    cache = splunk_mcp.SearchResultCache(max_bytes=25, ttl=60)
+    cache.put("a", "aaaaaaaa")
+    cache.put("b", "bbbbbbbb")
+    cache.get("a")
+    cache.put("c", "cccccccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaaaaaa"
+    assert cache.get("c") == "cccccccc"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 20
+
+
+def test_cache_skips_results_larger_than_the_budget(splunk_mcp):
+    cache = splunk_mcp.SearchResultCache(max_bytes=5, ttl=60)
+    cache.put("a", "too large")
+
+    assert cache.get("a") is None
+    assert cache.stats()["skipped_oversize"] == 1
+
+
+def test_cache_expires_entries(splunk_mcp):
+    cache = splunk_mcp.SearchResultCache(max_bytes=1000, ttl=0.01)
+    cache.put("a", [1])
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_key_ignores_whitespace_and_equivalent_time_ranges(splunk_mcp, monkeypatch):
+    monkeypatch.setattr(splunk_mcp.time, "time", lambda: NOW)
+    key = splunk_mcp.search_cache_key
+    assert key("index=mq  error", "-24h", "now", 100) == key("index=mq error", "-1d", "now", 100)
+    assert key('index=mq "a  b"', "-24h", "now", 100) != key('index=mq "a b"', "-24h", "now", 100)